@@ -0,0 +1,108 @@
+"""Peak memory of many concurrent downloads, with asyncio and with threads.
+
+Every download reads a stream of a manifest from the throttled stand-in,
+either with Stream.download_async on one event loop or with
+Stream.iter_chunks in a thread per download. Each mode runs in its own
+process so their peak RSS do not mix.
+
+    python benchmarks/bench_async_memory.py [downloads] [size_mb] [mb_per_s_per_connection]
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path[:0] = [os.path.join(_root, 'env', 'lib', 'python3.8', 'site-packages'), os.path.join(_root, 'tests')]
+import standin  # noqa: E402
+
+from pytubefix import YouTube  # noqa: E402
+
+
+def _rss():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _manifest(base_url, size):
+    return json.dumps({
+        'version': 1,
+        'video_id': '2lAe1cqCOXo',
+        'client': 'ANDROID_VR',
+        'title': 'bench',
+        'author': 'bench',
+        'length': 10,
+        'streams': [{
+            'itag': 18,
+            'mimeType': 'video/mp4; codecs="avc1.42001E, mp4a.40.2"',
+            'is_otf': False,
+            'bitrate': 1,
+            'contentLength': str(size),
+            'url': f'{base_url}/videoplayback?expire={int(time.time()) + 3600}&itag=18',
+        }],
+    })
+
+
+def run(mode, downloads, size, rate):
+    blob = standin.make_blob(size)
+    with standin.serve(standin.range_handler(blob, rate)) as server, tempfile.TemporaryDirectory() as out:
+        manifest = _manifest(server.base_url, size)
+        streams = [YouTube.from_manifest(manifest).streams.first() for _ in range(downloads)]
+        peak = [0]
+        done = threading.Event()
+
+        def sample():
+            while not done.is_set():
+                peak[0] = max(peak[0], _rss())
+                time.sleep(0.05)
+
+        base = _rss()
+        threading.Thread(target=sample, daemon=True).start()
+        start = time.perf_counter()
+        if mode == 'async':
+            async def main():
+                await asyncio.gather(*(
+                    stream.download_async(out, filename=f'{i}.mp4', skip_existing=False)
+                    for i, stream in enumerate(streams)
+                ))
+            asyncio.run(main())
+        else:
+            def download(i, stream):
+                with open(os.path.join(out, f'{i}.mp4'), 'wb') as f:
+                    for chunk in stream.iter_chunks():
+                        f.write(chunk)
+            threads = [threading.Thread(target=download, args=(i, s)) for i, s in enumerate(streams)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+
+        sizes = {os.path.getsize(os.path.join(out, f'{i}.mp4')) for i in range(downloads)}
+        assert sizes == {size}, sizes
+        delta = max(peak[0] - base, 0)
+        print(f'{mode:7} {downloads} downloads: {elapsed:5.2f} s, peak RSS +{delta / 2 ** 20:.0f} MiB, '
+              f'{delta / downloads / 1024:.0f} KiB per download')
+
+
+def main():
+    if sys.argv[1:2] in (['async'], ['threads']):
+        run(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]))
+        return
+    downloads = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    size = int(float(sys.argv[2] if len(sys.argv) > 2 else 4) * 1024 * 1024)
+    rate = float(sys.argv[3] if len(sys.argv) > 3 else 1) * 1024 * 1024
+    for mode in ('async', 'threads'):
+        subprocess.run([sys.executable, __file__, mode, str(downloads), str(size), str(rate)], check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Time of the sig and n functions of the sample player, interpreted and compiled.
+
+    python benchmarks/bench_jscompiler.py [calls]
+"""
+import os
+import sys
+import time
+
+_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path[:0] = [os.path.join(_root, 'env', 'lib', 'python3.8', 'site-packages')]
+
+from pytubefix import cipher  # noqa: E402
+from pytubefix.jscompiler import JSCompiler  # noqa: E402
+from pytubefix.jsinterp import JSInterpreter  # noqa: E402
+
+N = 'Yx3k9fJtQ1uPzW'
+SIG = 'AOq0QJ8wRQIhAJTb5fy8GQUVSe2pXjUQ0k3d5QG0mPy4ZBaRT5L9mxj0AiAxr4cA8Pu-dfM7Gq4dPzd7wK8yK4tWl4UGnUbGqWAz7Q=='
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with open(os.path.join(_root, 'tests', 'fixtures', 'player_sample.js')) as f:
+        js = f.read()
+    names = {
+        'sig': (cipher.get_initial_function_name(js, 'player_sample.js'), SIG),
+        'n': (cipher.get_throttling_function_name(js, 'player_sample.js'), N),
+    }
+    for label, cls in (('interpreter', JSInterpreter), ('compiler', JSCompiler)):
+        for kind, (name, arg) in names.items():
+            start = time.perf_counter()
+            instance = cls(js)
+            instance.call_function(name, arg)
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(calls):
+                instance.call_function(name, arg)
+            each = (time.perf_counter() - start) / calls
+            print(f'{label:12} {kind:4} first call {first * 1000:8.2f} ms  then {each * 1e6:9.1f} us/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Throughput of Stream.download with 1 to 8 range connections.
+
+The stand-in throttles every connection, like googlevideo does, so the
+throughput should grow with the number of connections.
+
+    python benchmarks/bench_parallel_stream.py [size_mb] [mb_per_s_per_connection]
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path[:0] = [os.path.join(_root, 'env', 'lib', 'python3.8', 'site-packages'), os.path.join(_root, 'tests')]
+import standin  # noqa: E402
+
+from pytubefix import Stream  # noqa: E402
+from pytubefix.monostate import Monostate  # noqa: E402
+
+
+def main():
+    size = int(float(sys.argv[1] if len(sys.argv) > 1 else 32) * 1024 * 1024)
+    rate = float(sys.argv[2] if len(sys.argv) > 2 else 8) * 1024 * 1024
+    blob = standin.make_blob(size)
+    expected = hashlib.sha1(blob).digest()
+    monostate = Monostate(on_progress=None, on_complete=None, title='bench')
+
+    with standin.serve(standin.range_handler(blob, rate)) as server, tempfile.TemporaryDirectory() as out:
+        for connections in (1, 2, 4, 8):
+            stream = Stream({
+                'url': f'{server.base_url}/videoplayback?expire=9999999999&itag=137',
+                'itag': 137,
+                'mimeType': 'video/mp4; codecs="avc1.640028"',
+                'bitrate': 1,
+                'contentLength': str(size),
+                'is_otf': False,
+            }, monostate)
+            start = time.perf_counter()
+            path = stream.download(output_path=out, filename=f'{connections}.mp4', skip_existing=False,
+                                   max_connections=connections, segment_size=size // 16)
+            elapsed = time.perf_counter() - start
+            with open(path, 'rb') as f:
+                ok = hashlib.sha1(f.read()).digest() == expected
+            print(f'connections={connections} {size / elapsed / 1e6:7.1f} MB/s  content_ok={ok}')
+
+
+if __name__ == '__main__':
+    main()
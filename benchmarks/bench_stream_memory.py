@@ -0,0 +1,92 @@
+"""Memory and build time of the streams of many restored manifests.
+
+Every synthetic video has the formats of a typical watch page: progressive,
+avc1, vp9 and av01 video, and audio, with a second audio track on one video
+in ten. The manifests are restored with YouTube.from_manifest and queried.
+The memory of the streams alone is measured with tracemalloc by building
+them again from format dicts allocated before tracing starts.
+
+    python benchmarks/bench_stream_memory.py [videos]
+"""
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path[:0] = [os.path.join(_root, 'env', 'lib', 'python3.8', 'site-packages')]
+
+from pytubefix import YouTube  # noqa: E402
+from pytubefix.monostate import Monostate  # noqa: E402
+from pytubefix.query import StreamQuery  # noqa: E402
+from pytubefix.streams import Stream  # noqa: E402
+
+_VIDEO = [(18, 'video/mp4; codecs="avc1.42001E, mp4a.40.2"', 640, 360)]
+_VIDEO += [(itag, 'video/mp4; codecs="avc1.4d401f"', w, h) for itag, (w, h) in zip(
+    [133, 134, 135, 136, 137, 160, 298, 299],
+    [(426, 240), (640, 360), (854, 480), (1280, 720), (1920, 1080), (256, 144), (1280, 720), (1920, 1080)])]
+_VIDEO += [(itag, 'video/webm; codecs="vp9"', w, h) for itag, (w, h) in zip(
+    [242, 243, 244, 247, 248, 278, 302, 303, 308, 313],
+    [(426, 240), (640, 360), (854, 480), (1280, 720), (1920, 1080), (256, 144), (1280, 720), (1920, 1080),
+     (2560, 1440), (3840, 2160)])]
+_VIDEO += [(itag, 'video/mp4; codecs="av01.0.05M.08"', w, h) for itag, (w, h) in zip(
+    [394, 395, 396, 397, 398, 399],
+    [(256, 144), (426, 240), (640, 360), (854, 480), (1280, 720), (1920, 1080)])]
+_AUDIO = [(139, 'audio/mp4; codecs="mp4a.40.5"'), (140, 'audio/mp4; codecs="mp4a.40.2"'),
+          (249, 'audio/webm; codecs="opus"'), (250, 'audio/webm; codecs="opus"'), (251, 'audio/webm; codecs="opus"')]
+_TRACK = {'displayName': 'English (United States) original', 'id': 'en-US.4', 'audioIsDefault': True}
+
+
+def manifest(video, rng):
+    url = f'https://rr1---sn.googlevideo.com/videoplayback?expire=9999999999&id=o-{video}&itag='
+    streams = []
+    for itag, mime, width, height in _VIDEO:
+        streams.append({'itag': itag, 'mimeType': mime, 'is_otf': False, 'bitrate': rng.randint(10 ** 5, 5 * 10 ** 6),
+                        'contentLength': str(rng.randint(10 ** 6, 5 * 10 ** 8)), 'fps': 30,
+                        'width': width, 'height': height, 'url': f'{url}{itag}'})
+    for itag, mime in _AUDIO:
+        fmt = {'itag': itag, 'mimeType': mime, 'is_otf': False, 'bitrate': rng.randint(5 * 10 ** 4, 2 * 10 ** 5),
+               'contentLength': str(rng.randint(10 ** 6, 5 * 10 ** 7)), 'url': f'{url}{itag}'}
+        if video % 10 == 0:
+            fmt['audioTrack'] = _TRACK
+        streams.append(fmt)
+    return json.dumps({'version': 1, 'video_id': f'{video:011d}', 'client': 'ANDROID_VR', 'title': f'Video {video}',
+                       'author': 'bench', 'length': 212, 'streams': streams})
+
+
+def main():
+    videos = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(1)
+    manifests = [manifest(video, rng) for video in range(videos)]
+
+    start = time.perf_counter()
+    restored = [YouTube.from_manifest(m) for m in manifests]
+    print(f'from_manifest: {videos} videos in {time.perf_counter() - start:.2f} s')
+
+    formats = [[dict(fmt) for fmt in json.loads(m)['streams']] for m in manifests]
+    count = sum(map(len, formats))
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    monostates = [Monostate(None, None, title='bench', duration=212) for _ in range(videos)]
+    streams = [[Stream(fmt, monostate) for fmt in fmts] for fmts, monostate in zip(formats, monostates)]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{count} streams: built in {elapsed:.2f} s, {current / 2 ** 20:.1f} MiB, {current / count:.0f} B per stream')
+
+    start = time.perf_counter()
+    for yt in restored[:2000]:
+        query = yt.streams
+        query.filter(progressive=False, only_video=True, file_extension='mp4').order_by('resolution').desc().first()
+        query.get_audio_only()
+        query.get_highest_resolution()
+    print(f'StreamQuery over {min(videos, 2000)} videos: {time.perf_counter() - start:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
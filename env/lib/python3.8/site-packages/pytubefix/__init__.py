@@ -16,6 +16,8 @@ from pytubefix.chapters import Chapter
 from pytubefix.keymoments import KeyMoment
 from pytubefix.query import CaptionQuery, StreamQuery
 from pytubefix.__main__ import YouTube
+from pytubefix.async_youtube import AsyncYouTube
+from pytubefix.batch import DownloadResult, download_many, resolve_many
 from pytubefix.contrib.playlist import Playlist
 from pytubefix.contrib.channel import Channel
 from pytubefix.contrib.search import Search
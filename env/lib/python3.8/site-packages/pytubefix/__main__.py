@@ -30,22 +30,45 @@ smaller peripheral modules and functions.
 
 """
 
+import json
 import logging
-from subprocess import CalledProcessError
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from subprocess import SubprocessError
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pytubefix
 import pytubefix.exceptions as exceptions
-from pytubefix import extract, request
+from pytubefix import extract, js_cache, request
 from pytubefix import Stream, StreamQuery
 from pytubefix.helpers import install_proxy
-from pytubefix.innertube import InnerTube
+from pytubefix.innertube import InnerTube, get_visitor_data, share_visitor_data
 from pytubefix.metadata import YouTubeMetadata
 from pytubefix.monostate import Monostate
 from pytubefix.botGuard import bot_guard
+from pytubefix.cipher import clear_cipher
 
 logger = logging.getLogger(__name__)
 
+_manifest_version = 1
+
+# Seconds a hedged player request may take. The requests that lose the race
+# are not waited for, but they keep a connection until they finish.
+_hedge_timeout = 30
+
+# Format fields a Stream is built from
+_manifest_stream_fields = (
+    'itag', 'mimeType', 'is_otf', 'bitrate', 'contentLength', 'fps', 'width', 'height', 'audioTrack'
+)
+
+
+def _unavailable_for_client(response: Dict) -> bool:
+    """Whether a player response asks to try the next client."""
+    playability_status = response.get('playabilityStatus', {})
+    return (
+        playability_status.get('status') == 'UNPLAYABLE'
+        and playability_status.get('reason') == 'This video is not available'
+    )
+
 
 class YouTube:
     """Core developer interface for pytubefix."""
@@ -63,6 +86,7 @@ class YouTube:
             oauth_verifier: Optional[Callable[[str, str], None]] = None,
             use_po_token: Optional[bool] = False,
             po_token_verifier: Optional[Callable[[None], Tuple[str, str]]] = None,
+            hedge_delay: Optional[float] = None,
     ):
         """Construct a :class:`YouTube <YouTube>`.
 
@@ -106,6 +130,11 @@ class YouTube:
             (Optional) Verified used to obtain the visitorData and po_token.
             The verifier will return the visitorData and po_token respectively.
             (if passed, else default verifier will be used)
+        :param float hedge_delay:
+            (Optional) Seconds to wait for the client's player response before
+            also requesting the fallback clients in parallel, 0 to request
+            them all at once. The first response with playable streams is used.
+            Defaults to None, which tries the fallback clients one after another.
         """
         # js fetched by js_url
         self._js: Optional[str] = None
@@ -121,6 +150,9 @@ class YouTube:
         self._watch_html: Optional[str] = None
         self._embed_html: Optional[str] = None
 
+        # objects embedded in the watch html, parsed in a single scan
+        self._watch_page: Optional[extract.WatchPage] = None
+
         # inline js in the html containing
         self._player_config_args: Optional[Dict] = None
         self._age_restricted: Optional[bool] = None
@@ -142,13 +174,18 @@ class YouTube:
         self.client = 'TV' if use_oauth else self.client
 
         self.fallback_clients = ['TV', 'IOS']
+        self.hedge_delay = hedge_delay
+        # Clients the hedged player request already tried
+        self._hedged_clients: List[str] = []
 
         self._signature_timestamp: dict = {}
         self._visitor_data = None
 
         # Shared between all instances of `Stream` (Borg pattern).
         self.stream_monostate = Monostate(
-            on_progress=on_progress_callback, on_complete=on_complete_callback
+            on_progress=on_progress_callback,
+            on_complete=on_complete_callback,
+            youtube=self
         )
 
         if proxies:
@@ -157,6 +194,8 @@ class YouTube:
         self._author = None
         self._title = None
         self._publish_date = None
+        # videoDetails fields known before the player response, see `_seed`
+        self._seeded_details: Dict = {}
 
         self.use_oauth = use_oauth
         self.allow_oauth_cache = allow_oauth_cache
@@ -190,11 +229,22 @@ class YouTube:
         self._embed_html = request.get(url=self.embed_url)
         return self._embed_html
 
+    @property
+    def watch_page(self) -> extract.WatchPage:
+        """The objects embedded in the watch html.
+
+        :rtype: :class:`WatchPage <WatchPage>`
+        """
+        if self._watch_page:
+            return self._watch_page
+        self._watch_page = extract.WatchPage(self.watch_html)
+        return self._watch_page
+
     @property
     def age_restricted(self):
         if self._age_restricted:
             return self._age_restricted
-        self._age_restricted = extract.is_age_restricted(self.watch_html)
+        self._age_restricted = self.watch_page.age_restricted
         return self._age_restricted
 
     @property
@@ -205,26 +255,44 @@ class YouTube:
         if self.age_restricted:
             self._js_url = extract.js_url(self.embed_html)
         else:
-            self._js_url = extract.js_url(self.watch_html)
+            self._js_url = self.watch_page.js_url
 
         return self._js_url
 
+    @js_url.setter
+    def js_url(self, value):
+        self._js_url = value
+
     @property
     def js(self):
         if self._js:
             return self._js
 
-        # If the js_url doesn't match the cached url, fetch the new js and update
-        #  the cache; otherwise, load the cache.
-        if pytubefix.__js_url__ != self.js_url:
+        # If the js_url doesn't match the cached url, load it from the disk
+        #  cache or fetch the new js and update both caches; otherwise, load
+        #  the cache.
+        self._js = self._cached_js()
+        if not self._js:
             self._js = request.get(self.js_url)
-            pytubefix.__js__ = self._js
-            pytubefix.__js_url__ = self.js_url
-        else:
-            self._js = pytubefix.__js__
+            self._cache_js(self._js)
 
         return self._js
 
+    def _cached_js(self) -> Optional[str]:
+        """Return the player js from the process or disk cache, if there."""
+        if pytubefix.__js_url__ == self.js_url:
+            return pytubefix.__js__
+        js = js_cache.load_js(self.js_url)
+        if js:
+            pytubefix.__js__ = js
+            pytubefix.__js_url__ = self.js_url
+        return js
+
+    def _cache_js(self, js: str) -> None:
+        js_cache.save_js(self.js_url, js)
+        pytubefix.__js__ = js
+        pytubefix.__js_url__ = self.js_url
+
     @property
     def visitor_data(self) -> str:
         """
@@ -233,25 +301,33 @@ class YouTube:
         if self._visitor_data:
             return self._visitor_data
 
+        # One visitorData is shared by every request of the process
+        self._visitor_data = get_visitor_data()
+        if self._visitor_data:
+            return self._visitor_data
+
         if InnerTube(self.client).require_po_token:
             try:
                 logger.debug("Looking for visitorData in initial_data")
                 self._visitor_data = extract.visitor_data(str(self.initial_data['responseContext']))
+                share_visitor_data(self._visitor_data)
                 logger.debug('VisitorData obtained successfully')
                 return self._visitor_data
             except (KeyError, pytubefix.exceptions.RegexMatchError):
                 logger.debug("Unable to obtain visitorData from initial_data. Trying to request from the WEB client")
 
         logger.debug("Looking for visitorData in InnerTube API")
-        innertube_response = InnerTube('WEB').player(self.video_id)
-        try:
-            self._visitor_data = innertube_response['responseContext']['visitorData']
-        except KeyError:
-            self._visitor_data = innertube_response['responseContext']['serviceTrackingParams'][0]['params'][6]['value']
+        self._visitor_data = get_visitor_data(self.video_id)
+        if not self._visitor_data:
+            raise pytubefix.exceptions.InnerTubeResponseError(self.video_id, 'WEB')
         logger.debug('VisitorData obtained successfully')
 
         return self._visitor_data
 
+    @visitor_data.setter
+    def visitor_data(self, value):
+        self._visitor_data = value
+
     @property
     def pot(self) -> str:
         """
@@ -265,15 +341,19 @@ class YouTube:
         try:
             self._pot = bot_guard.generate_po_token(visitor_data=self.visitor_data)
             logger.debug('PoToken generated successfully')
-        except (FileNotFoundError, CalledProcessError):
+        except (FileNotFoundError, SubprocessError):
             logger.warning('Unable to run botGuard. Skipping poToken generation')
         return self._pot
 
+    @pot.setter
+    def pot(self, value):
+        self._pot = value
+
     @property
     def initial_data(self):
         if self._initial_data:
             return self._initial_data
-        self._initial_data = extract.initial_data(self.watch_html)
+        self._initial_data = self.watch_page.initial_data
         return self._initial_data
 
     @property
@@ -294,6 +374,9 @@ class YouTube:
             #   if it fails try the next fallback client, and so on.
             # If none of the clients have valid streamingData, raise an exception.
             for client in self.fallback_clients:
+                if client in self._hedged_clients:
+                    # Already requested by the hedged player request
+                    continue
                 self.client = client
                 self.vid_info = None
                 try:
@@ -317,29 +400,30 @@ class YouTube:
         If the streams have not been initialized, finds all relevant
         streams and initializes them.
         """
-        self.check_availability()
         if self._fmt_streams:
             return self._fmt_streams
+        self.check_availability()
 
         self._fmt_streams = []
 
         stream_manifest = extract.apply_descrambler(self.streaming_data)
         inner_tube = InnerTube(self.client)
-        if self.po_token:
-            extract.apply_po_token(stream_manifest, self.vid_info, self.po_token)
-
         if inner_tube.require_js_player:
             # If the cached js doesn't work, try fetching a new js file
             # https://github.com/pytube/pytube/issues/1054
             try:
-                extract.apply_signature(stream_manifest, self.vid_info, self.js, self.js_url)
-            except exceptions.ExtractError:
+                extract.finalize_stream_urls(stream_manifest, self.vid_info, self.js, self.js_url, self.po_token)
+            except (exceptions.ExtractError, exceptions.InterpretationError):
                 # To force an update to the js file, we clear the cache and retry
+                js_cache.remove(self.js_url)
+                clear_cipher(self.js_url)
                 self._js = None
                 self._js_url = None
                 pytubefix.__js__ = None
                 pytubefix.__js_url__ = None
-                extract.apply_signature(stream_manifest, self.vid_info, self.js, self.js_url)
+                extract.finalize_stream_urls(stream_manifest, self.vid_info, self.js, self.js_url, self.po_token)
+        elif self.po_token:
+            extract.finalize_stream_urls(stream_manifest, self.vid_info, po_token=self.po_token)
 
         # build instances of :class:`Stream <Stream>`
         # Initialize stream objects
@@ -449,6 +533,124 @@ class YouTube:
             }
         return self._signature_timestamp
 
+    def _call_innertube(self, client: str, timeout: Optional[float] = None) -> Tuple[InnerTube, Dict]:
+        """Request the player response of the video with the given client."""
+        innertube = self._innertube(client)
+        if timeout is not None:
+            innertube.timeout = timeout
+        return innertube, innertube.player(self.video_id)
+
+    def _innertube(self, client: str) -> InnerTube:
+        """Return an InnerTube of the given client, ready to request this video."""
+        innertube = InnerTube(
+            client=client,
+            use_oauth=self.use_oauth,
+            allow_cache=self.allow_oauth_cache,
+            token_file=self.token_file,
+            oauth_verifier=self.oauth_verifier,
+            use_po_token=self.use_po_token,
+            po_token_verifier=self.po_token_verifier
+        )
+        if innertube.require_js_player:
+            innertube.innertube_context.update(self.signature_timestamp)
+
+        # Automatically generates a poToken
+        if innertube.require_po_token and not self.use_po_token:
+            logger.debug(f"The {client} client requires poToken to obtain functional streams")
+            logger.debug("Automatically generating poToken")
+            innertube.insert_po_token(visitor_data=self.visitor_data, po_token=self.pot)
+        elif not self.use_po_token:
+            # from 01/22/2025 all clients must send the visitorData in the API request
+            innertube.insert_visitor_data(visitor_data=self.visitor_data)
+
+        return innertube
+
+    def _use_innertube_response(self, innertube: InnerTube, response: Dict) -> Dict:
+        self.client = innertube.client_name
+
+        # Retrieves the sent poToken
+        if self.use_po_token or innertube.require_po_token:
+            self.po_token = innertube.access_po_token or self.pot
+        return response
+
+    def _hedged_innertube_response(self) -> Dict:
+        """Request the player response with the fallback clients in parallel.
+
+        The fallback clients are requested once ``hedge_delay`` expires or
+        as soon as a client returns "This video is not available", the only
+        status the sequential fallback moves on from. A response with
+        playable streams is used at once, any other one once every client
+        before it has returned that status.
+        """
+        clients = [self.client] + [
+            c for c in self.fallback_clients if c != self.client and c not in self._hedged_clients
+        ]
+
+        # Shared by every request, so resolved once before they start.
+        if not self.use_po_token:
+            self.visitor_data
+            if any(InnerTube(client).require_po_token for client in clients):
+                self.pot
+        if any(InnerTube(client).require_js_player for client in clients):
+            self.signature_timestamp
+
+        executor = ThreadPoolExecutor(max_workers=len(clients))
+        futures = {executor.submit(self._call_innertube, clients[0], _hedge_timeout): clients[0]}
+        self._hedged_clients.append(clients[0])
+        fallbacks = clients[1:]
+        results = {}
+        try:
+            while futures:
+                done, _ = wait(
+                    futures,
+                    timeout=self.hedge_delay if fallbacks else None,
+                    return_when=FIRST_COMPLETED
+                )
+                hedge = not done
+                for future in done:
+                    client = futures.pop(future)
+                    try:
+                        innertube, response = future.result()
+                    except Exception as e:
+                        logger.debug(f"{client} client failed: {e}")
+                        results[client] = e
+                        continue
+                    playability_status = response.get('playabilityStatus', {})
+                    if playability_status.get('status') == 'OK' and 'streamingData' in response:
+                        return self._use_innertube_response(innertube, response)
+                    logger.warning(f"{client} client returned: {playability_status.get('reason')}")
+                    results[client] = (innertube, response)
+                    hedge = hedge or _unavailable_for_client(response)
+
+                # Use the response the sequential fallback would have ended with
+                for client in clients:
+                    result = results.get(client)
+                    if result is None:
+                        break
+                    if not isinstance(result, Exception) and not _unavailable_for_client(result[1]):
+                        return self._use_innertube_response(*result)
+
+                if hedge:
+                    for client in fallbacks:
+                        logger.debug(f"Requesting fallback client: {client}")
+                        futures[executor.submit(self._call_innertube, client, _hedge_timeout)] = client
+                    self._hedged_clients.extend(fallbacks)
+                    fallbacks = []
+        finally:
+            # The slower requests are not waited for, they end within
+            # _hedge_timeout.
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+        # No client has playable streams, keep the first response so the
+        #   availability check reports why.
+        for client in clients:
+            result = results.get(client)
+            if result is not None and not isinstance(result, Exception):
+                return self._use_innertube_response(*result)
+        raise results[clients[0]]
+
     @property
     def vid_info(self):
         """Parse the raw vid info and return the parsed result.
@@ -458,47 +660,19 @@ class YouTube:
         if self._vid_info:
             return self._vid_info
 
-        def call_innertube():
-            innertube = InnerTube(
-                client=self.client,
-                use_oauth=self.use_oauth,
-                allow_cache=self.allow_oauth_cache,
-                token_file=self.token_file,
-                oauth_verifier=self.oauth_verifier,
-                use_po_token=self.use_po_token,
-                po_token_verifier=self.po_token_verifier
-            )
-            if innertube.require_js_player:
-                innertube.innertube_context.update(self.signature_timestamp)
-
-            # Automatically generates a poToken
-            if innertube.require_po_token and not self.use_po_token:
-                logger.debug(f"The {self.client} client requires poToken to obtain functional streams")
-                logger.debug("Automatically generating poToken")
-                innertube.insert_po_token(visitor_data=self.visitor_data, po_token=self.pot)
-            elif not self.use_po_token:
-                # from 01/22/2025 all clients must send the visitorData in the API request
-                innertube.insert_visitor_data(visitor_data=self.visitor_data)
-
-            response = innertube.player(self.video_id)
-
-            # Retrieves the sent poToken
-            if self.use_po_token or innertube.require_po_token:
-                self.po_token = innertube.access_po_token or self.pot
-            return response
-
-        innertube_response = call_innertube()
-        for client in self.fallback_clients:
-            # Some clients are unable to access certain types of videos
-            # If the video is unavailable for the current client, attempts will be made with fallback clients
-            playability_status = innertube_response['playabilityStatus']
-            if playability_status['status'] == 'UNPLAYABLE' and 'reason' in playability_status and playability_status['reason'] == 'This video is not available':
-                logger.warning(f"{self.client} client returned: This video is not available")
-                self.client = client
-                logger.warning(f"Switching to client: {client}")
-                innertube_response = call_innertube()
-            else:
-                break
+        if self.hedge_delay is not None:
+            innertube_response = self._hedged_innertube_response()
+        else:
+            innertube_response = self._use_innertube_response(*self._call_innertube(self.client))
+            for client in self.fallback_clients:
+                # Some clients are unable to access certain types of videos
+                # If the video is unavailable for the current client, attempts will be made with fallback clients
+                if _unavailable_for_client(innertube_response):
+                    logger.warning(f"{self.client} client returned: This video is not available")
+                    logger.warning(f"Switching to client: {client}")
+                    innertube_response = self._use_innertube_response(*self._call_innertube(client))
+                else:
+                    break
 
         self._vid_info = innertube_response
         if not self._vid_info:
@@ -510,6 +684,30 @@ class YouTube:
     def vid_info(self, value):
         self._vid_info = value
 
+    def _seed(self, details: Dict) -> None:
+        """Prefill the video details a listing already holds.
+
+        The title, author, length, views, thumbnail and channel id are read
+        from ``details`` until the player response is requested for anything
+        else, so listing videos does not cost a request per video.
+
+        :param dict details:
+            ``videoDetails`` fields, as returned by
+            :func:`extract.renderer_video_details`.
+        """
+        self._seeded_details = details
+        if details.get('title'):
+            self._title = details['title']
+        if details.get('author'):
+            self._author = details['author']
+
+    def _video_detail(self, key: str, default: Any = None) -> Any:
+        """Read a ``videoDetails`` field, from the seeded details if the
+        player response was not requested yet."""
+        if not self._vid_info and key in self._seeded_details:
+            return self._seeded_details[key]
+        return self.vid_info.get('videoDetails', {}).get(key, default)
+
     @property
     def vid_details(self):
         """Parse the raw vid details and return the parsed result.
@@ -711,7 +909,6 @@ class YouTube:
 
         :rtype: :class:`StreamQuery <StreamQuery>`.
         """
-        self.check_availability()
         return StreamQuery(self.fmt_streams)
 
     @property
@@ -720,11 +917,7 @@ class YouTube:
 
         :rtype: str
         """
-        thumbnail_details = (
-            self.vid_info.get("videoDetails", {})
-            .get("thumbnail", {})
-            .get("thumbnails")
-        )
+        thumbnail_details = self._video_detail("thumbnail", {}).get("thumbnails")
         if thumbnail_details:
             thumbnail_details = thumbnail_details[-1]  # last item has max size
             return thumbnail_details["url"]
@@ -739,7 +932,7 @@ class YouTube:
         """
         if self._publish_date:
             return self._publish_date
-        self._publish_date = extract.publish_date(self.watch_html)
+        self._publish_date = self.watch_page.publish_date
         return self._publish_date
 
     @publish_date.setter
@@ -753,13 +946,13 @@ class YouTube:
 
         :rtype: str
         """
+        if self._title:
+            return self._title
+
         self._author = self.vid_info.get("videoDetails", {}).get(
             "author", "unknown"
         )
 
-        if self._title:
-            return self._title
-
         try:
             # Some clients may not return the title in the `player` endpoint,
             # so if it is not found we will look for it in the `next` endpoint
@@ -837,7 +1030,7 @@ class YouTube:
 
         :rtype: int
         """
-        return int(self.vid_info.get('videoDetails', {}).get('lengthSeconds'))
+        return int(self._video_detail('lengthSeconds'))
 
     @property
     def views(self) -> int:
@@ -845,7 +1038,7 @@ class YouTube:
 
         :rtype: int
         """
-        return int(self.vid_info.get("videoDetails", {}).get("viewCount", "0"))
+        return int(self._video_detail("viewCount", "0"))
 
     @property
     def author(self) -> str:
@@ -878,7 +1071,7 @@ class YouTube:
 
         :rtype: str
         """
-        return self.vid_info.get('videoDetails', {}).get('channelId', None)
+        return self._video_detail('channelId')
 
     @property
     def channel_url(self) -> str:
@@ -957,3 +1150,80 @@ class YouTube:
         :rtype: :class:`YouTube <YouTube>`
         """
         return YouTube(f"https://www.youtube.com/watch?v={video_id}")
+
+    def to_manifest(self) -> str:
+        """Serialize the resolved streams of this video to compact json.
+
+        The manifest holds the signed stream urls along with the title, author
+        and length, so another process can download the streams with
+        :meth:`from_manifest` without resolving the video again.
+
+        :rtype: str
+        """
+        streams = []
+        for stream in self.fmt_streams:
+            fields = {key: stream._format[key] for key in _manifest_stream_fields if key in stream._format}
+            fields['url'] = stream.url
+            streams.append(fields)
+
+        return json.dumps({
+            'version': _manifest_version,
+            'video_id': self.video_id,
+            'client': self.client,
+            'po_token': self.po_token,
+            'title': self.title,
+            'author': self.author,
+            'length': self.length,
+            'streams': streams,
+        }, separators=(',', ':'))
+
+    @staticmethod
+    def from_manifest(manifest: str, **kwargs) -> "YouTube":
+        """Construct a :class:`YouTube <YouTube>` object from a manifest.
+
+        The streams are rebuilt from the manifest alone, without any request
+        or cipher work. The title, author and length come from the manifest
+        too; any other detail requests the player response when first read.
+
+        :param str manifest:
+            A manifest produced by :meth:`to_manifest`.
+        :param kwargs:
+            (Optional) Arguments passed to :class:`YouTube <YouTube>`, such as
+            ``on_progress_callback`` or ``proxies``.
+        :rtype: :class:`YouTube <YouTube>`
+        :raises ManifestExpired:
+            If the stream urls have expired.
+        """
+        try:
+            data = json.loads(manifest)
+            if data['version'] != _manifest_version:
+                raise exceptions.ManifestError(f'Unsupported manifest version: {data["version"]}')
+            video_id = data['video_id']
+            formats = data['streams']
+        except (ValueError, TypeError, KeyError) as e:
+            raise exceptions.ManifestError(f'Invalid manifest: {e}') from e
+        if not formats:
+            raise exceptions.ManifestError(f'Manifest of {video_id} has no streams')
+
+        kwargs.setdefault('client', data.get('client', 'ANDROID_VR'))
+        yt = YouTube(f"https://www.youtube.com/watch?v={video_id}", **kwargs)
+        yt.po_token = data.get('po_token')
+        # Read until the player response is needed for any other detail
+        yt._seed({
+            'videoId': video_id,
+            'title': data.get('title'),
+            'author': data.get('author'),
+            'lengthSeconds': str(data.get('length', 0)),
+        })
+
+        try:
+            streams = [Stream(stream=fmt, monostate=yt.stream_monostate) for fmt in formats]
+        except (ValueError, TypeError, KeyError) as e:
+            raise exceptions.ManifestError(f'Invalid stream in manifest of {video_id}: {e}') from e
+        if any(stream.is_expired for stream in streams):
+            raise exceptions.ManifestExpired(video_id)
+
+        yt._fmt_streams = streams
+        yt.stream_monostate.title = yt.title
+        yt.stream_monostate.duration = yt.length
+        return yt
@@ -0,0 +1,554 @@
+"""Implements the asyncio counterpart of :mod:`request` over pooled HTTP/1.1 connections.
+
+Requests are written to asyncio streams, so thousands of them can be in
+flight on a single thread. Proxied requests are left to urllib, run in the
+default executor.
+"""
+import asyncio
+import functools
+import http.client
+import io
+import json
+import logging
+import socket
+import ssl
+import weakref
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib import parse
+from urllib.error import HTTPError, URLError
+
+from pytubefix import request
+from pytubefix.exceptions import MaxRetriesExceeded
+
+logger = logging.getLogger(__name__)
+default_chunk_size = 65536  # bytes read from a response at a time
+
+
+async def _wait(awaitable, timeout: Optional[float]):
+    """Await ``awaitable``, raising :class:`socket.timeout` after ``timeout`` seconds."""
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise socket.timeout('timed out')
+
+
+class _Connection:
+    """A keep-alive connection, as the reader and writer of its stream."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncResponse:
+    """HTTP response that hands its connection back to the pool once read."""
+
+    def __init__(self, pool, key, conn, url, status, reason, headers, method, timeout):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._timeout = timeout
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+
+        self._will_close = headers.get('Connection', '').lower() == 'close'
+        self._chunked = 'chunked' in headers.get('Transfer-Encoding', '').lower()
+        self._chunk_left = 0
+        length = headers.get('Content-Length')
+        # Bytes of body left to read, None when it ends with a last chunk or the connection
+        self._remaining: Optional[int] = None
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            self._remaining = 0
+        elif not self._chunked:
+            if length and length.isdigit():
+                self._remaining = int(length)
+            else:
+                self._will_close = True
+        if self._remaining == 0:
+            self._release()
+
+    async def read(self, amt: Optional[int] = None) -> bytes:
+        """Read up to ``amt`` bytes of the body, or all of it.
+
+        :rtype: bytes
+        :returns:
+            Empty bytes once the body has been read.
+        """
+        if self._conn is None:
+            return b''
+        try:
+            if self._chunked:
+                data = await self._read_chunked(amt)
+            elif self._remaining is None:
+                reader = self._conn.reader
+                data = await _wait(reader.read(-1 if amt is None else amt), self._timeout)
+                if not data:
+                    self._release()
+            else:
+                data = await self._read_length(amt)
+        except BaseException:
+            self.close()
+            raise
+        return data
+
+    async def _read_length(self, amt: Optional[int]) -> bytes:
+        reader = self._conn.reader
+        size = self._remaining if amt is None else min(amt, self._remaining)
+        try:
+            if amt is None:
+                data = await _wait(reader.readexactly(size), self._timeout)
+            else:
+                data = await _wait(reader.read(size), self._timeout)
+        except asyncio.IncompleteReadError as e:
+            raise http.client.IncompleteRead(e.partial, self._remaining - len(e.partial))
+        if not data and size:
+            raise http.client.IncompleteRead(b'', self._remaining)
+        self._remaining -= len(data)
+        if self._remaining == 0:
+            self._release()
+        return data
+
+    async def _read_chunked(self, amt: Optional[int]) -> bytes:
+        reader = self._conn.reader
+        parts = []
+        received = 0
+        while amt is None or received < amt:
+            if self._chunk_left == 0:
+                line = await _wait(reader.readline(), self._timeout)
+                try:
+                    size = int(line.split(b';', 1)[0], 16)
+                except ValueError:
+                    raise http.client.IncompleteRead(b''.join(parts))
+                if size == 0:
+                    # Skip the trailers up to the blank line ending the body
+                    while (await _wait(reader.readline(), self._timeout)) not in (b'\r\n', b'\n', b''):
+                        pass
+                    self._release()
+                    break
+                self._chunk_left = size
+            size = self._chunk_left if amt is None else min(self._chunk_left, amt - received)
+            data = await _wait(reader.read(size), self._timeout)
+            if not data:
+                raise http.client.IncompleteRead(b''.join(parts))
+            self._chunk_left -= len(data)
+            if self._chunk_left == 0:
+                await _wait(reader.readexactly(2), self._timeout)
+            parts.append(data)
+            received += len(data)
+        return b''.join(parts)
+
+    def info(self):
+        return self.headers
+
+    def getcode(self):
+        return self.status
+
+    def geturl(self):
+        return self.url
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+    def close(self):
+        if self._conn is not None:
+            # A partially read body leaves the connection unusable
+            self._conn.close()
+            self._conn = None
+
+    def _release(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        if self._will_close:
+            conn.close()
+        else:
+            self._pool.put(self._key, conn)
+
+
+class _ThreadedResponse:
+    """Blocking urllib response read in the default executor."""
+
+    def __init__(self, response):
+        self._response = response
+        self.url = response.geturl()
+        self.status = response.getcode()
+        self.reason = getattr(response, 'reason', None)
+        self.headers = response.info()
+
+    async def read(self, amt: Optional[int] = None) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._response.read, amt)
+
+    def info(self):
+        return self.headers
+
+    def getcode(self):
+        return self.status
+
+    def geturl(self):
+        return self.url
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+    def close(self):
+        self._response.close()
+
+
+class AsyncConnectionPool:
+    """Pool of keep-alive connections keyed by host, for one event loop.
+
+    Connections are checked out for a single request and returned once the
+    response body has been fully read. At most
+    ``request.default_max_idle_connections`` idle connections are kept per host.
+    """
+
+    def __init__(self):
+        self._idle: Dict[Tuple[str, str, int], list] = {}
+        self._ssl_context = None
+
+    async def urlopen(self, method, url, headers, data=None, timeout=None) -> AsyncResponse:
+        """Send a request, following redirects like :func:`urllib.request.urlopen`."""
+        for _ in range(request._max_redirects + 1):
+            response = await self._send(method, url, headers, data, timeout)
+            location = response.getheader("Location")
+            if response.status not in request._redirect_codes or not location:
+                break
+            await response.read()
+            url = parse.urljoin(url, location)
+            if response.status != 307 and response.status != 308 and method not in ("GET", "HEAD"):
+                method, data = "GET", None
+                headers = {
+                    k: v for k, v in headers.items()
+                    if k.lower() not in ("content-type", "content-length")
+                }
+
+        if not 200 <= response.status < 300:
+            body = await response.read()
+            raise HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+        return response
+
+    def put(self, key, conn: _Connection) -> None:
+        """Return an idle connection to the pool."""
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < request.default_max_idle_connections and not conn.writer.is_closing():
+            idle.append(conn)
+            return
+        conn.close()
+
+    def clear(self) -> None:
+        """Close every idle connection."""
+        idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    async def _acquire(self, key, timeout, fresh=False) -> Tuple[_Connection, bool]:
+        if not fresh:
+            idle = self._idle.get(key)
+            while idle:
+                conn = idle.pop()
+                if not conn.writer.is_closing():
+                    return conn, True
+                conn.close()
+
+        scheme, host, port = key
+        ssl_context = None
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+        try:
+            reader, writer = await _wait(
+                asyncio.open_connection(host, port, ssl=ssl_context), timeout
+            )
+        except OSError as err:
+            raise URLError(err)
+        return _Connection(reader, writer), False
+
+    async def _send(self, method, url, headers, data, timeout) -> AsyncResponse:
+        split_url = parse.urlsplit(url)
+        scheme = split_url.scheme.lower()
+        default_port = 443 if scheme == "https" else 80
+        key = (scheme, split_url.hostname, split_url.port or default_port)
+        selector = split_url.path or "/"
+        if split_url.query:
+            selector = f"{selector}?{split_url.query}"
+
+        host = split_url.hostname
+        if split_url.port and split_url.port != default_port:
+            host = f"{host}:{split_url.port}"
+        lines = [f"{method} {selector} HTTP/1.1", f"Host: {host}", "Accept-Encoding: identity"]
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        if data is not None:
+            lines.append(f"Content-Length: {len(data)}")
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("iso-8859-1")
+
+        # A reused connection may have been closed by the server while idle,
+        # in that case the request is retried once on a new connection.
+        for attempt in range(2):
+            conn, reused = await self._acquire(key, timeout, fresh=attempt > 0)
+            try:
+                conn.writer.write(head + (data or b""))
+                await _wait(conn.writer.drain(), timeout)
+                status_line = await _wait(conn.reader.readline(), timeout)
+                if not status_line:
+                    raise ConnectionResetError("Remote end closed connection without response")
+                header_lines = []
+                while True:
+                    line = await _wait(conn.reader.readline(), timeout)
+                    header_lines.append(line)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+            except (ConnectionError, asyncio.IncompleteReadError) as err:
+                conn.close()
+                if reused:
+                    continue
+                raise URLError(err)
+            except BaseException:
+                conn.close()
+                raise
+
+            version, _, rest = status_line.decode("iso-8859-1").strip().partition(" ")
+            status, _, reason = rest.partition(" ")
+            response_headers = http.client.parse_headers(io.BytesIO(b"".join(header_lines)))
+            response = AsyncResponse(
+                self, key, conn, url, int(status), reason, response_headers, method, timeout
+            )
+            if version == "HTTP/1.0":
+                response._will_close = True
+            return response
+
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncConnectionPool]" = weakref.WeakKeyDictionary()
+
+
+def _get_pool() -> AsyncConnectionPool:
+    # asyncio streams belong to the loop that opened them
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = AsyncConnectionPool()
+    return pool
+
+
+def close_connections() -> None:
+    """Close the idle connections of the running event loop."""
+    _get_pool().clear()
+
+
+async def _execute_request(
+    url,
+    method=None,
+    headers=None,
+    data=None,
+    timeout=None
+):
+    if data and not isinstance(data, bytes):  # encode data for request
+        data = bytes(json.dumps(data), encoding="utf-8")
+    if not url.lower().startswith("http"):
+        raise ValueError("Invalid URL")
+    if request._is_proxied(url):
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, functools.partial(
+            request._execute_request,
+            url,
+            method=method,
+            headers=headers,
+            data=data,
+            timeout=socket._GLOBAL_DEFAULT_TIMEOUT if timeout is None else timeout
+        ))
+        return _ThreadedResponse(response)
+
+    base_headers = {"User-Agent": "Mozilla/5.0", "accept-language": "en-US,en"}
+    if headers:
+        base_headers.update(headers)
+    method = method or ("GET" if data is None else "POST")
+    return await _get_pool().urlopen(method, url, base_headers, data=data, timeout=timeout)
+
+
+async def get(url, extra_headers=None, timeout=None) -> str:
+    """Send an http GET request.
+
+    :param str url:
+        The URL to perform the GET request for.
+    :param dict extra_headers:
+        Extra headers to add to the request
+    :rtype: str
+    :returns:
+        UTF-8 encoded string of response
+    """
+    response = await _execute_request(url, headers=extra_headers or {}, timeout=timeout)
+    return (await response.read()).decode("utf-8")
+
+
+async def post(url, extra_headers=None, data=None, timeout=None) -> str:
+    """Send an http POST request.
+
+    :param str url:
+        The URL to perform the POST request for.
+    :param dict extra_headers:
+        Extra headers to add to the request
+    :param dict data:
+        The data to send on the POST request
+    :rtype: str
+    :returns:
+        UTF-8 encoded string of response
+    """
+    extra_headers = dict(extra_headers or {})
+    # required because the youtube servers are strict on content type
+    extra_headers.update({"Content-Type": "application/json"})
+    response = await _execute_request(
+        url,
+        headers=extra_headers,
+        data=data if data is not None else {},
+        timeout=timeout
+    )
+    return (await response.read()).decode("utf-8")
+
+
+async def head(url) -> Dict[str, str]:
+    """Fetch headers returned http GET request.
+
+    :param str url:
+        The URL to perform the GET request for.
+    :rtype: dict
+    :returns:
+        dictionary of lowercase headers
+    """
+    response = await _execute_request(url, method="HEAD")
+    return {k.lower(): v for k, v in response.info().items()}
+
+
+async def filesize(url) -> int:
+    """Fetch size in bytes of file at given URL
+
+    :param str url: The URL to get the size of
+    :returns: int: size in bytes of remote file
+    """
+    return int((await head(url))["content-length"])
+
+
+async def seq_filesize(url) -> int:
+    """Fetch size in bytes of file at given URL from sequential requests
+
+    :param str url: The URL to get the size of
+    :returns: int: size in bytes of remote file
+    """
+    sequence_url = request._sequence_urls(url)
+    header = await (await _execute_request(sequence_url(0), method="GET")).read()
+    segment_count = request._segment_count(header)
+
+    # The segment sizes are requested a few at a time
+    semaphore = asyncio.Semaphore(request.default_max_connections)
+
+    async def segment_size(seq_num):
+        async with semaphore:
+            return await filesize(sequence_url(seq_num))
+
+    sizes = await asyncio.gather(*(segment_size(n) for n in range(1, segment_count + 1)))
+    return len(header) + sum(sizes)
+
+
+async def stream(url,
+                 timeout=None,
+                 max_retries=0,
+                 filesize=None,
+                 chunk_size=None) -> AsyncIterator[bytes]:
+    """Read the response in chunks.
+
+    Ranges of ``request.default_range_size`` bytes are requested one after
+    another and read ``chunk_size`` bytes at a time, so only one chunk is
+    held in memory.
+
+    :param str url: The URL to perform the GET request for.
+    :param int filesize: (Optional) Size of the stream in bytes.
+    :param int chunk_size: (Optional) Defaults to ``default_chunk_size``.
+    :rtype: AsyncIterator[bytes]
+    """
+    chunk_size = chunk_size or default_chunk_size
+    file_size = filesize or None
+    downloaded = 0
+    while file_size is None or downloaded < file_size:
+        stop_pos = downloaded + request.default_range_size - 1
+        if file_size is not None:
+            stop_pos = min(stop_pos, file_size - 1)
+        tries = 0
+
+        # Attempt to make the request multiple times as necessary.
+        while True:
+            if tries >= 1 + max_retries:
+                raise MaxRetriesExceeded()
+            try:
+                response = await _execute_request(
+                    f"{url}&range={downloaded}-{stop_pos}",
+                    method="GET",
+                    timeout=timeout
+                )
+            except URLError as e:
+                # Only timeouts are retried
+                if not isinstance(e.reason, socket.timeout):
+                    raise
+            except socket.timeout:
+                pass
+            else:
+                break
+            tries += 1
+
+        if file_size is None:
+            file_size = request._total_size(response, stop_pos - downloaded + 1)
+        if file_size is None:
+            try:
+                file_size = int((await head(url))["content-length"])
+            except (HTTPError, KeyError, ValueError) as e:
+                # Without a size, keep requesting until a range comes back empty.
+                logger.error(e)
+                file_size = None
+
+        received = 0
+        try:
+            while True:
+                chunk = await response.read(chunk_size)
+                if not chunk:
+                    break
+                received += len(chunk)
+                downloaded += len(chunk)
+                yield chunk
+        finally:
+            response.close()
+
+        if not received:
+            return
+
+
+async def seq_stream(url,
+                     timeout=None,
+                     max_retries=0,
+                     chunk_size=None) -> AsyncIterator[bytes]:
+    """Read the segments of a sequential (OTF) stream in order.
+
+    :param str url: The URL to perform the GET request for.
+    :param int chunk_size: (Optional) Defaults to ``default_chunk_size``.
+    :rtype: AsyncIterator[bytes]
+    """
+    sequence_url = request._sequence_urls(url)
+
+    # The 0th sequential request provides the file headers, which tell us
+    #  information about how the file is segmented.
+    header_chunks = []
+    async for chunk in stream(sequence_url(0), timeout=timeout, max_retries=max_retries, chunk_size=chunk_size):
+        yield chunk
+        header_chunks.append(chunk)
+    segment_count = request._segment_count(b''.join(header_chunks))
+
+    for seq_num in range(1, segment_count + 1):
+        async for chunk in stream(sequence_url(seq_num), timeout=timeout, max_retries=max_retries,
+                                  chunk_size=chunk_size):
+            yield chunk
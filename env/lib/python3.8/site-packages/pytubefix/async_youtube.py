@@ -0,0 +1,202 @@
+"""This module resolves videos with asyncio instead of blocking requests."""
+import asyncio
+import logging
+from typing import Dict, Tuple
+
+import pytubefix.exceptions as exceptions
+from pytubefix import async_request
+from pytubefix.__main__ import YouTube, _unavailable_for_client
+from pytubefix.innertube import InnerTube, get_visitor_data
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncYouTube(YouTube):
+    """A :class:`YouTube <YouTube>` whose requests are awaited.
+
+    ``await yt.resolve()`` fetches everything the streams and the video
+    details need. The properties then only parse what was fetched, with the
+    same code as :class:`YouTube <YouTube>`, and streams are downloaded with
+    :meth:`Stream.download_async` or :meth:`Stream.aiter_chunks`.
+
+    **Example**:
+
+    >>> async def main():
+    ...     yt = await AsyncYouTube('https://youtube.com/watch?v=2lAe1cqCOXo').resolve()
+    ...     print(yt.title)
+    ...     await yt.streams.get_highest_resolution().download_async()
+    >>> asyncio.run(main())
+
+    Requests that only happen once per process or need a user, such as the
+    visitorData, the poToken and the oauth tokens, run in the default
+    executor, as does building the streams. Anything not fetched by
+    :meth:`resolve` is still requested synchronously when accessed.
+    """
+
+    async def resolve(self) -> "AsyncYouTube":
+        """Fetch the player response, the player js and build the streams.
+
+        :rtype: :class:`AsyncYouTube <AsyncYouTube>`
+        """
+        if self._fmt_streams:
+            return self
+
+        if not self._vid_info:
+            await self._fetch_vid_info()
+        self.check_availability()
+
+        if 'streamingData' not in self._vid_info:
+            original_client = self.client
+            for client in self.fallback_clients:
+                if client in self._hedged_clients:
+                    # Already requested by the hedged player request
+                    continue
+                try:
+                    self.vid_info = await self._player_response(client)
+                    self.check_availability()
+                except exceptions.VideoUnavailable:
+                    continue
+                if 'streamingData' in self._vid_info:
+                    break
+            if 'streamingData' not in self._vid_info:
+                raise exceptions.UnknownVideoError(video_id=self.video_id,
+                                                   developer_message=f'Streaming data is missing, '
+                                                                     f'original client: {original_client}, '
+                                                                     f'fallback clients: {self.fallback_clients}')
+
+        if InnerTube(self.client).require_js_player:
+            await self._fetch_js()
+        # Everything is fetched, but the cipher work may still block: a failed
+        # decipher requests the player js again and the title may need the
+        # next endpoint.
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: self.fmt_streams)
+        return self
+
+    async def _fetch_vid_info(self) -> None:
+        if self.hedge_delay is not None:
+            response = await self._hedged_player_response()
+        else:
+            response = await self._player_response(self.client)
+            for client in self.fallback_clients:
+                # Some clients are unable to access certain types of videos
+                if _unavailable_for_client(response):
+                    logger.warning(f"{self.client} client returned: This video is not available")
+                    logger.warning(f"Switching to client: {client}")
+                    response = await self._player_response(client)
+                else:
+                    break
+
+        if not response:
+            raise exceptions.InnerTubeResponseError(self.video_id, self.client)
+        self.vid_info = response
+
+    async def _hedged_player_response(self) -> Dict:
+        """Request the player response with the fallback clients in parallel.
+
+        The responses are chosen as in
+        :meth:`YouTube._hedged_innertube_response`, but the requests that
+        lose the race are cancelled.
+        """
+        clients = [self.client] + [
+            c for c in self.fallback_clients if c != self.client and c not in self._hedged_clients
+        ]
+
+        # Shared by every request, so fetched once before they start.
+        for client in clients:
+            await self._prepare_client(client)
+
+        tasks = {asyncio.ensure_future(self._call_innertube_async(clients[0])): clients[0]}
+        self._hedged_clients.append(clients[0])
+        fallbacks = clients[1:]
+        results = {}
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(
+                    set(tasks),
+                    timeout=self.hedge_delay if fallbacks else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                hedge = not done
+                for task in done:
+                    client = tasks.pop(task)
+                    try:
+                        innertube, response = task.result()
+                    except Exception as e:
+                        logger.debug(f"{client} client failed: {e}")
+                        results[client] = e
+                        continue
+                    playability_status = response.get('playabilityStatus', {})
+                    if playability_status.get('status') == 'OK' and 'streamingData' in response:
+                        return self._use_innertube_response(innertube, response)
+                    logger.warning(f"{client} client returned: {playability_status.get('reason')}")
+                    results[client] = (innertube, response)
+                    hedge = hedge or _unavailable_for_client(response)
+
+                # Use the response the sequential fallback would have ended with
+                for client in clients:
+                    result = results.get(client)
+                    if result is None:
+                        break
+                    if not isinstance(result, Exception) and not _unavailable_for_client(result[1]):
+                        return self._use_innertube_response(*result)
+
+                if hedge:
+                    for client in fallbacks:
+                        logger.debug(f"Requesting fallback client: {client}")
+                        tasks[asyncio.ensure_future(self._call_innertube_async(client))] = client
+                    self._hedged_clients.extend(fallbacks)
+                    fallbacks = []
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # No client has playable streams, keep the first response so the
+        #   availability check reports why.
+        for client in clients:
+            result = results.get(client)
+            if result is not None and not isinstance(result, Exception):
+                return self._use_innertube_response(*result)
+        raise results[clients[0]]
+
+    async def _player_response(self, client: str) -> Dict:
+        """Request the player response of the video with the given client."""
+        return self._use_innertube_response(*await self._call_innertube_async(client))
+
+    async def _call_innertube_async(self, client: str) -> Tuple[InnerTube, Dict]:
+        await self._prepare_client(client)
+        innertube = self._innertube(client)
+        return innertube, await innertube.player_async(self.video_id)
+
+    async def _prepare_client(self, client: str) -> None:
+        """Fetch what a player request of the given client needs."""
+        loop = asyncio.get_running_loop()
+        required = InnerTube(client)
+        if required.require_js_player:
+            await self._fetch_js()
+
+        if not self.use_po_token and not self._visitor_data:
+            self._visitor_data = get_visitor_data()
+            if not self._visitor_data:
+                if required.require_po_token:
+                    await self._fetch_watch_html()
+                await loop.run_in_executor(None, lambda: self.visitor_data)
+        if required.require_po_token and not self.use_po_token and not self._pot:
+            # botGuard runs in a node process
+            await loop.run_in_executor(None, lambda: self.pot)
+
+    async def _fetch_watch_html(self) -> None:
+        if self._watch_html is None:
+            self._watch_html = await async_request.get(self.watch_url)
+
+    async def _fetch_js(self) -> None:
+        if self._js:
+            return
+        if not self._js_url:
+            await self._fetch_watch_html()
+            if self.age_restricted and self._embed_html is None:
+                self._embed_html = await async_request.get(self.embed_url)
+        self._js = self._cached_js()
+        if not self._js:
+            self._js = await async_request.get(self.js_url)
+            self._cache_js(self._js)
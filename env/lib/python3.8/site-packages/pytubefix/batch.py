@@ -0,0 +1,406 @@
+"""This module resolves and downloads many videos concurrently."""
+import json
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import pytubefix.exceptions as exceptions
+from pytubefix import extract
+from pytubefix.__main__ import YouTube
+from pytubefix.innertube import InnerTube, _default_po_token_verifier
+from pytubefix.streams import Stream
+
+logger = logging.getLogger(__name__)
+
+
+class _SharedValues:
+    """Values computed once and then reused by every video of a batch."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+
+    def get(self, name: str, compute: Callable[[], Any]) -> Any:
+        # Computed while holding the lock, so the other workers wait for the
+        # first result instead of all requesting the same thing.
+        with self._lock:
+            if name not in self._values:
+                self._values[name] = compute()
+            return self._values[name]
+
+
+def _resolve(video_id: str, shared: _SharedValues, kwargs: Dict[str, Any]) -> YouTube:
+    url = video_id if '/' in video_id else f'https://youtube.com/watch?v={video_id}'
+    yt = YouTube(url, **kwargs)
+    innertube = InnerTube(yt.client)
+
+    if innertube.require_po_token and not yt.use_po_token:
+        pot = shared.get('pot', lambda: yt.pot)
+        if pot:
+            yt.pot = pot
+    if innertube.require_js_player:
+        # The player is the same for every video, so only the first one
+        # needs to read it from its watch page.
+        yt.js_url = shared.get('js_url', lambda: yt.js_url)
+        shared.get('js', lambda: yt.js)
+
+    # Populates vid_info and the deciphered streams.
+    yt.streams
+    return yt
+
+
+def _share_po_token_verifier(shared: _SharedValues, kwargs: Dict[str, Any]) -> None:
+    if kwargs.get('use_po_token'):
+        # Ask for the visitorData and poToken once, not once per video.
+        verifier = kwargs.get('po_token_verifier') or _default_po_token_verifier
+        kwargs['po_token_verifier'] = lambda: shared.get('po_token_verifier', verifier)
+
+
+def resolve_many(
+        video_ids: Iterable[str],
+        max_workers: int = 8,
+        **kwargs
+) -> Iterator[Tuple[str, Union[YouTube, Exception]]]:
+    """Resolve many videos concurrently.
+
+    The visitorData, the poToken and the player js are obtained once and
+    shared by the whole batch, as is the cipher built from the player.
+
+    **Example**:
+
+    >>> for video_id, result in resolve_many(['2lAe1cqCOXo', 'jNQXAC9IVRw']):
+    ...     if isinstance(result, Exception):
+    ...         print(video_id, 'failed:', result)
+    ...     else:
+    ...         print(video_id, result.title, len(result.streams))
+
+    :param video_ids:
+        Ids (or urls) of the videos to resolve.
+    :param int max_workers:
+        (Optional) Number of videos resolved at the same time.
+    :param kwargs:
+        (Optional) Arguments passed to every :class:`YouTube <YouTube>`,
+        such as ``client``, ``proxies`` or ``use_po_token``.
+    :rtype: Iterator[Tuple[str, Union[YouTube, Exception]]]
+    :returns:
+        ``(video_id, result)`` pairs in the order they complete, where result
+        is a :class:`YouTube <YouTube>` with its streams populated or the
+        exception raised while resolving it.
+    """
+    shared = _SharedValues()
+    _share_po_token_verifier(shared, kwargs)
+
+    video_ids = iter(video_ids)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {}
+
+    def submit_next() -> bool:
+        for video_id in video_ids:
+            futures[executor.submit(_resolve, video_id, shared, kwargs)] = video_id
+            return True
+        return False
+
+    try:
+        # Only as many videos as there are workers are submitted, so
+        # stopping early leaves nothing queued.
+        while len(futures) < max_workers and submit_next():
+            pass
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                video_id = futures.pop(future)
+                submit_next()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.debug(f'Unable to resolve {video_id}: {e}')
+                    result = e
+                yield video_id, result
+    finally:
+        # Stop early if the caller stops iterating.
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+class DownloadResult:
+    """Outcome of one video of :func:`download_many`."""
+
+    def __init__(
+            self,
+            video_id: str,
+            status: str,
+            file_path: Optional[str] = None,
+            error: Optional[Exception] = None
+    ):
+        self.video_id = video_id
+        # 'downloaded', 'skipped' (done by a previous run), 'failed' or 'interrupted'
+        self.status = status
+        self.file_path = file_path
+        self.error = error
+
+    def __repr__(self):
+        return f'<pytubefix.batch.DownloadResult: video_id={self.video_id}, status={self.status}>'
+
+
+class _HostLimiter:
+    """Semaphores limiting the downloads from each host."""
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+
+    def semaphore(self, url: str) -> threading.Semaphore:
+        host = urlsplit(url).hostname or ''
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.Semaphore(self._limit)
+            return self._semaphores[host]
+
+    @contextmanager
+    def hold(self, stream: Stream) -> Iterator[None]:
+        """Hold a slot of the host of ``stream.url`` while it downloads.
+
+        A url re-signed during the download may point to another host, so
+        the slot then moves to the host of the new url.
+        """
+        held = self.semaphore(stream.url)
+        held.acquire()
+
+        def move(refreshed: Stream) -> None:
+            nonlocal held
+            semaphore = self.semaphore(refreshed.url)
+            if semaphore is not held:
+                # Released first, so two downloads swapping hosts cannot deadlock
+                held.release()
+                semaphore.acquire()
+                held = semaphore
+
+        monostate = stream._monostate
+        monostate.on_url_refresh = move
+        try:
+            yield
+        finally:
+            monostate.on_url_refresh = None
+            held.release()
+
+
+class _Journal:
+    """Append-only record of the videos already downloaded to a directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done: Dict[str, str] = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.done[entry['video_id']] = entry['file_path']
+                    except (ValueError, KeyError, TypeError):
+                        # The last line may be cut short by an interruption
+                        continue
+        except OSError:
+            pass
+
+    def completed(self, video_id: str) -> Optional[str]:
+        file_path = self.done.get(video_id)
+        if file_path and os.path.exists(file_path):
+            return file_path
+        return None
+
+    def add(self, video_id: str, file_path: str) -> None:
+        with self._lock:
+            self.done[video_id] = file_path
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'video_id': video_id, 'file_path': file_path}) + '\n')
+
+
+def _video_ids(source: Union[str, Iterable[Any]]) -> Iterator[str]:
+    if isinstance(source, str):
+        source = [source]
+    # Playlists and channels yield urls or YouTube objects page by page
+    for item in source:
+        if isinstance(item, YouTube):
+            yield item.video_id
+        elif isinstance(item, str):
+            yield extract.video_id(item) if '/' in item or '=' in item else item
+        else:
+            logger.debug(f'skipping {item}, it is not a video')
+
+
+def _default_stream(youtube: YouTube) -> Optional[Stream]:
+    return youtube.streams.get_highest_resolution()
+
+
+def _download(
+        youtube: YouTube,
+        select_stream: Callable[[YouTube], Optional[Stream]],
+        hosts: _HostLimiter,
+        download_kwargs: Dict[str, Any]
+) -> Optional[str]:
+    interrupted = download_kwargs['interrupt_checker']
+    if interrupted():
+        return None
+    stream = select_stream(youtube)
+    if stream is None:
+        raise exceptions.PytubeFixError(f'{youtube.video_id}: no stream to download')
+    with hosts.hold(stream):
+        # Waiting for the host may take a while
+        if interrupted():
+            return None
+        return stream.download(**download_kwargs)
+
+
+def download_many(
+        source: Union[str, Iterable[Any]],
+        output_path: Optional[str] = None,
+        select_stream: Optional[Callable[[YouTube], Optional[Stream]]] = None,
+        max_resolvers: int = 4,
+        max_downloads: int = 4,
+        max_per_host: int = 2,
+        journal_file: Optional[str] = None,
+        interrupt_checker: Optional[Callable[[], bool]] = None,
+        max_retries: int = 0,
+        max_connections: Optional[int] = None,
+        **kwargs
+) -> List[DownloadResult]:
+    """Download every video of a playlist, a channel or a list of urls.
+
+    Videos are resolved on one pool of ``max_resolvers`` threads, as with
+    :func:`resolve_many`, and their streams downloaded on another one, so
+    requesting the next players overlaps with the downloads. Only a few
+    videos are resolved ahead of the downloads, so their urls are fresh.
+
+    Every finished video is recorded in ``journal_file``. Running again with
+    the same journal skips those without any request, and a video that was
+    interrupted continues from its ``.part`` file.
+
+    **Example**:
+
+    >>> results = download_many(Channel('https://www.youtube.com/@ProgrammingKnowledge'), 'mirror')
+    >>> failed = [r for r in results if r.status == 'failed']
+
+    :param source:
+        A :class:`Playlist <Playlist>`, a :class:`Channel <Channel>`, or
+        urls or ids of videos.
+    :param str output_path:
+        (Optional) Directory the videos are saved to. Defaults to the
+        current directory.
+    :param Callable select_stream:
+        (Optional) Returns the stream to download of a resolved video.
+        Defaults to the highest resolution progressive stream.
+    :param int max_resolvers:
+        (Optional) Number of videos resolved at the same time.
+    :param int max_downloads:
+        (Optional) Number of streams downloaded at the same time.
+    :param int max_per_host:
+        (Optional) Number of streams downloaded at the same time from the
+        same host.
+    :param str journal_file:
+        (Optional) Path of the journal of finished videos. Defaults to
+        ``.pytubefix-journal.jsonl`` in ``output_path``.
+    :param Callable interrupt_checker:
+        (Optional) Checked while downloading. Once it returns True, no more
+        videos are started and the running downloads stop, keeping their
+        ``.part`` files.
+    :param int max_retries:
+        (Optional) Passed to :meth:`Stream.download`.
+    :param int max_connections:
+        (Optional) Byte ranges of each stream fetched concurrently, passed to
+        :meth:`Stream.download`.
+    :param kwargs:
+        (Optional) Arguments passed to every :class:`YouTube <YouTube>`,
+        such as ``client``, ``proxies`` or ``on_progress_callback``.
+    :rtype: List[DownloadResult]
+    :returns:
+        A :class:`DownloadResult <DownloadResult>` per video, in the order of
+        ``source``.
+    """
+    output_path = output_path or os.getcwd()
+    journal = _Journal(journal_file or os.path.join(output_path, '.pytubefix-journal.jsonl'))
+    select_stream = select_stream or _default_stream
+    hosts = _HostLimiter(max_per_host)
+    stopped = threading.Event()
+
+    def interrupted() -> bool:
+        if not stopped.is_set() and interrupt_checker is not None and interrupt_checker():
+            stopped.set()
+        return stopped.is_set()
+
+    download_kwargs = {
+        'output_path': output_path,
+        'max_retries': max_retries,
+        'max_connections': max_connections,
+        'interrupt_checker': interrupted,
+    }
+
+    shared = _SharedValues()
+    _share_po_token_verifier(shared, kwargs)
+
+    results: Dict[str, DownloadResult] = {}
+    order: List[str] = []
+    seen = set()
+    video_ids = _video_ids(source)
+    resolvers = ThreadPoolExecutor(max_workers=max_resolvers)
+    downloaders = ThreadPoolExecutor(max_workers=max_downloads)
+    futures = {}
+
+    def submit_next() -> bool:
+        for video_id in video_ids:
+            if video_id in seen:
+                continue
+            seen.add(video_id)
+            order.append(video_id)
+            file_path = journal.completed(video_id)
+            if file_path:
+                results[video_id] = DownloadResult(video_id, 'skipped', file_path)
+                continue
+            futures[resolvers.submit(_resolve, video_id, shared, kwargs)] = (video_id, False)
+            return True
+        return False
+
+    try:
+        # Resolved videos wait for a download slot, so keep as many in flight
+        # as both pools can work on
+        while not interrupted() and len(futures) < max_resolvers + max_downloads and submit_next():
+            pass
+        while futures:
+            done, _ = wait(futures, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                video_id, downloading = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.info(f'{video_id} failed: {e}')
+                    results[video_id] = DownloadResult(video_id, 'failed', error=e)
+                    continue
+                if not downloading and interrupted():
+                    results[video_id] = DownloadResult(video_id, 'interrupted')
+                elif not downloading:
+                    futures[downloaders.submit(_download, result, select_stream, hosts, download_kwargs)] = (
+                        video_id, True)
+                elif result is None:
+                    results[video_id] = DownloadResult(video_id, 'interrupted')
+                else:
+                    logger.info(f'{video_id} downloaded to {result}')
+                    journal.add(video_id, result)
+                    results[video_id] = DownloadResult(video_id, 'downloaded', result)
+            while not interrupted() and len(futures) < max_resolvers + max_downloads and submit_next():
+                pass
+    finally:
+        # Stops the running downloads if the caller was interrupted
+        stopped.set()
+        for future in futures:
+            future.cancel()
+        resolvers.shutdown(wait=True)
+        downloaders.shutdown(wait=True)
+
+    return [results.get(video_id) or DownloadResult(video_id, 'interrupted') for video_id in order]
@@ -1,6 +1,14 @@
+import json
+import logging
 import os
+import queue
 import subprocess
 import sys
+import threading
+import time
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
 
 PLATFORM = sys.platform
 
@@ -13,14 +21,224 @@ if not os.path.isfile(NODE_PATH):
 
 VM_PATH = os.path.dirname(os.path.realpath(__file__)) + '/vm/botGuard.js'
 
+WORKER_PATH = os.path.dirname(os.path.realpath(__file__)) + '/vm/worker.js'
+
+max_workers = 2  # node processes kept running to generate poTokens
+worker_timeout = 60  # seconds before a worker is considered hung and restarted
+po_token_ttl = 3600  # seconds a poToken is reused for the same visitorData
+max_po_tokens = 256  # poTokens kept for reuse, the oldest are dropped first
+worker_retry_delay = 60  # seconds before workers are tried again after failing to start
+
+_idle_workers: "queue.Queue[_Worker]" = queue.Queue()
+_workers_lock = threading.Lock()
+_worker_count = 0
+# Workers failing to start in a row, and when the next one may be started
+_worker_failures = 0
+_workers_retry_at = 0.0
+
+_po_tokens: Dict[str, Tuple[str, float]] = {}
+_po_token_locks: Dict[str, threading.Lock] = {}
+_po_tokens_lock = threading.Lock()
+
+
+class _WorkerUnavailable(Exception):
+    """The worker could not load botGuard.js."""
+
+
+class _Worker:
+    """A node process that keeps botGuard loaded between poTokens."""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [NODE_PATH, WORKER_PATH],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+            encoding='utf-8'
+        )
+        # The messages of the process, then None once it is gone
+        self._messages: queue.Queue = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+        try:
+            ready = 'ready' in self._receive()
+        except subprocess.SubprocessError:
+            ready = False
+        if not ready:
+            self.close()
+            raise _WorkerUnavailable()
+
+    def _read(self):
+        for line in self.process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(message, dict):
+                self._messages.put(message)
+        # The process is gone
+        self._messages.put(None)
+
+    def _receive(self) -> dict:
+        try:
+            message = self._messages.get(timeout=worker_timeout)
+        except queue.Empty:
+            self.close()
+            raise subprocess.TimeoutExpired([NODE_PATH, WORKER_PATH], worker_timeout)
+        if message is None:
+            self.close()
+            raise subprocess.CalledProcessError(
+                self.process.poll() or 1, [NODE_PATH, WORKER_PATH]
+            )
+        return message
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def generate_po_token(self, visitor_data: str) -> str:
+        self.process.stdin.write(visitor_data + '\n')
+        self.process.stdin.flush()
+        message = self._receive()
+        if 'error' in message:
+            raise subprocess.CalledProcessError(
+                1, [NODE_PATH, WORKER_PATH, visitor_data], output=message['error']
+            )
+        return message['po_token']
+
+    def close(self):
+        try:
+            self.process.kill()
+            self.process.wait()
+        except OSError:
+            pass
+
+
+def _acquire_worker() -> _Worker:
+    global _worker_count
+    while True:
+        with _workers_lock:
+            try:
+                return _idle_workers.get_nowait()
+            except queue.Empty:
+                pass
+            if _worker_count < max_workers:
+                _worker_count += 1
+                break
+        # Checked again regularly, in case a busy worker dies instead
+        try:
+            return _idle_workers.get(timeout=1)
+        except queue.Empty:
+            continue
+    try:
+        return _Worker()
+    except BaseException:
+        with _workers_lock:
+            _worker_count -= 1
+        raise
+
+
+def _release_worker(worker: _Worker) -> None:
+    global _worker_count
+    if worker.alive:
+        _idle_workers.put(worker)
+        return
+    # A dead or hung worker is replaced on the next request
+    with _workers_lock:
+        _worker_count -= 1
+
+
+def _run_worker(visitor_data: str) -> str:
+    worker = _acquire_worker()
+    try:
+        return worker.generate_po_token(visitor_data)
+    except (OSError, ValueError) as e:
+        # The pipe broke, the process died under us
+        worker.close()
+        raise subprocess.CalledProcessError(1, [NODE_PATH, WORKER_PATH], output=str(e))
+    finally:
+        _release_worker(worker)
+
+
+def _run_once(visitor_data: str) -> str:
+    result = subprocess.check_output(
+        [NODE_PATH, VM_PATH, visitor_data]
+    ).decode()
+    return result.replace("\n", "")
+
+
+def _generate(visitor_data: str) -> str:
+    global _worker_failures, _workers_retry_at
+    if time.time() < _workers_retry_at:
+        return _run_once(visitor_data)
+    try:
+        po_token = _run_worker(visitor_data)
+    except _WorkerUnavailable:
+        # The worker could not load botGuard.js, spawn node per token until
+        # the next attempt, waiting twice as long after every failure.
+        with _workers_lock:
+            _worker_failures += 1
+            delay = worker_retry_delay * 2 ** min(_worker_failures - 1, 6)
+            _workers_retry_at = time.time() + delay
+        logger.debug(f'botGuard worker unavailable, running node for each poToken for {delay} seconds')
+        return _run_once(visitor_data)
+    _worker_failures = 0
+    return po_token
+
+
+def _store_po_token(visitor_data: str, po_token: str) -> None:
+    """Keep the poToken of a visitorData, dropping the expired and oldest ones."""
+    now = time.time()
+    with _po_tokens_lock:
+        for key in [key for key, (_, expires) in _po_tokens.items() if expires <= now]:
+            del _po_tokens[key]
+        _po_tokens.pop(visitor_data, None)
+        _po_tokens[visitor_data] = (po_token, now + po_token_ttl)
+        while len(_po_tokens) > max_po_tokens:
+            del _po_tokens[next(iter(_po_tokens))]
+        # A lock still held is in use by a request for its visitorData
+        for key in [key for key, lock in _po_token_locks.items() if key not in _po_tokens and not lock.locked()]:
+            del _po_token_locks[key]
+
+
 def generate_po_token(visitor_data: str) -> str:
     """
     Run nodejs to generate poToken through botGuard.
 
+    The botGuard VM is kept loaded in up to ``max_workers`` node processes,
+    and the poToken of each visitorData is reused for ``po_token_ttl`` seconds.
+
     Requires nodejs installed.
     """
-    result = subprocess.check_output(
-        [NODE_PATH, VM_PATH, visitor_data]
-    ).decode()
-    return result.replace("\n", "")
+    with _po_tokens_lock:
+        lock = _po_token_locks.setdefault(visitor_data, threading.Lock())
 
+    # Concurrent requests for the same visitorData wait for a single token
+    with lock:
+        with _po_tokens_lock:
+            cached = _po_tokens.get(visitor_data)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+
+        po_token = _generate(visitor_data)
+        _store_po_token(visitor_data, po_token)
+        return po_token
+
+
+def stop_workers() -> None:
+    """Stop the node processes kept running to generate poTokens.
+
+    Workers that failed to start are tried again on the next poToken.
+    """
+    global _worker_count, _worker_failures, _workers_retry_at
+    with _workers_lock:
+        _worker_failures = 0
+        _workers_retry_at = 0.0
+    while True:
+        try:
+            worker = _idle_workers.get_nowait()
+        except queue.Empty:
+            break
+        worker.close()
+        with _workers_lock:
+            _worker_count -= 1
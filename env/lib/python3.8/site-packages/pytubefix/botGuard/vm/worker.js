@@ -0,0 +1,47 @@
+// Keeps botGuard.js loaded and generates a poToken for every visitorData
+// read from stdin. Each result is written to stdout as one json line,
+// either {"po_token": ...} or {"error": ...}.
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+const vm = require('vm');
+const Module = require('module');
+
+const write = (message) => process.stdout.write(JSON.stringify(message) + '\n');
+
+// stdout only carries results, anything logged by the VM goes to stderr.
+for (const name of ['log', 'info', 'warn', 'error', 'debug']) {
+    console[name] = (...args) => process.stderr.write(args.join(' ') + '\n');
+}
+
+// botGuard.js runs its entry point once with the visitorData from argv.
+// Turn it into a function that can be called for every request instead.
+const MAIN_START = '!async function(){const n=process.argv.slice(2);';
+const MAIN_END = 'console.info(p.poToken)}()';
+
+const filename = path.join(__dirname, 'botGuard.js');
+let source = fs.readFileSync(filename, 'utf8');
+if (!source.includes(MAIN_START) || !source.includes(MAIN_END)) {
+    write({error: 'botGuard.js entry point not found'});
+    process.exit(1);
+}
+source = source
+    .replace(MAIN_START, ';globalThis.generatePoToken=async function(n){')
+    .replace(MAIN_END, 'return p.poToken}');
+
+vm.runInThisContext(Module.wrap(source), {filename})(
+    exports, require, module, filename, __dirname
+);
+
+readline.createInterface({input: process.stdin}).on('line', (line) => {
+    const visitorData = line.trim();
+    if (!visitorData) {
+        return;
+    }
+    globalThis.generatePoToken([visitorData]).then(
+        (poToken) => write({po_token: poToken}),
+        (e) => write({error: String((e && e.message) || e)})
+    );
+});
+
+write({ready: true});
@@ -12,24 +12,81 @@ functions" (2) sends them to be interpreted by jsinterp.py
 """
 import logging
 import re
+import threading
+from collections import OrderedDict
 
+from pytubefix import js_cache
 from pytubefix.exceptions import RegexMatchError, InterpretationError
+from pytubefix.jscompiler import JSCompiler
 from pytubefix.jsinterp import JSInterpreter, extract_player_js_global_var
 
 logger = logging.getLogger(__name__)
 
+# Ciphers of the most recently used players, keyed by js_url.
+_ciphers: "OrderedDict[str, Cipher]" = OrderedDict()
+_ciphers_lock = threading.Lock()
+_max_ciphers = 4
+
 
 class Cipher:
     def __init__(self, js: str, js_url: str):
 
         self.js_url = js_url
 
-        self.signature_function_name = get_initial_function_name(js, js_url)
-        self.throttling_function_name = get_throttling_function_name(js, js_url)
+        # The names and source of the functions and objects used by both
+        # only change with the player
+        cached = js_cache.load_functions(js_url)
+        if cached:
+            logger.debug(f'using cached functions for {js_url}')
+            self.signature_function_name = cached['signature_function_name']
+            self.throttling_function_name = cached['throttling_function_name']
+            function_code = {
+                name: (argnames, code)
+                for name, (argnames, code) in cached['functions'].items()
+            }
+            object_code = cached.get('objects', {})
+        else:
+            self.signature_function_name = get_initial_function_name(js, js_url)
+            self.throttling_function_name = get_throttling_function_name(js, js_url)
+            function_code = {}
+            object_code = {}
 
         self.calculated_n = None
 
-        self.js_interpreter = JSInterpreter(js)
+        self.js_interpreter = JSCompiler(js, function_code=function_code, object_code=object_code)
+        # Interpreted functions keep their arguments in a shared scope
+        self._lock = threading.Lock()
+
+        self._saved = None
+        if cached:
+            self._saved = (len(function_code), len(object_code))
+        else:
+            self._save_functions()
+
+    def _save_functions(self):
+        """Store the function names and the source extracted so far for the next process.
+
+        Functions and objects are only extracted when a call first needs
+        them, so this runs again after each call that extracted more.
+        """
+        interpreter = self.js_interpreter
+        extracted = (len(interpreter._function_code), len(interpreter._object_code))
+        if extracted == self._saved:
+            return
+        for name in (self.signature_function_name, self.throttling_function_name):
+            try:
+                interpreter.function_code(name)
+            except JSInterpreter.Exception:
+                # Leave it to be reported when the function is called
+                return
+        self._saved = (len(interpreter._function_code), len(interpreter._object_code))
+        js_cache.save_functions(
+            self.js_url,
+            self.signature_function_name,
+            self.throttling_function_name,
+            dict(interpreter._function_code),
+            dict(interpreter._object_code)
+        )
 
     def get_throttling(self, n: str):
         """Interpret the function that throttles download speed.
@@ -40,7 +97,10 @@ class Cipher:
             Returns the transformed value "n".
         """
         try:
-            return self.js_interpreter.call_function(self.throttling_function_name, n)
+            with self._lock:
+                result = self.js_interpreter.call_function(self.throttling_function_name, n)
+                self._save_functions()
+                return result
         except:
             raise InterpretationError(js_url=self.js_url)
 
@@ -54,11 +114,50 @@ class Cipher:
            Returns the correct stream signature.
         """
         try:
-            return self.js_interpreter.call_function(self.signature_function_name, ciphered_signature)
+            with self._lock:
+                result = self.js_interpreter.call_function(self.signature_function_name, ciphered_signature)
+                self._save_functions()
+                return result
         except:
             raise InterpretationError(js_url=self.js_url)
 
 
+def get_cipher(js: str, js_url: str) -> Cipher:
+    """Return the :class:`Cipher` of a player, building it on first use.
+
+    Ciphers are shared by everything in the process that uses the same
+    player, so its functions are extracted and built only once.
+
+    :param str js:
+        The contents of the base.js asset file.
+    :param str js_url:
+        Full base.js url
+    :rtype: Cipher
+    """
+    with _ciphers_lock:
+        cipher = _ciphers.get(js_url)
+        if cipher is not None:
+            _ciphers.move_to_end(js_url)
+            return cipher
+
+    cipher = Cipher(js=js, js_url=js_url)
+    with _ciphers_lock:
+        cipher = _ciphers.setdefault(js_url, cipher)
+        while len(_ciphers) > _max_ciphers:
+            _ciphers.popitem(last=False)
+    return cipher
+
+
+def clear_cipher(js_url: str) -> None:
+    """Forget the shared :class:`Cipher` of a player.
+
+    :param str js_url:
+        Full base.js url
+    """
+    with _ciphers_lock:
+        _ciphers.pop(js_url, None)
+
+
 def get_initial_function_name(js: str, js_url: str) -> str:
     """Extract the name of the function responsible for computing the signature.
     :param str js:
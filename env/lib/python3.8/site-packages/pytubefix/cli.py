@@ -12,7 +12,7 @@ from typing import List, Optional
 
 import pytubefix.exceptions as exceptions
 from pytubefix import __version__
-from pytubefix import CaptionQuery, Playlist, Stream
+from pytubefix import CaptionQuery, Playlist, Stream, download_many
 from pytubefix.helpers import safe_filename, setup_logger
 from pytubefix import YouTube
 
@@ -339,6 +339,20 @@ def main():
         playlist = Playlist(args.url)
         args.target = args.target or safe_filename(playlist.title)
 
+        if len(sys.argv) == 2:
+            # Only the url was given, download every video like a single one
+            results = download_many(
+                playlist,
+                args.target,
+                select_stream=lambda yt: yt.streams.filter(progressive=True).order_by("resolution").last()
+            )
+            for result in results:
+                if result.status == "failed":
+                    print(f"There was an error with video: {result.video_id}")
+                    print(result.error)
+            print(f"Downloaded {sum(r.status in ('downloaded', 'skipped') for r in results)} of {len(results)} videos to {args.target}")
+            return
+
         for youtube_video in playlist.videos:
             try:
                 _perform_args_on_youtube(youtube_video, args)
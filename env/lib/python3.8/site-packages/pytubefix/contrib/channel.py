@@ -5,13 +5,16 @@ import logging
 from typing import Dict, List, Optional, Tuple, Iterable, Any, Callable
 
 from pytubefix import extract, YouTube, Playlist, request
-from pytubefix.helpers import cache, uniqueify, DeferredGeneratorList
-from pytubefix.innertube import InnerTube
+from pytubefix.helpers import uniqueify, DeferredGeneratorList
+from pytubefix.innertube import InnerTube, share_visitor_data
 
 logger = logging.getLogger(__name__)
 
 
 class Channel(Playlist):
+    # Channel tabs list the latest uploads first
+    _sync_newest_first = True
+
     def __init__(
             self,
             url: str,
@@ -23,6 +26,7 @@ class Channel(Playlist):
             oauth_verifier: Optional[Callable[[str, str], None]] = None,
             use_po_token: Optional[bool] = False,
             po_token_verifier: Optional[Callable[[None], Tuple[str, str]]] = None,
+            read_ahead: int = 2,
     ):
         """Construct a :class:`Channel <Channel>`.
         :param str url:
@@ -51,8 +55,11 @@ class Channel(Playlist):
             (Optional) Verified used to obtain the visitorData and po_token.
             The verifier will return the visitorData and po_token respectively.
             (if passed, else default verifier will be used)
+        :param int read_ahead:
+            (Optional) Number of continuation pages requested in the background
+            ahead of the page being read. 0 requests each page when it is needed.
         """
-        super().__init__(url, proxies)
+        super().__init__(url, proxies=proxies, read_ahead=read_ahead)
 
         self.channel_uri = extract.channel_name(url)
 
@@ -202,6 +209,21 @@ class Channel(Playlist):
             self._about_html = request.get(self.about_url)
             return self._about_html
 
+    @property
+    def _sync_url(self) -> str:
+        # Each tab is synced on its own
+        return self.html_url
+
+    def _sync_stamp(self) -> Any:
+        return None
+
+    def _page_entry(self, item: Any) -> Any:
+        return item
+
+    def _known_length(self) -> Optional[int]:
+        # Tabs do not show an exact count
+        return None
+
     def url_generator(self):
         """Generator that yields video URLs.
 
@@ -308,6 +330,7 @@ class Channel(Playlist):
             # It is necessary to send the visitorData together with the continuation token
             self._visitor_data = initial_data["responseContext"]["webResponseContextExtensionData"][
                 "ytConfigData"]["visitorData"]
+            share_visitor_data(self._visitor_data)
 
         except (KeyError, IndexError, TypeError):
             try:
@@ -350,16 +373,7 @@ class Channel(Playlist):
         :returns: List of YouTube, Playlist or Channel objects.
         """
         try:
-            return YouTube(f"/watch?v="
-                           f"{x['richItemRenderer']['content']['videoRenderer']['videoId']}",
-                           client=self.client,
-                           use_oauth=self.use_oauth,
-                           allow_oauth_cache=self.allow_oauth_cache,
-                           token_file=self.token_file,
-                           oauth_verifier=self.oauth_verifier,
-                           use_po_token=self.use_po_token,
-                           po_token_verifier=self.po_token_verifier
-                           )
+            return self._youtube(x['richItemRenderer']['content']['videoRenderer']['videoId'], x)
         except (KeyError, IndexError, TypeError):
             return self._extract_shorts_id(x)
 
@@ -377,15 +391,7 @@ class Channel(Playlist):
             else:
                 video_id = content['reelItemRenderer']['videoId']
 
-            return YouTube(f"/watch?v={video_id}",
-                           client=self.client,
-                           use_oauth=self.use_oauth,
-                           allow_oauth_cache=self.allow_oauth_cache,
-                           token_file=self.token_file,
-                           oauth_verifier=self.oauth_verifier,
-                           use_po_token=self.use_po_token,
-                           po_token_verifier=self.po_token_verifier
-                           )
+            return self._youtube(video_id, content)
         except (KeyError, IndexError, TypeError):
             return self._extract_release_id(x)
 
@@ -415,16 +421,7 @@ class Channel(Playlist):
         :returns: List of YouTube, Playlist or Channel objects.
         """
         try:
-            return YouTube(f"/watch?v="
-                           f"{x['gridVideoRenderer']['videoId']}",
-                           client=self.client,
-                           use_oauth=self.use_oauth,
-                           allow_oauth_cache=self.allow_oauth_cache,
-                           token_file=self.token_file,
-                           oauth_verifier=self.oauth_verifier,
-                           use_po_token=self.use_po_token,
-                           po_token_verifier=self.po_token_verifier
-                           )
+            return self._youtube(x['gridVideoRenderer']['videoId'], x)
         except (KeyError, IndexError, TypeError):
             return self._extract_shorts_id_from_home(x)
 
@@ -434,16 +431,7 @@ class Channel(Playlist):
         :returns: List of YouTube, Playlist or Channel objects.
         """
         try:
-            return YouTube(f"/watch?v="
-                           f"{x['reelItemRenderer']['videoId']}",
-                           client=self.client,
-                           use_oauth=self.use_oauth,
-                           allow_oauth_cache=self.allow_oauth_cache,
-                           token_file=self.token_file,
-                           oauth_verifier=self.oauth_verifier,
-                           use_po_token=self.use_po_token,
-                           po_token_verifier=self.po_token_verifier
-                           )
+            return self._youtube(x['reelItemRenderer']['videoId'], x)
         except (KeyError, IndexError, TypeError):
             return self._extract_playlist_id(x)
 
@@ -1,20 +1,73 @@
 """Module to download a complete playlist from a youtube channel."""
+import hashlib
+import itertools
 import json
 import logging
+import os
+import pathlib
+import queue
+import threading
 from collections.abc import Sequence
 from datetime import date, datetime
-from typing import Dict, Iterable, List, Optional, Tuple, Union, Any, Callable
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, Any, Callable
 
 from pytubefix import extract, request, YouTube
-from pytubefix.innertube import InnerTube
+from pytubefix.innertube import InnerTube, get_visitor_data, share_visitor_data
 from pytubefix.helpers import cache, DeferredGeneratorList, install_proxy, uniqueify
 
 logger = logging.getLogger(__name__)
 
+_sync_dir = pathlib.Path(__file__).parent.parent.resolve() / '__cache__' / 'sync'
+# Ids kept in the state of a synced list. The older ids of append-only lists
+# move to a ``<state_file>.ids`` file, only read if the list is read in full.
+_sync_max_ids = 5000
+
+
+def _load_sync_state(path: str, url: str) -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get('url') != url:
+        return None
+    return state
+
+
+def _load_sync_ids(path: str) -> List[str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().split()
+    except OSError:
+        return []
+
+
+def _append_sync_ids(path: str, ids: List[str], truncate: bool = False) -> None:
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w' if truncate else 'a', encoding='utf-8') as f:
+            f.writelines(f'{item_id}\n' for item_id in ids)
+    except OSError as e:
+        logger.warning(f'could not write sync ids {path}: {e}')
+
+
+def _save_sync_state(path: str, state: Dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f'could not write sync state {path}: {e}')
+
 
 class Playlist(Sequence):
     """Load a YouTube playlist with URL"""
 
+    # Whether new entries are listed first, see `sync`
+    _sync_newest_first = False
+
     def __init__(
             self,
             url: str,
@@ -26,6 +79,7 @@ class Playlist(Sequence):
             oauth_verifier: Optional[Callable[[str, str], None]] = None,
             use_po_token: Optional[bool] = False,
             po_token_verifier: Optional[Callable[[None], Tuple[str, str]]] = None,
+            read_ahead: int = 2,
     ):
         """
         :param dict proxies:
@@ -52,6 +106,9 @@ class Playlist(Sequence):
             (Optional) Verified used to obtain the visitorData and po_token.
             The verifier will return the visitorData and po_token respectively.
             (if passed, else default verifier will be used)
+        :param int read_ahead:
+            (Optional) Number of continuation pages requested in the background
+            ahead of the page being read. 0 requests each page when it is needed.
         """
         if proxies:
             install_proxy(proxies)
@@ -68,6 +125,8 @@ class Playlist(Sequence):
         self.use_po_token = use_po_token
         self.po_token_verifier = po_token_verifier
 
+        self.read_ahead = read_ahead
+
         # These need to be initialized as None for the properties.
         self._html = None
         self._ytcfg = None
@@ -76,6 +135,9 @@ class Playlist(Sequence):
 
         self._playlist_id = None
 
+        # Listed details of each video id, to build YouTube objects with
+        self._video_details: Dict[str, Dict] = {}
+
     @property
     def playlist_id(self):
         """Get the playlist id.
@@ -152,7 +214,7 @@ class Playlist(Sequence):
 
     def _paginate(
             self, initial_html: str, context: Optional[Any] = None,
-            until_watch_id: Optional[str] = None
+            until_watch_id: Optional[str] = None, with_tokens: bool = False
     ) -> Iterable[List[str]]:
         """Parse the video links from the page source, yields the /watch?v=
         part from video link
@@ -161,42 +223,108 @@ class Playlist(Sequence):
         :param context Optional[Any]: Auxiliary object
         :param until_watch_id Optional[str]: YouTube Video watch id until
             which the playlist should be read.
+        :param with_tokens bool: Yield ``(continuation, page)`` pairs, where
+            continuation is the token the page was requested with (None for
+            the first page).
 
         :rtype: Iterable[List[str]]
         :returns: Iterable of lists of YouTube watch ids
         """
-        videos_urls, continuation = self._extract_videos(
-            json.dumps(extract.initial_data(initial_html)), context
-        )
-        if until_watch_id:
-            try:
-                trim_index = videos_urls.index(f"/watch?v={until_watch_id}")
-                yield videos_urls[:trim_index]
-                return
-            except ValueError:
-                pass
-        yield videos_urls
+        # The page of the playlist itself is already parsed
+        if initial_html is self._html:
+            initial_data = self.initial_data
+        else:
+            initial_data = extract.initial_data(initial_html)
+        videos_urls, continuation = self._extract_videos(initial_data, context)
 
         # Extraction from a playlist only returns 100 videos at a time
         # if self._extract_videos returns a continuation there are more
         # than 100 songs inside a playlist, so we need to add further requests
         # to gather all of them
+        pages = itertools.chain(
+            [(None, videos_urls)], self._continuation_pages(continuation, context, with_tokens=True)
+        )
 
-        while continuation:  # there is an url found
-            # requesting the next page of videos with the url generated from the
-            # previous page, needs to be a post
-            req = InnerTube('WEB').browse(continuation=continuation, visitor_data=self._visitor_data)
-            # extract up to 100 songs from the page loaded
-            # returns another continuation if more videos are available
-            videos_urls, continuation = self._extract_videos(req, context)
+        for token, videos_urls in pages:
             if until_watch_id:
-                try:
-                    trim_index = videos_urls.index(f"/watch?v={until_watch_id}")
-                    yield videos_urls[:trim_index]
+                ids = [self._item_id(item) for item in videos_urls]
+                if until_watch_id in ids:
+                    videos_urls = videos_urls[:ids.index(until_watch_id)]
+                    yield (token, videos_urls) if with_tokens else videos_urls
+                    return
+            yield (token, videos_urls) if with_tokens else videos_urls
+
+    @staticmethod
+    def _item_id(item: Any) -> str:
+        """Identify an item of a page: the video id, or the url of a playlist or channel."""
+        if isinstance(item, str):
+            return item[len('/watch?v='):] if item.startswith('/watch?v=') else item
+        if isinstance(item, YouTube):
+            return item.video_id
+        return getattr(item, '_input_url', repr(item))
+
+    def _fetch_page(self, continuation: str, context: Optional[Any] = None) -> Tuple[List[str], Optional[str]]:
+        """Request the page of a continuation token and extract its videos."""
+        # requesting the next page of videos with the url generated from the
+        # previous page, needs to be a post
+        req = InnerTube('WEB').browse(continuation=continuation,
+                                      visitor_data=self._visitor_data or get_visitor_data())
+        # extract up to 100 songs from the page loaded
+        # returns another continuation if more videos are available
+        return self._extract_videos(req, context)
+
+    def _continuation_pages(
+            self, continuation: Optional[str], context: Optional[Any] = None, with_tokens: bool = False
+    ) -> Iterator[List[str]]:
+        """Yield the videos of every page from ``continuation`` on.
+
+        Every token comes from the page before it, so the pages are requested
+        one after another, but up to ``read_ahead`` of them in a background
+        thread while the caller reads the current one. With ``with_tokens``,
+        ``(token, videos)`` pairs are yielded instead.
+        """
+        if not continuation:
+            return
+        if self.read_ahead <= 0:
+            while continuation:
+                token = continuation
+                videos_urls, continuation = self._fetch_page(token, context)
+                yield (token, videos_urls) if with_tokens else videos_urls
+            return
+
+        pages: "queue.Queue[Union[Tuple[str, List[str]], BaseException, None]]" = queue.Queue()
+        free_slots = threading.Semaphore(self.read_ahead)
+        stopped = threading.Event()
+
+        def read_ahead():
+            token = continuation
+            try:
+                while token:
+                    free_slots.acquire()
+                    if stopped.is_set():
+                        return
+                    videos_urls, next_token = self._fetch_page(token, context)
+                    pages.put((token, videos_urls))
+                    token = next_token
+            except BaseException as e:
+                pages.put(e)
+                return
+            pages.put(None)
+
+        threading.Thread(target=read_ahead, daemon=True).start()
+        try:
+            while True:
+                page = pages.get()
+                if page is None:
                     return
-                except ValueError:
-                    pass
-            yield videos_urls
+                if isinstance(page, BaseException):
+                    raise page
+                free_slots.release()
+                yield page if with_tokens else page[1]
+        finally:
+            # Also wakes the thread up if it waits for a free slot
+            stopped.set()
+            free_slots.release()
 
     def _extract_videos(self, raw_json: str, context: Optional[Any] = None) -> Tuple[List[str], Optional[str]]:
         """Extracts videos from a raw json page
@@ -236,6 +364,7 @@ class Playlist(Sequence):
 
             self._visitor_data = initial_data["responseContext"]["webResponseContextExtensionData"][
                 "ytConfigData"]["visitorData"]
+            share_visitor_data(self._visitor_data)
         except (KeyError, IndexError, TypeError):
             try:
                 # this is the json tree structure, if the json was directly sent
@@ -280,7 +409,9 @@ class Playlist(Sequence):
         :returns: List with extracted ids.
         """
         try:
-            return f"/watch?v={x['playlistVideoRenderer']['videoId']}"
+            video_id = x['playlistVideoRenderer']['videoId']
+            self._video_details[video_id] = extract.renderer_video_details(x)
+            return f"/watch?v={video_id}"
         except (KeyError, IndexError, TypeError):
             return self._extract_shorts_id(x)
 
@@ -298,6 +429,7 @@ class Playlist(Sequence):
             else:
                 video_id = content['reelItemRenderer']['videoId']
 
+            self._video_details[video_id] = extract.renderer_video_details(content)
             return f"/watch?v={video_id}"
 
         except (KeyError, IndexError, TypeError):
@@ -315,7 +447,149 @@ class Playlist(Sequence):
             List of video URLs from the playlist trimmed at the given ID
         """
         for page in self._paginate(self.html, until_watch_id=video_id):
-            yield from (self._video_url(watch_path) for watch_path in page)
+            yield from (self._page_entry(item) for item in page)
+
+    @property
+    def _sync_url(self) -> str:
+        return self.playlist_url
+
+    def _sync_stamp(self) -> Any:
+        """Return what, besides the first page, tells whether the list changed."""
+        # Videos appended to a long playlist do not show on its first page,
+        # but they change its video count and last update
+        try:
+            stats = self.sidebar_info[0]['playlistSidebarPrimaryInfoRenderer']['stats']
+            return [stats[0], stats[2]]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    def _page_entry(self, item: Any) -> Any:
+        """Turn an item of a page into what ``url_generator`` yields."""
+        return self._video_url(item)
+
+    def _sync_tail(self, cursor: Optional[Dict]) -> Optional[Iterator[Tuple[str, List[Any]]]]:
+        """Read an append-only list from the last page of the previous sync.
+
+        :param dict cursor:
+            The continuation token of that page and the ids it held.
+        :returns: The ``(token, page)`` pairs from that page on, or None if
+            the page cannot be requested again or its entries changed.
+        """
+        if not cursor or not cursor.get('continuation'):
+            return None
+        pages = self._continuation_pages(cursor['continuation'], with_tokens=True)
+        try:
+            first = next(pages)
+        except Exception as e:
+            logger.debug(f'could not resume {self._sync_url} from the last synced page: {e}')
+            pages.close()
+            return None
+        ids = [self._item_id(item) for item in first[1] if item]
+        if ids[:len(cursor['ids'])] != cursor['ids']:
+            logger.debug(f'{self._sync_url} changed before the last synced page, reading it in full')
+            pages.close()
+            return None
+
+        def tail():
+            try:
+                yield first
+                yield from pages
+            finally:
+                pages.close()
+        return tail()
+
+    def sync(self, state_file: Optional[str] = None, newest_first: Optional[bool] = None) -> list:
+        """Return the entries added since the last sync.
+
+        The ids already seen and a fingerprint of the first page are kept in
+        ``state_file``, the oldest ids of long lists in ``<state_file>.ids``. If the fingerprint did not change, nothing else is
+        requested. For lists that show new entries first, the pages are only
+        read until the first known entry. Other lists are read again from the
+        last page of the previous sync, unless the entries before it changed.
+        The first sync returns every entry.
+
+        :param str state_file:
+            (Optional) Path to the file where the sync state is kept.
+            Defaults to None, which means the state is stored in the
+            pytubefix/__cache__/sync directory.
+        :param bool newest_first:
+            (Optional) Whether new entries are listed before the known ones,
+            as on channel tabs. Defaults to False for playlists, since videos
+            are mostly appended to them, and to True for channels.
+        :rtype: list
+        :returns: The new entries, in the order of the list, as returned by
+            ``url_generator``.
+        """
+        url = self._sync_url
+        if newest_first is None:
+            newest_first = self._sync_newest_first
+        if state_file is None:
+            state_file = str(_sync_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json")
+        state = _load_sync_state(state_file, url)
+        ids_file = f'{state_file}.ids'
+        stale_ids_file = False
+        if state is None:
+            state = {'ids': []}
+            # Left by the state of another list
+            stale_ids_file = os.path.exists(ids_file)
+        known_ids = set(state['ids'])
+
+        new_items = []
+        cursor = None
+        pages = self._paginate(self.html, with_tokens=True)
+        try:
+            _, first_page = next(pages, (None, []))
+            first_page = [item for item in first_page if item]
+            fingerprint = hashlib.sha1(json.dumps(
+                [[self._item_id(item) for item in first_page], self._sync_stamp()],
+                sort_keys=True).encode('utf-8')).hexdigest()
+            if state.get('fingerprint') == fingerprint:
+                logger.debug(f'{url} did not change since the last sync')
+                return []
+
+            tail = None if newest_first else self._sync_tail(state.get('cursor'))
+            if tail is not None:
+                pages.close()
+                pages = tail
+            elif not newest_first and state['ids']:
+                # Read in full, so the ids that fell off the state are seen again
+                known_ids.update(_load_sync_ids(ids_file))
+
+            for token, page in itertools.chain([(None, first_page)], pages):
+                page = [item for item in page if item]
+                cursor = {'continuation': token, 'ids': [self._item_id(item) for item in page]}
+                reached_known = False
+                for item in page:
+                    item_id = self._item_id(item)
+                    if item_id in known_ids:
+                        if newest_first:
+                            reached_known = True
+                            break
+                        continue
+                    known_ids.add(item_id)
+                    new_items.append(item)
+                if reached_known:
+                    break
+        finally:
+            # Stops reading pages ahead
+            pages.close()
+
+        new_ids = [self._item_id(item) for item in new_items]
+        if newest_first:
+            ids = (new_ids + state['ids'])[:_sync_max_ids]
+        else:
+            ids = state['ids'] + new_ids
+            if len(ids) > _sync_max_ids or stale_ids_file:
+                _append_sync_ids(ids_file, ids[:-_sync_max_ids], truncate=stale_ids_file)
+                ids = ids[-_sync_max_ids:]
+        _save_sync_state(state_file, {
+            'url': url,
+            'fingerprint': fingerprint,
+            'ids': ids,
+            # The last page, where appended entries show up next time
+            'cursor': None if newest_first else cursor,
+        })
+        return [self._page_entry(item) for item in new_items]
 
     def url_generator(self):
         """Generator that yields video URLs.
@@ -334,20 +608,41 @@ class Playlist(Sequence):
         :rtype: List[str]
         :returns: List of video URLs
         """
-        return DeferredGeneratorList(self.url_generator())
+        return DeferredGeneratorList(self.url_generator(), known_length=self._known_length)
+
+    def _youtube(self, video_id: str, item: Optional[Dict] = None) -> YouTube:
+        """Build a YouTube object with the settings of this playlist.
+
+        :param str video_id: Id of the video.
+        :param dict item: (Optional) The listing item of the video, whose
+            title, author, length and views are then known without a request.
+        :rtype: YouTube
+        """
+        yt = YouTube(
+            f"https://www.youtube.com/watch?v={video_id}",
+            client=self.client,
+            use_oauth=self.use_oauth,
+            allow_oauth_cache=self.allow_oauth_cache,
+            token_file=self.token_file,
+            oauth_verifier=self.oauth_verifier,
+            use_po_token=self.use_po_token,
+            po_token_verifier=self.po_token_verifier
+        )
+        details = extract.renderer_video_details(item) if item else self._video_details.get(video_id)
+        if details:
+            yt._seed(details)
+        return yt
+
+    def _known_length(self) -> Optional[int]:
+        """Video count shown by the playlist, which may include unavailable videos."""
+        try:
+            return self.length
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
 
     def videos_generator(self):
         for url in self.video_urls:
-            yield YouTube(
-                url,
-                client=self.client,
-                use_oauth=self.use_oauth,
-                allow_oauth_cache=self.allow_oauth_cache,
-                token_file=self.token_file,
-                oauth_verifier=self.oauth_verifier,
-                use_po_token=self.use_po_token,
-                po_token_verifier=self.po_token_verifier
-            )
+            yield self._youtube(extract.video_id(url))
 
     @property
     def videos(self) -> Iterable[YouTube]:
@@ -356,7 +651,7 @@ class Playlist(Sequence):
         :rtype: List[YouTube]
         :returns: List of YouTube
         """
-        return DeferredGeneratorList(self.videos_generator())
+        return DeferredGeneratorList(self.videos_generator(), known_length=self._known_length)
 
     def __getitem__(self, i: Union[slice, int]) -> Union[str, List[str]]:
         return self.video_urls[i]
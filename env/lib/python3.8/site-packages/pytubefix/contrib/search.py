@@ -4,9 +4,9 @@ import logging
 from typing import List, Optional, Dict, Callable, Tuple
 
 # Local imports
-from pytubefix import YouTube, Channel, Playlist
+from pytubefix import extract, YouTube, Channel, Playlist
 from pytubefix.helpers import deprecated, install_proxy
-from pytubefix.innertube import InnerTube
+from pytubefix.innertube import InnerTube, get_visitor_data
 from pytubefix.protobuf import encode_protobuf
 
 logger = logging.getLogger(__name__)
@@ -77,6 +77,9 @@ class Search:
             use_po_token=self.use_po_token,
             po_token_verifier=self.po_token_verifier
         )
+        visitor_data = get_visitor_data()
+        if visitor_data:
+            self._innertube_client.insert_visitor_data(visitor_data)
 
         # The first search, without a continuation, is structured differently
         #  and contains completion suggestions, so we must store this separately
@@ -343,28 +346,34 @@ class Search:
                             video_id = items['shortsLockupViewModel']['onTap']['innertubeCommand'][
                                 'reelWatchEndpoint']['videoId']
 
-                        shorts.append(YouTube(f"https://www.youtube.com/watch?v={video_id}",
-                                              client=self.client,
-                                              use_oauth=self.use_oauth,
-                                              allow_oauth_cache=self.allow_oauth_cache,
-                                              token_file=self.token_file,
-                                              oauth_verifier=self.oauth_verifier,
-                                              use_po_token=self.use_po_token,
-                                              po_token_verifier=self.po_token_verifier
-                                              ))
+                        short = YouTube(f"https://www.youtube.com/watch?v={video_id}",
+                                        client=self.client,
+                                        use_oauth=self.use_oauth,
+                                        allow_oauth_cache=self.allow_oauth_cache,
+                                        token_file=self.token_file,
+                                        oauth_verifier=self.oauth_verifier,
+                                        use_po_token=self.use_po_token,
+                                        po_token_verifier=self.po_token_verifier
+                                        )
+                        # The title and views are already listed
+                        short._seed(extract.renderer_video_details(items))
+                        shorts.append(short)
 
                 # Get videos results
                 if 'videoRenderer' in video_details:
-                    videos.append(YouTube(f"https://www.youtube.com/watch?v="
-                                          f"{video_details['videoRenderer']['videoId']}",
-                                          client=self.client,
-                                          use_oauth=self.use_oauth,
-                                          allow_oauth_cache=self.allow_oauth_cache,
-                                          token_file=self.token_file,
-                                          oauth_verifier=self.oauth_verifier,
-                                          use_po_token=self.use_po_token,
-                                          po_token_verifier=self.po_token_verifier
-                                          ))
+                    video = YouTube(f"https://www.youtube.com/watch?v="
+                                    f"{video_details['videoRenderer']['videoId']}",
+                                    client=self.client,
+                                    use_oauth=self.use_oauth,
+                                    allow_oauth_cache=self.allow_oauth_cache,
+                                    token_file=self.token_file,
+                                    oauth_verifier=self.oauth_verifier,
+                                    use_po_token=self.use_po_token,
+                                    po_token_verifier=self.po_token_verifier
+                                    )
+                    # The title, author, length and views are already listed
+                    video._seed(extract.renderer_video_details(video_details))
+                    videos.append(video)
 
             results['videos'] = videos
             results['shorts'] = shorts
@@ -44,6 +44,22 @@ class RegexMatchError(ExtractError):
         self.pattern = pattern
 
 
+class ManifestError(PytubeFixError):
+    """A stream manifest could not be restored."""
+
+
+class ManifestExpired(ManifestError):
+    """The stream urls of a manifest have expired."""
+
+    def __init__(self, video_id: str):
+        """
+        :param str video_id:
+            A YouTube video identifier.
+        """
+        self.video_id = video_id
+        super().__init__(f"{video_id}: the stream urls of the manifest have expired")
+
+
 class InterpretationError(PytubeFixError):
     def __init__(self, js_url: str):
         self.js_url = js_url
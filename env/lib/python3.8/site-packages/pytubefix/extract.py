@@ -5,13 +5,13 @@ import re
 from collections import OrderedDict
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
-from urllib.parse import parse_qs, quote, urlencode, urlparse
+from urllib.parse import parse_qs, parse_qsl, quote, urlencode, urlparse
 
-from pytubefix.cipher import Cipher
+from pytubefix.cipher import get_cipher
 from pytubefix.exceptions import HTMLParseError, LiveStreamError, RegexMatchError
 from pytubefix.helpers import regex_search
 from pytubefix.metadata import YouTubeMetadata
-from pytubefix.parser import parse_for_object, parse_for_all_objects
+from pytubefix.parser import parse_for_object, parse_for_object_from_startpoint
 
 logger = logging.getLogger(__name__)
 
@@ -24,15 +24,7 @@ def publish_date(watch_html: str):
     :returns:
         Publish date of the video as a datetime object with timezone.
     """
-    try:
-        result = re.search(
-            r"(?<=itemprop=\"datePublished\" content=\")\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2}",
-            watch_html
-        )
-        if result:
-            return datetime.fromisoformat(result.group(0))
-    except AttributeError:
-        return None
+    return WatchPage(watch_html).publish_date
 
 
 def recording_available(watch_html):
@@ -82,11 +74,7 @@ def is_age_restricted(watch_html: str) -> bool:
     :returns:
         Whether or not the content is age restricted.
     """
-    try:
-        regex_search(r"og:restrictions:age", watch_html, group=0)
-    except RegexMatchError:
-        return False
-    return True
+    return WatchPage(watch_html).age_restricted
 
 
 def playability_status(player_response: dict) -> Tuple[Any, Any]:
@@ -262,6 +250,166 @@ def _video_info_url(params: OrderedDict) -> str:
     return f"https://www.youtube.com/get_video_info?{urlencode(params)}"
 
 
+class WatchPage:
+    """The objects embedded in the html of a watch page.
+
+    The anchors of ytInitialData, ytInitialPlayerResponse, ytcfg, the
+    player js path and the meta tags read by :class:`YouTube <YouTube>` are
+    all located with a single regex scan of the page, and each embedded
+    object is decoded at most once, in place.
+
+    :param str html:
+        The html contents of the watch page.
+    """
+
+    # Alternatives are listed in the order they are preferred. Anchors of
+    # the same kind are tried in that order, first match first.
+    _anchors = [
+        ('window_initial_data', r"window\[['\"]ytInitialData['\"]]\s*=\s*"),
+        ('initial_data', r"ytInitialData\s*=\s*"),
+        ('window_player_response', r"window\[['\"]ytInitialPlayerResponse['\"]]\s*=\s*"),
+        ('player_response', r"ytInitialPlayerResponse\s*=\s*"),
+        ('ytplayer_config', r"ytplayer\.config\s*=\s*"),
+        ('ytcfg', r"ytcfg\s=\s"),
+        ('ytcfg_set', r"ytcfg\.set\("),
+        ('base_js', r"/s/player/[\w\d]+/[\w\d_/.]+/base\.js"),
+        ('age_restriction', r"og:restrictions:age"),
+        ('date_published', r"itemprop=\"datePublished\" content=\""),
+    ]
+    # Named groups would keep re from skipping ahead to candidate positions,
+    # so the page is scanned with a plain alternation and the few matches
+    # are classified afterwards.
+    _anchor_regex = re.compile('|'.join(pattern for _, pattern in _anchors))
+    _anchor_kinds = [(name, re.compile(pattern)) for name, pattern in _anchors]
+    _setconfig_pattern = r"yt\.setConfig\(.*['\"]PLAYER_CONFIG['\"]:\s*"
+    _date_regex = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2}")
+
+    def __init__(self, html: str):
+        self.html = html
+        self._matches: Dict[str, List[Tuple[int, int]]] = {name: [] for name, _ in self._anchors}
+        for match in self._anchor_regex.finditer(html):
+            for name, regex in self._anchor_kinds:
+                if regex.fullmatch(match.group()):
+                    self._matches[name].append(match.span())
+                    break
+        self._objects: Dict[int, Any] = {}
+        self._ytcfg: Optional[Dict] = None
+
+    def _object_at(self, start_point: int) -> Any:
+        if start_point not in self._objects:
+            self._objects[start_point] = parse_for_object_from_startpoint(self.html, start_point)
+        return self._objects[start_point]
+
+    def _first_object(self, *names: str) -> Any:
+        for name in names:
+            if not self._matches[name]:
+                continue
+            try:
+                return self._object_at(self._matches[name][0][1])
+            except HTMLParseError as e:
+                logger.debug(f'Anchor failed: {name}')
+                logger.debug(e)
+        return None
+
+    @property
+    def initial_data(self) -> dict:
+        """The ytInitialData json of the page."""
+        obj = self._first_object('window_initial_data', 'initial_data')
+        if obj is None:
+            raise RegexMatchError(caller='initial_data', pattern='initial_data_pattern')
+        return obj
+
+    @property
+    def initial_player_response(self) -> dict:
+        """The ytInitialPlayerResponse json of the page."""
+        obj = self._first_object('window_player_response', 'player_response')
+        if obj is None:
+            raise RegexMatchError(
+                caller='initial_player_response',
+                pattern='initial_player_response_pattern'
+            )
+        return obj
+
+    @property
+    def ytplayer_config(self) -> Any:
+        """The YouTube player configuration data of the page."""
+        obj = self._first_object('ytplayer_config', 'player_response')
+        if obj is not None:
+            return obj
+
+        # setConfig() needs to be handled a little differently.
+        # We want to parse the entire argument to setConfig()
+        #  and use then load that as json to find PLAYER_CONFIG
+        #  inside of it.
+        try:
+            return parse_for_object(self.html, self._setconfig_pattern)
+        except HTMLParseError:
+            pass
+
+        raise RegexMatchError(
+            caller="get_ytplayer_config", pattern="config_patterns, setconfig_patterns"
+        )
+
+    @property
+    def ytplayer_js(self) -> str:
+        """Path to YouTube's base.js file."""
+        if not self._matches['base_js']:
+            raise RegexMatchError(
+                caller="get_ytplayer_js", pattern="js_url_patterns"
+            )
+        start, end = self._matches['base_js'][0]
+        yt_player_js = self.html[start:end]
+        logger.debug("player JS: " + yt_player_js)
+        return yt_player_js
+
+    @property
+    def ytcfg(self) -> dict:
+        """The ytcfg object, combined from all of its pieces in the page."""
+        if self._ytcfg:
+            return self._ytcfg
+
+        ytcfg = {}
+        for name in ('ytcfg', 'ytcfg_set'):
+            for _, start_point in self._matches[name]:
+                try:
+                    ytcfg.update(self._object_at(start_point))
+                except HTMLParseError:
+                    # Some of the instances might fail because set is technically
+                    # a method of the ytcfg object. We'll skip these since they
+                    # don't seem relevant at the moment.
+                    continue
+
+        if not ytcfg:
+            raise RegexMatchError(
+                caller="get_ytcfg", pattern="ytcfg_pattenrs"
+            )
+        self._ytcfg = ytcfg
+        return self._ytcfg
+
+    @property
+    def age_restricted(self) -> bool:
+        """Whether the page restricts the video by age."""
+        return bool(self._matches['age_restriction'])
+
+    @property
+    def publish_date(self) -> Optional[datetime]:
+        """The publish date of the video, with its timezone."""
+        for _, end in self._matches['date_published']:
+            match = self._date_regex.match(self.html, end)
+            if match:
+                return datetime.fromisoformat(match.group())
+        return None
+
+    @property
+    def js_url(self) -> str:
+        """The base JavaScript url of the player."""
+        try:
+            base_js = self.ytplayer_config['assets']['js']
+        except (KeyError, RegexMatchError):
+            base_js = self.ytplayer_js
+        return f"https://youtube.com{base_js}"
+
+
 def js_url(html: str) -> str:
     """Get the base JavaScript url.
 
@@ -271,11 +419,7 @@ def js_url(html: str) -> str:
     :param str html:
         The html contents of the watch page.
     """
-    try:
-        base_js = get_ytplayer_config(html)['assets']['js']
-    except (KeyError, RegexMatchError):
-        base_js = get_ytplayer_js(html)
-    return f"https://youtube.com{base_js}"
+    return WatchPage(html).js_url
 
 
 def mime_type_codec(mime_type_codec: str) -> Tuple[str, List[str]]:
@@ -314,21 +458,7 @@ def get_ytplayer_js(html: str) -> Any:
     :returns:
         Path to YouTube's base.js file.
     """
-    js_url_patterns = [
-        r"(/s/player/[\w\d]+/[\w\d_/.]+/base\.js)"
-    ]
-    for pattern in js_url_patterns:
-        regex = re.compile(pattern)
-        function_match = regex.search(html)
-        if function_match:
-            logger.debug("finished regex search, matched: %s", pattern)
-            yt_player_js = function_match.group(1)
-            logger.debug("player JS: " + yt_player_js)
-            return yt_player_js
-
-    raise RegexMatchError(
-        caller="get_ytplayer_js", pattern="js_url_patterns"
-    )
+    return WatchPage(html).ytplayer_js
 
 
 def get_ytplayer_config(html: str) -> Any:
@@ -344,37 +474,7 @@ def get_ytplayer_config(html: str) -> Any:
     :returns:
         Substring of the html containing the encoded manifest data.
     """
-    logger.debug("finding initial function name")
-    config_patterns = [
-        r"ytplayer\.config\s*=\s*",
-        r"ytInitialPlayerResponse\s*=\s*"
-    ]
-    for pattern in config_patterns:
-        # Try each pattern consecutively if they don't find a match
-        try:
-            return parse_for_object(html, pattern)
-        except HTMLParseError as e:
-            logger.debug(f'Pattern failed: {pattern}')
-            logger.debug(e)
-            continue
-
-    # setConfig() needs to be handled a little differently.
-    # We want to parse the entire argument to setConfig()
-    #  and use then load that as json to find PLAYER_CONFIG
-    #  inside of it.
-    setconfig_patterns = [
-        r"yt\.setConfig\(.*['\"]PLAYER_CONFIG['\"]:\s*"
-    ]
-    for pattern in setconfig_patterns:
-        # Try each pattern consecutively if they don't find a match
-        try:
-            return parse_for_object(html, pattern)
-        except HTMLParseError:
-            continue
-
-    raise RegexMatchError(
-        caller="get_ytplayer_config", pattern="config_patterns, setconfig_patterns"
-    )
+    return WatchPage(html).ytplayer_config
 
 
 def get_ytcfg(html: str) -> str:
@@ -389,61 +489,114 @@ def get_ytcfg(html: str) -> str:
     :returns:
         Substring of the html containing the encoded manifest data.
     """
-    ytcfg = {}
-    ytcfg_patterns = [
-        r"ytcfg\s=\s",
-        r"ytcfg\.set\("
-    ]
-    for pattern in ytcfg_patterns:
-        # Try each pattern consecutively and try to build a cohesive object
-        try:
-            found_objects = parse_for_all_objects(html, pattern)
-            for obj in found_objects:
-                ytcfg.update(obj)
-        except HTMLParseError:
-            continue
+    return WatchPage(html).ytcfg
 
-    if ytcfg: # there is at least one item
-        return ytcfg
 
-    raise RegexMatchError(
-        caller="get_ytcfg", pattern="ytcfg_pattenrs"
+def _stream_url(stream: Dict, vid_info: Dict) -> Optional[str]:
+    """Return the url of a stream, raising if it is missing for a live stream."""
+    try:
+        return stream["url"]
+    except KeyError:
+        live_stream = (
+            vid_info.get("playabilityStatus", {}, )
+            .get("liveStreamability")
+        )
+        if live_stream:
+            raise LiveStreamError("UNKNOWN")
+        return None
+
+
+def _is_presigned(stream: Dict, url: str) -> bool:
+    # For certain videos, YouTube will just provide them pre-signed, in
+    # which case there's no real magic to download them and we can skip
+    # the whole signature descrambling entirely.
+    return "signature" in url or (
+        "s" not in stream and ("&sig=" in url or "&lsig=" in url)
     )
 
 
-def apply_po_token(stream_manifest: Dict, vid_info: Dict, po_token: str) -> None:
-    """Apply the proof of origin token to the stream manifest
+def finalize_stream_urls(stream_manifest: List[Dict],
+                         vid_info: Dict,
+                         js: Optional[str] = None,
+                         url_js: Optional[str] = None,
+                         po_token: Optional[str] = None) -> None:
+    """Apply the signature, the "n" parameter and the poToken to every stream url.
 
-    :param dict stream_manifest:
+    Each url is parsed once and re-serialized once. The distinct ciphered
+    signatures and "n" values of the whole manifest are deciphered up front,
+    so the manifest is left untouched if any of them fails.
+
+    :param list stream_manifest:
         Details of the media streams available.
+    :param dict vid_info:
+        The player response of the video.
+    :param str js:
+        The contents of the base.js asset file, or None when the client
+        does not require the js player.
+    :param str url_js:
+        Full base.js url
     :param str po_token:
         Proof of Origin Token.
     """
-    logger.debug(f'Applying poToken')
-    for i, stream in enumerate(stream_manifest):
-        try:
-            url: str = stream["url"]
-        except KeyError:
-            live_stream = (
-                vid_info.get("playabilityStatus", {}, )
-                .get("liveStreamability")
-            )
-            if live_stream:
-                raise LiveStreamError("UNKNOWN")
+    pending = []
+    signatures = {}
+    throttling = {}
+    for stream in stream_manifest:
+        url = _stream_url(stream, vid_info)
+        if url is None:
+            continue
 
         parsed_url = urlparse(url)
+        # Convert query params off url to dict, keeping the first value
+        query_params = {}
+        for k, v in parse_qsl(parsed_url.query):
+            query_params.setdefault(k, v)
+
+        if js is not None:
+            # 403 Forbidden fix.
+            if _is_presigned(stream, url):
+                logger.debug("signature found, skip decipher")
+            else:
+                signatures[stream["s"]] = None
+            # For WEB-based clients, YouTube sends an "n" parameter that throttles download speed.
+            # To decipher the value of "n", we must interpret the player's JavaScript.
+            if 'n' in query_params:
+                throttling[query_params['n']] = None
 
-        # Convert query params off url to dict
-        query_params = parse_qs(urlparse(url).query)
-        query_params = {
-            k: v[0] for k, v in query_params.items()
-        }
+        pending.append((stream, parsed_url, query_params))
 
-        query_params['pot'] = po_token
+    if signatures or throttling:
+        cipher = get_cipher(js=js, js_url=url_js)
+        for s in signatures:
+            signatures[s] = cipher.get_signature(ciphered_signature=s)
+        logger.debug(f'deciphered {len(signatures)} signatures')
+        for n in throttling:
+            throttling[n] = cipher.get_throttling(n)
+            logger.debug(f'Parameter n deciphered: {n} -> {throttling[n]}')
 
-        url = f'{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}?{urlencode(query_params)}'
+    if po_token:
+        logger.debug('Applying poToken')
 
-        stream_manifest[i]["url"] = url
+    for stream, parsed_url, query_params in pending:
+        if po_token:
+            query_params['pot'] = po_token
+        if stream.get("s") in signatures:
+            query_params['sig'] = signatures[stream["s"]]
+        if query_params.get('n') in throttling:
+            query_params['n'] = throttling[query_params['n']]
+
+        stream["url"] = f'{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}?{urlencode(query_params)}'  # noqa:E501
+
+
+def apply_po_token(stream_manifest: Dict, vid_info: Dict, po_token: str) -> None:
+    """Apply the proof of origin token to the stream manifest
+
+    :param dict stream_manifest:
+        Details of the media streams available.
+    :param str po_token:
+        Proof of Origin Token.
+    """
+    finalize_stream_urls(stream_manifest, vid_info, po_token=po_token)
 
 
 def apply_signature(stream_manifest: Dict, vid_info: Dict, js: str, url_js: str) -> None:
@@ -457,65 +610,7 @@ def apply_signature(stream_manifest: Dict, vid_info: Dict, js: str, url_js: str)
         Full base.js url
 
     """
-    cipher = Cipher(js=js, js_url=url_js)
-    discovered_n = dict()
-    for i, stream in enumerate(stream_manifest):
-        try:
-            url: str = stream["url"]
-        except KeyError:
-            live_stream = (
-                vid_info.get("playabilityStatus", {}, )
-                .get("liveStreamability")
-            )
-            if live_stream:
-                raise LiveStreamError("UNKNOWN")
-
-        parsed_url = urlparse(url)
-
-        # Convert query params off url to dict
-        query_params = parse_qs(urlparse(url).query)
-        query_params = {
-            k: v[0] for k, v in query_params.items()
-        }
-
-        # 403 Forbidden fix.
-        if "signature" in url or (
-                "s" not in stream and ("&sig=" in url or "&lsig=" in url)
-        ):
-            # For certain videos, YouTube will just provide them pre-signed, in
-            # which case there's no real magic to download them and we can skip
-            # the whole signature descrambling entirely.
-            logger.debug("signature found, skip decipher")
-
-        else:
-            signature = cipher.get_signature(ciphered_signature=stream["s"])
-
-            logger.debug(
-                "finished descrambling signature for itag=%s", stream["itag"]
-            )
-
-            query_params['sig'] = signature
-
-        if 'n' in query_params.keys():
-            # For WEB-based clients, YouTube sends an "n" parameter that throttles download speed.
-            # To decipher the value of "n", we must interpret the player's JavaScript.
-
-            initial_n = query_params['n']
-            logger.debug(f'Parameter n is: {initial_n}')
-
-            # Check if any previous stream decrypted the parameter
-            if initial_n not in discovered_n:
-                discovered_n[initial_n] = cipher.get_throttling(initial_n)
-            else:
-                logger.debug('Parameter n found skipping decryption')
-
-            new_n = discovered_n[initial_n]
-            query_params['n'] = new_n
-            logger.debug(f'Parameter n deciphered: {new_n}')
-
-        url = f'{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}?{urlencode(query_params)}'  # noqa:E501
-
-        stream_manifest[i]["url"] = url
+    finalize_stream_urls(stream_manifest, vid_info, js=js, url_js=url_js)
 
 
 def apply_descrambler(stream_data: Dict) -> Optional[List[Dict]]:
@@ -567,17 +662,7 @@ def initial_data(watch_html: str) -> dict:
     @param watch_html: Html of the watch page
     @return:
     """
-    patterns = [
-        r"window\[['\"]ytInitialData['\"]]\s*=\s*",
-        r"ytInitialData\s*=\s*"
-    ]
-    for pattern in patterns:
-        try:
-            return parse_for_object(watch_html, pattern)
-        except HTMLParseError:
-            pass
-
-    raise RegexMatchError(caller='initial_data', pattern='initial_data_pattern')
+    return WatchPage(watch_html).initial_data
 
 
 def initial_player_response(watch_html: str) -> str:
@@ -589,20 +674,7 @@ def initial_player_response(watch_html: str) -> str:
     @param watch_html: Html of the watch page
     @return:
     """
-    patterns = [
-        r"window\[['\"]ytInitialPlayerResponse['\"]]\s*=\s*",
-        r"ytInitialPlayerResponse\s*=\s*"
-    ]
-    for pattern in patterns:
-        try:
-            return parse_for_object(watch_html, pattern)
-        except HTMLParseError:
-            pass
-
-    raise RegexMatchError(
-        caller='initial_player_response',
-        pattern='initial_player_response_pattern'
-    )
+    return WatchPage(watch_html).initial_player_response
 
 
 def metadata(initial_data) -> Optional[YouTubeMetadata]:
@@ -640,3 +712,108 @@ def metadata(initial_data) -> Optional[YouTubeMetadata]:
     metadata_rows = [x["metadataRowRenderer"] for x in metadata_rows]
 
     return YouTubeMetadata(metadata_rows)
+
+
+_renderer_views_regex = re.compile(r'^(\d[\d,]*|No) views?$')
+
+
+def _renderer_text(text: Any) -> Optional[str]:
+    """Join the ``simpleText``, ``runs`` or view model ``content`` of a text field."""
+    if not isinstance(text, dict):
+        return None
+    if 'simpleText' in text:
+        return text['simpleText']
+    if 'runs' in text:
+        return ''.join(run.get('text', '') for run in text['runs'])
+    return text.get('content')
+
+
+def _renderer_length(length_text: Optional[str]) -> Optional[str]:
+    """Convert a "1:02:03" duration to seconds, as ``lengthSeconds`` holds them."""
+    if not length_text:
+        return None
+    try:
+        seconds = 0
+        for part in length_text.split(':'):
+            seconds = seconds * 60 + int(part)
+    except ValueError:
+        return None
+    return str(seconds)
+
+
+def renderer_video_details(item: Dict) -> Dict:
+    """Extract the ``videoDetails`` fields a listing already holds for a video.
+
+    Search results, playlists and channel pages render every video with its
+    title, author, thumbnails and mostly its length and view count, so a
+    :class:`YouTube <YouTube>` built from them can show these without a
+    ``player`` request.
+
+    :param dict item:
+        A listing item holding a ``videoRenderer``, ``playlistVideoRenderer``,
+        ``gridVideoRenderer``, ``compactVideoRenderer``, ``reelItemRenderer``
+        or ``shortsLockupViewModel``, optionally wrapped in a ``richItemRenderer``.
+    :rtype: Dict
+    :returns:
+        The fields found, with the keys and formats of ``videoDetails``.
+        Approximate values, such as "1.2M views", are left out.
+    """
+    if not isinstance(item, dict):
+        return {}
+    item = item.get('richItemRenderer', {}).get('content', item)
+
+    details = {}
+    if 'shortsLockupViewModel' in item:
+        renderer = item['shortsLockupViewModel']
+        overlay = renderer.get('overlayMetadata', {})
+        title = _renderer_text(overlay.get('primaryText'))
+        if title:
+            details['title'] = title
+        views_text = _renderer_text(overlay.get('secondaryText'))
+        sources = renderer.get('thumbnail', {}).get('sources')
+        if sources:
+            details['thumbnail'] = {'thumbnails': sources}
+    else:
+        for key in ('videoRenderer', 'playlistVideoRenderer', 'gridVideoRenderer', 'compactVideoRenderer',
+                    'reelItemRenderer'):
+            if key in item:
+                renderer = item[key]
+                break
+        else:
+            return {}
+
+        title = _renderer_text(renderer.get('title')) or _renderer_text(renderer.get('headline'))
+        if title:
+            details['title'] = title
+
+        for byline_key in ('ownerText', 'longBylineText', 'shortBylineText'):
+            runs = renderer.get(byline_key, {}).get('runs')
+            if runs:
+                details['author'] = runs[0].get('text')
+                channel_id = runs[0].get('navigationEndpoint', {}).get('browseEndpoint', {}).get('browseId')
+                if channel_id:
+                    details['channelId'] = channel_id
+                break
+
+        length_seconds = renderer.get('lengthSeconds')
+        if length_seconds is None:
+            length_text = _renderer_text(renderer.get('lengthText'))
+            if length_text is None:
+                for overlay in renderer.get('thumbnailOverlays', []):
+                    if 'thumbnailOverlayTimeStatusRenderer' in overlay:
+                        length_text = _renderer_text(overlay['thumbnailOverlayTimeStatusRenderer'].get('text'))
+                        break
+            length_seconds = _renderer_length(length_text)
+        if length_seconds is not None:
+            details['lengthSeconds'] = str(length_seconds)
+
+        views_text = _renderer_text(renderer.get('viewCountText'))
+        thumbnails = renderer.get('thumbnail', {}).get('thumbnails')
+        if thumbnails:
+            details['thumbnail'] = {'thumbnails': thumbnails}
+
+    match = _renderer_views_regex.match(views_text or '')
+    if match:
+        count = match.group(1)
+        details['viewCount'] = '0' if count == 'No' else count.replace(',', '')
+    return details
@@ -7,7 +7,8 @@ import os
 import re
 import warnings
 import shutil
-from typing import Any, Callable, Dict, List, Optional, TypeVar
+import threading
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
 from urllib import request
 
 from pytubefix.exceptions import RegexMatchError
@@ -26,75 +27,116 @@ class DeferredGeneratorList:
     example, you can iterate over elements in the list without accessing them
     all simultaneously. This should allow for speed improvements for playlist
     and channel interactions.
+
+    Indexing and slicing only generate the elements up to the requested
+    position. Negative positions and slices without an end need every element.
     """
-    def __init__(self, generator):
+    def __init__(self, generator, known_length: Optional[Union[int, Callable[[], Optional[int]]]] = None):
         """Construct a :class:`DeferredGeneratorList <DeferredGeneratorList>`.
 
         :param generator generator:
             The deferrable generator to create a wrapper for.
-        :param func func:
-            (Optional) A function to call on the generator items to produce the list.
+        :param known_length:
+            (Optional) The expected number of elements, or a function returning
+            it, used by :attr:`known_length` until every element is generated.
         """
         self.gen = generator
         self._elements = []
+        self._exhausted = False
+        self._known_length = known_length
+        self._iter_index = 0
+        # Generators can not be advanced from two threads at once
+        self._lock = threading.Lock()
 
     def __eq__(self, other):
         """We want to mimic list behavior for comparison."""
         return list(self) == other
 
+    def _fill(self, count: Optional[int]) -> None:
+        """Generate elements until there are ``count`` of them, or all if None."""
+        if self._exhausted or (count is not None and len(self._elements) >= count):
+            return
+        with self._lock:
+            while not self._exhausted and (count is None or len(self._elements) < count):
+                try:
+                    self._elements.append(next(self.gen))
+                except StopIteration:
+                    self._exhausted = True
+
+    @staticmethod
+    def _slice_needs(key: slice) -> Optional[int]:
+        """Number of elements a slice needs, None if it needs all of them."""
+        start, stop, step = key.start, key.stop, key.step or 1
+        if (start is not None and start < 0) or (stop is not None and stop < 0):
+            return None
+        if step > 0:
+            return stop
+        # Negative steps walk back from start
+        return None if start is None else start + 1
+
     def __getitem__(self, key) -> Any:
         """Only generate items as they're asked for."""
         # We only allow querying with indexes.
-        if not isinstance(key, (int, slice)):
+        if isinstance(key, slice):
+            self._fill(self._slice_needs(key))
+            return self._elements[key]
+        if not isinstance(key, int):
             raise TypeError('Key must be either a slice or int.')
 
-        # Convert int keys to slice
-        key_slice = key
-        if isinstance(key, int):
-            key_slice = slice(key, key + 1, 1)
-
-        # Generate all elements up to the final item
-        while len(self._elements) < key_slice.stop:
-            try:
-                next_item = next(self.gen)
-            except StopIteration:
-                # If we can't find enough elements for the slice, raise an IndexError
-                raise IndexError
-            else:
-                self._elements.append(next_item)
-
-        return self._elements[key]
+        self._fill(None if key < 0 else key + 1)
+        try:
+            return self._elements[key]
+        except IndexError:
+            raise IndexError('DeferredGeneratorList index out of range') from None
 
     def __iter__(self):
         """Custom iterator for dynamically generated list."""
         iter_index = 0
         while True:
-            try:
-                curr_item = self[iter_index]
-            except IndexError:
+            self._fill(iter_index + 1)
+            if iter_index >= len(self._elements):
                 return
-            else:
-                yield curr_item
-                iter_index += 1
+            yield self._elements[iter_index]
+            iter_index += 1
 
     def __next__(self) -> Any:
         """Fetch next element in iterator."""
         try:
-            curr_element = self[self.iter_index]
+            curr_element = self[self._iter_index]
         except IndexError:
             raise StopIteration
-        self.iter_index += 1
+        self._iter_index += 1
         return curr_element  # noqa:R504
 
+    def __bool__(self) -> bool:
+        self._fill(1)
+        return bool(self._elements)
+
     def __len__(self) -> int:
         """Return length of list of all items."""
         self.generate_all()
         return len(self._elements)
 
+    @property
+    def known_length(self) -> Optional[int]:
+        """Number of elements, without generating them.
+
+        It is exact once every element was generated, and before that the
+        ``known_length`` given to the constructor, which is None if unknown.
+
+        :rtype: Optional[int]
+        """
+        if self._exhausted:
+            return len(self._elements)
+        if callable(self._known_length):
+            self._known_length = self._known_length()
+        return self._known_length
+
     def __repr__(self) -> str:
-        """String representation of all items."""
-        self.generate_all()
-        return str(self._elements)
+        """String representation of the items generated so far."""
+        if self._exhausted:
+            return str(self._elements)
+        return '[' + ''.join(f'{element!r}, ' for element in self._elements) + '...]'
 
     def __reversed__(self):
         self.generate_all()
@@ -102,13 +144,7 @@ class DeferredGeneratorList:
 
     def generate_all(self):
         """Generate all items."""
-        while True:
-            try:
-                next_item = next(self.gen)
-            except StopIteration:
-                break
-            else:
-                self._elements.append(next_item)
+        self._fill(None)
 
 
 def regex_search(pattern: str, string: str, group: int) -> str:
@@ -257,7 +293,12 @@ def target_directory(output_path: Optional[str] = None) -> str:
     return output_path
 
 
+# Proxies registered through install_proxy, keyed by scheme.
+installed_proxies: Dict[str, str] = {}
+
+
 def install_proxy(proxy_handler: Dict[str, str]) -> None:
+    installed_proxies.update(proxy_handler)
     proxy_support = request.ProxyHandler(proxy_handler)
     opener = request.build_opener(proxy_support)
     request.install_opener(opener)
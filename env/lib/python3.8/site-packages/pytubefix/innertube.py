@@ -5,14 +5,19 @@ interfaces returns raw results. These should instead be parsed to extract
 the useful information for the end user.
 """
 # Native python imports
+import asyncio
+import copy
+import hashlib
 import json
 import os
 import pathlib
+import socket
+import threading
 import time
-from typing import Tuple
+from typing import Optional, Tuple
 from urllib import parse
 
-from pytubefix import request
+from pytubefix import async_request, request, response_cache
 from pytubefix.helpers import reset_cache
 
 # YouTube on TV client secrets
@@ -514,6 +519,14 @@ _token_timeout = 1800
 _cache_dir = pathlib.Path(__file__).parent.resolve() / '__cache__'
 _token_file = os.path.join(_cache_dir, 'tokens.json')
 
+# visitorData shared by every request of the process
+visitor_data_ttl = 3600  # seconds before a new visitorData is requested
+visitor_data_timeout = 30  # seconds the request of a new visitorData may take
+_visitor_data: Optional[str] = None
+_visitor_data_expires = 0.0
+_visitor_data_request: Optional[threading.Event] = None  # set when the pending request ends
+_visitor_data_lock = threading.RLock()
+
 
 def _default_oauth_verifier(verification_url: str, user_code: str):
     """ Default `print(...)` and `input(...)` for oauth verification """
@@ -531,6 +544,98 @@ def _default_po_token_verifier() -> Tuple[str, str]:
     return visitor_data, po_token
 
 
+def _response_visitor_data(response: dict) -> Optional[str]:
+    try:
+        response_context = response['responseContext']
+    except (KeyError, TypeError):
+        return None
+    if response_context.get('visitorData'):
+        return response_context['visitorData']
+    for service in response_context.get('serviceTrackingParams', []):
+        for param in service.get('params', []):
+            if param.get('key') == 'visitor_data' and param.get('value'):
+                return param['value']
+    return None
+
+
+def _valid_visitor_data() -> Optional[str]:
+    if _visitor_data and time.time() < _visitor_data_expires:
+        return _visitor_data
+    return None
+
+
+def get_visitor_data(video_id: Optional[str] = None) -> Optional[str]:
+    """Return the visitorData shared by the whole process.
+
+    When there is none or it has expired, a new one is read from the WEB
+    player response of ``video_id``. Concurrent callers wait for that
+    request instead of making their own, at most
+    :data:`visitor_data_timeout` seconds.
+
+    :param str video_id:
+        (Optional) Video used to request a new visitorData.
+    :rtype: Optional[str]
+    :returns:
+        The visitorData, or None if there is no valid one and no
+        ``video_id`` was given.
+    """
+    global _visitor_data, _visitor_data_expires, _visitor_data_request
+    with _visitor_data_lock:
+        visitor_data = _valid_visitor_data()
+        if visitor_data or video_id is None:
+            return visitor_data
+        pending = _visitor_data_request
+        if pending is None:
+            _visitor_data_request = threading.Event()
+
+    if pending is not None:
+        # Another thread is requesting one
+        pending.wait(visitor_data_timeout)
+        with _visitor_data_lock:
+            return _valid_visitor_data()
+
+    # The lock is not held during the request, so readers of a valid
+    # visitorData never wait for it.
+    visitor_data = None
+    try:
+        innertube = InnerTube('WEB')
+        innertube.timeout = visitor_data_timeout
+        visitor_data = _response_visitor_data(innertube.player(video_id))
+    finally:
+        with _visitor_data_lock:
+            if visitor_data:
+                _visitor_data = visitor_data
+                _visitor_data_expires = time.time() + visitor_data_ttl
+            _visitor_data_request.set()
+            _visitor_data_request = None
+    return visitor_data
+
+
+def share_visitor_data(visitor_data: Optional[str]) -> None:
+    """Offer a visitorData seen in a response or page to the whole process.
+
+    It is only kept if there is no valid shared visitorData yet.
+
+    :param str visitor_data:
+        The visitorData.
+    """
+    global _visitor_data, _visitor_data_expires
+    if not visitor_data:
+        return
+    with _visitor_data_lock:
+        if not _visitor_data or time.time() >= _visitor_data_expires:
+            _visitor_data = visitor_data
+            _visitor_data_expires = time.time() + visitor_data_ttl
+
+
+def clear_visitor_data() -> None:
+    """Forget the shared visitorData, so the next one is requested again."""
+    global _visitor_data, _visitor_data_expires
+    with _visitor_data_lock:
+        _visitor_data = None
+        _visitor_data_expires = 0.0
+
+
 class InnerTube:
     """Object for interacting with the innertube API."""
 
@@ -572,8 +677,11 @@ class InnerTube:
             (if passed, else default verifier will be used)
         """
         self.client_name = client
-        self.innertube_context = _default_clients[client]['innertube_context']
-        self.header = _default_clients[client]['header']
+        # The client defaults are shared by every instance, so each one gets
+        # its own copy to customize. Requests never modify it either: they
+        # send a new payload built on top of it.
+        self.innertube_context = copy.deepcopy(_default_clients[client]['innertube_context'])
+        self.header = dict(_default_clients[client]['header'])
         self.api_key = _default_clients[client]['api_key']
         self.require_js_player = _default_clients[client]['require_js_player']
         self.require_po_token = _default_clients[client]['require_po_token']
@@ -583,6 +691,9 @@ class InnerTube:
         self.access_po_token = None
         self.access_visitorData = None
 
+        # Seconds the API requests may take
+        self.timeout = socket._GLOBAL_DEFAULT_TIMEOUT
+
         self.use_oauth = use_oauth
         self.allow_cache = allow_cache
         self.oauth_verifier = oauth_verifier or _default_oauth_verifier
@@ -711,9 +822,13 @@ class InnerTube:
         """
         Insert visitorData in the API request
         """
-        self.innertube_context['context']['client'].update({
-            "visitorData": visitor_data
-        })
+        # Replaced rather than updated in place, so a request that is being
+        # sent from another thread keeps a consistent context.
+        context = self.innertube_context['context']
+        self.innertube_context = {
+            **self.innertube_context,
+            'context': {**context, 'client': {**context['client'], 'visitorData': visitor_data}}
+        }
 
     def insert_po_token(self, visitor_data:str=None, po_token:str=None) -> None:
         """
@@ -721,11 +836,12 @@ class InnerTube:
         """
         self.insert_visitor_data(self.access_visitorData or visitor_data)
 
-        self.innertube_context.update({
+        self.innertube_context = {
+            **self.innertube_context,
             "serviceIntegrityDimensions": {
                 "poToken": self.access_po_token or po_token
             }
-        })
+        }
 
     def fetch_po_token(self) -> None:
         """
@@ -736,6 +852,21 @@ class InnerTube:
 
         self.insert_po_token()
 
+    def _cache_key(self, endpoint: str, video_id: str) -> Tuple[str, ...]:
+        """Return the key of the responses cached for this client and identity."""
+        identity = 'anonymous'
+        if self.use_oauth:
+            # The refresh token outlives the access tokens derived from it
+            token = self.refresh_token or ''
+            identity = 'oauth:' + hashlib.sha1(token.encode('utf-8')).hexdigest()
+        if 'serviceIntegrityDimensions' in self.base_data:
+            po_token = self.base_data['serviceIntegrityDimensions']['poToken'] or ''
+            identity += ':pot:' + hashlib.sha1(po_token.encode('utf-8')).hexdigest()
+        # Ciphered urls can only be deciphered with the player they were signed for
+        sts = self.base_data.get('playbackContext', {}).get(
+            'contentPlaybackContext', {}).get('signatureTimestamp', '')
+        return endpoint, self.client_name, video_id, identity, str(sts)
+
     @property
     def base_url(self) -> str:
         """Return the base url endpoint for the innertube API."""
@@ -753,8 +884,12 @@ class InnerTube:
             'prettyPrint': "false"
         }
 
-    def _call_api(self, endpoint, query, data):
-        """Make a request to a given endpoint with the provided query parameters and data."""
+    def _api_request(self, endpoint, query, data=None) -> Tuple[str, dict, dict]:
+        """Build the url, headers and json of a request to a given endpoint.
+
+        The json sent is a new dict made of :attr:`base_data` and the
+        request specific ``data`` on top of it.
+        """
         # When YouTube used an API key, it was necessary to remove it when using oauth
         # if self.use_oauth:
         #     del query['key']
@@ -780,14 +915,44 @@ class InnerTube:
                 self.fetch_po_token()
 
         headers.update(self.header)
+        return endpoint_url, headers, {**self.base_data, **(data or {})}
 
+    def _api_result(self, body) -> dict:
+        result = json.loads(body)
+        # Only an anonymous visitorData can be used by every other request
+        if not (self.use_oauth or self.use_po_token) and 'serviceIntegrityDimensions' not in self.base_data:
+            share_visitor_data(_response_visitor_data(result))
+        return result
+
+    def _call_api(self, endpoint, query, data=None):
+        """Make a request to a given endpoint with the provided query parameters and data."""
+        endpoint_url, headers, data = self._api_request(endpoint, query, data)
         response = request._execute_request(
+            endpoint_url,
+            'POST',
+            headers=headers,
+            data=data,
+            timeout=self.timeout
+        )
+        return self._api_result(response.read())
+
+    async def _call_api_async(self, endpoint, query, data=None):
+        """Make a request to a given endpoint without blocking the event loop."""
+        if self.use_oauth or self.use_po_token:
+            # Getting the tokens may block on requests or on the verifiers
+            loop = asyncio.get_running_loop()
+            endpoint_url, headers, data = await loop.run_in_executor(
+                None, self._api_request, endpoint, query, data
+            )
+        else:
+            endpoint_url, headers, data = self._api_request(endpoint, query, data)
+        response = await async_request._execute_request(
             endpoint_url,
             'POST',
             headers=headers,
             data=data
         )
-        return json.loads(response.read())
+        return self._api_result(await response.read())
 
     def browse(self, continuation=None, visitor_data=None):
         """Make a request to the browse endpoint.
@@ -803,13 +968,15 @@ class InnerTube:
         endpoint = f'{self.base_url}/browse'
 
         query = self.base_params
+        data = {}
 
         if continuation:
-            self.base_data.update({"continuation": continuation})
+            data['continuation'] = continuation
         if visitor_data:
-            self.base_data['context']['client'].update({"visitorData": visitor_data})
+            context = self.base_data['context']
+            data['context'] = {**context, 'client': {**context['client'], 'visitorData': visitor_data}}
 
-        return self._call_api(endpoint, query, self.base_data)
+        return self._call_api(endpoint, query, data)
 
     def reel(self):
         """Make a request to the reel endpoint.
@@ -849,17 +1016,28 @@ class InnerTube:
         :returns:
             Raw player details results.
         """
+        data = {}
 
         if continuation:
-            self.base_data.update({"continuation": continuation})
+            data['continuation'] = continuation
 
         if video_id:
-            self.base_data.update({'videoId': video_id, 'contentCheckOk': "true"})
+            data.update({'videoId': video_id, 'contentCheckOk': "true"})
 
         endpoint = f'{self.base_url}/next'
         query = self.base_params
 
-        return self._call_api(endpoint, query, self.base_data)
+        if continuation or not video_id:
+            return self._call_api(endpoint, query, data)
+
+        cached = response_cache.get(self._cache_key('next', video_id))
+        if cached is not None:
+            return cached
+        result = self._call_api(endpoint, query, data)
+        response_cache.put(
+            self._cache_key('next', video_id), result, time.time() + response_cache.next_ttl
+        )
+        return result
 
     def player(self, video_id):
         """Make a request to the player endpoint.
@@ -873,8 +1051,40 @@ class InnerTube:
         endpoint = f'{self.base_url}/player'
         query = self.base_params
 
-        self.base_data.update({'videoId': video_id, 'contentCheckOk': "true"})
-        return self._call_api(endpoint, query, self.base_data)
+        data = {'videoId': video_id, 'contentCheckOk': "true"}
+
+        cached = response_cache.get(self._cache_key('player', video_id))
+        if cached is not None:
+            return cached
+        result = self._call_api(endpoint, query, data)
+        # The key is built again, the call may have fetched the oauth tokens
+        response_cache.put(
+            self._cache_key('player', video_id), result, response_cache.player_expiration(result)
+        )
+        return result
+
+    async def player_async(self, video_id):
+        """Make a request to the player endpoint without blocking the event loop.
+
+        :param str video_id:
+            The video id to get player info for.
+        :rtype: dict
+        :returns:
+            Raw player info results.
+        """
+        endpoint = f'{self.base_url}/player'
+        query = self.base_params
+
+        data = {'videoId': video_id, 'contentCheckOk': "true"}
+
+        cached = response_cache.get(self._cache_key('player', video_id))
+        if cached is not None:
+            return cached
+        result = await self._call_api_async(endpoint, query, data)
+        response_cache.put(
+            self._cache_key('player', video_id), result, response_cache.player_expiration(result)
+        )
+        return result
 
     def search(self, search_query, continuation=None, data=None):
         """Make a request to the search endpoint.
@@ -891,12 +1101,11 @@ class InnerTube:
         """
         endpoint = f'{self.base_url}/search'
         query = self.base_params
-        data = data if data else {}
-   
-        self.base_data.update({'query': search_query})
+        data = dict(data) if data else {}
+
         if continuation:
             data['continuation'] = continuation
-        data.update(self.base_data)
+        data['query'] = search_query
         return self._call_api(endpoint, query, data)
 
     def verify_age(self, video_id):
@@ -923,7 +1132,6 @@ class InnerTube:
             },
             'setControvercy': True
         }
-        data.update(self.base_data)
         result = self._call_api(endpoint, self.base_params, data)
         return result
 
@@ -937,5 +1145,5 @@ class InnerTube:
             'videoId': video_id,
         }
         query.update(self.base_params)
-        result = self._call_api(endpoint, query, self.base_data)
+        result = self._call_api(endpoint, query)
         return result
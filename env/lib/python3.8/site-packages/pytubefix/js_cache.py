@@ -0,0 +1,128 @@
+"""
+This module keeps the player JavaScript and what is extracted from it on disk.
+
+Everything is keyed by the base.js url, which changes with every player
+version, so a new process can reuse the asset, the signature and throttling
+function names and the source of the functions and objects they use without
+downloading or scanning base.js again.
+"""
+import hashlib
+import json
+import logging
+import os
+import pathlib
+from typing import Any, Dict, Optional
+
+from pytubefix.version import __version__
+
+logger = logging.getLogger(__name__)
+
+_cache_dir = pathlib.Path(__file__).parent.resolve() / '__cache__' / 'js'
+
+
+def _path(js_url: str, suffix: str) -> pathlib.Path:
+    key = hashlib.sha1(js_url.encode('utf-8')).hexdigest()
+    return _cache_dir / f'{key}{suffix}'
+
+
+def _write(path: pathlib.Path, content: str) -> None:
+    """Write ``content`` so that concurrent readers never see a partial file."""
+    try:
+        os.makedirs(_cache_dir, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug(f'could not write js cache {path}: {e}')
+
+
+def load_js(js_url: str) -> Optional[str]:
+    """Return the cached contents of the base.js at ``js_url``, if any.
+
+    :param str js_url:
+        Full base.js url
+    :rtype: Optional[str]
+    """
+    try:
+        with open(_path(js_url, '.js'), 'r', encoding='utf-8') as f:
+            return f.read() or None
+    except OSError:
+        return None
+
+
+def save_js(js_url: str, js: str) -> None:
+    """Store the contents of the base.js at ``js_url``.
+
+    :param str js_url:
+        Full base.js url
+    :param str js:
+        The contents of the base.js asset file.
+    """
+    _write(_path(js_url, '.js'), js)
+
+
+def load_functions(js_url: str) -> Optional[Dict[str, Any]]:
+    """Return the function names and source extracted from ``js_url``.
+
+    Entries written by another pytubefix version are ignored, since the
+    extraction logic may have changed in between.
+
+    :param str js_url:
+        Full base.js url
+    :rtype: Optional[Dict[str, Any]]
+    :returns:
+        A dict with ``signature_function_name``, ``throttling_function_name``,
+        ``functions`` mapping each name to its ``[argnames, code]`` and
+        ``objects`` mapping each object name to its methods, the same way.
+    """
+    try:
+        with open(_path(js_url, '.json'), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != __version__ or data.get('js_url') != js_url:
+        return None
+    return data
+
+
+def save_functions(js_url: str,
+                   signature_function_name: str,
+                   throttling_function_name: str,
+                   functions: Dict[str, Any],
+                   objects: Optional[Dict[str, Any]] = None) -> None:
+    """Store the function names and source extracted from ``js_url``.
+
+    :param str js_url:
+        Full base.js url
+    :param str signature_function_name:
+        Name of the function that computes the signature.
+    :param str throttling_function_name:
+        Name of the function that computes the throttling parameter.
+    :param dict functions:
+        Maps function names to their ``[argnames, code]``.
+    :param dict objects:
+        (Optional) Maps object names to their methods, each mapped to
+        its ``[argnames, code]``.
+    """
+    _write(_path(js_url, '.json'), json.dumps({
+        'version': __version__,
+        'js_url': js_url,
+        'signature_function_name': signature_function_name,
+        'throttling_function_name': throttling_function_name,
+        'functions': functions,
+        'objects': objects or {},
+    }))
+
+
+def remove(js_url: str) -> None:
+    """Drop everything cached for ``js_url``.
+
+    :param str js_url:
+        Full base.js url
+    """
+    for suffix in ('.js', '.json'):
+        try:
+            os.remove(_path(js_url, suffix))
+        except OSError:
+            pass
@@ -0,0 +1,1629 @@
+"""
+This module compiles the JavaScript obfuscation functions into Python closures.
+
+:class:`JSInterpreter <pytubefix.jsinterp.JSInterpreter>` re-parses the source
+text of a function on every call. :class:`JSCompiler` instead tokenizes and
+parses a function once, resolves its variables to frame slots and turns it
+into a tree of closures that can be called many times. Values use the same
+representation as the interpreter (``list``, ``dict``, ``JS_Undefined``...)
+and compiled functions take the same ``(args, kwargs, allow_recursion)``
+arguments, so both kinds of functions can call each other.
+
+Only the subset of JavaScript found in player functions is supported. Any
+other construct makes :class:`JSCompiler` fall back to the interpreter for
+that function.
+"""
+import logging
+import math
+import re
+
+from pytubefix.jsinterp import (
+    JS_Throw, JS_Undefined, JSInterpreter, function_with_repr, unified_timestamp
+)
+
+logger = logging.getLogger(__name__)
+
+_undefined = JS_Undefined
+_NaN = float('nan')
+
+_TOKEN_RE = re.compile(r'''(?xs)
+    (?P<space>\s+|//[^\n]*|/\*.*?\*/)|
+    (?P<num>0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)|
+    (?P<str>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')|
+    (?P<name>[a-zA-Z_$][\w$]*)|
+    (?P<punc>
+        >>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|=>|==|!=|<=|>=|&&|\|\||\?\?|
+        \?\.(?!\d)|\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|\*\*|<<|>>|
+        [{}()\[\];,<>+\-*/%&|^!~?:=.]
+    )
+''')
+
+_ESCAPE_RE = re.compile(
+    r'\\(?:x([0-9a-fA-F]{2})|u\{([0-9a-fA-F]+)\}|u([0-9a-fA-F]{4})|([0-7]{1,3})|(\r\n|[\s\S]))')
+_SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v'}
+
+# Tokens after which a "/" starts a regular expression rather than a division
+_REGEX_PRECEDERS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'instanceof',
+                    'new', 'delete', 'void', 'throw'}
+
+_ASSIGN_OPS = {'=', '+=', '-=', '*=', '/=', '%=', '**=', '<<=', '>>=', '>>>=', '&=', '|=', '^='}
+
+_BINARY_PRECEDENCE = {
+    '??': 1, '||': 2, '&&': 3, '|': 4, '^': 5, '&': 6,
+    '==': 7, '!=': 7, '===': 7, '!==': 7,
+    '<': 8, '>': 8, '<=': 8, '>=': 8, 'instanceof': 8, 'in': 8,
+    '<<': 9, '>>': 9, '>>>': 9,
+    '+': 10, '-': 10,
+    '*': 11, '/': 11, '%': 11,
+    '**': 12,
+}
+
+
+def _unescape(m):
+    hex_code, braced, unicode, octal, char = m.groups()
+    if hex_code or braced or unicode:
+        return chr(int(hex_code or braced or unicode, 16))
+    if octal:
+        return chr(int(octal, 8))
+    if char in ('\r\n', '\n', '\r', '\u2028', '\u2029'):
+        return ''
+    return _SIMPLE_ESCAPES.get(char, char)
+
+
+def _tokenize(code):
+    """Split ``code`` into ``(kind, value, newline_before)`` tokens."""
+    tokens = []
+    pos, newline = 0, False
+    while pos < len(code):
+        m = _TOKEN_RE.match(code, pos)
+        if not m:
+            raise JSInterpreter.Exception(f'Cannot compile: unexpected character {code[pos]!r}')
+        pos = m.end()
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == 'space':
+            newline = newline or '\n' in value
+            continue
+        if kind == 'num':
+            value = int(value, 16) if value[:2] in ('0x', '0X') else (
+                int(value) if value.isdigit() else float(value))
+        elif kind == 'str':
+            value = _ESCAPE_RE.sub(_unescape, value[1:-1])
+        elif kind == 'punc' and value in ('/', '/=') and (
+                not tokens
+                or tokens[-1][0] == 'punc' and tokens[-1][1] not in (')', ']', '}')
+                or tokens[-1][0] == 'name' and tokens[-1][1] in _REGEX_PRECEDERS):
+            raise JSInterpreter.Exception('Cannot compile: regular expressions are not supported')
+        tokens.append((kind, value, newline))
+        newline = False
+    tokens.append(('eof', None, True))
+    return tokens
+
+
+class _Parser:
+    """Parse a function body into a tree of tuples."""
+
+    def __init__(self, code):
+        self.tokens = _tokenize(code)
+        self.pos = 0
+
+    def fail(self, msg):
+        kind, value, _ = self.tokens[self.pos]
+        raise JSInterpreter.Exception(f'Cannot compile: {msg} at {value!r}')
+
+    def peek(self, offset=0):
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def advance(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def at(self, value, kind='punc', offset=0):
+        token = self.peek(offset)
+        return token[0] == kind and token[1] == value
+
+    def accept(self, value, kind='punc'):
+        if self.at(value, kind):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, value, kind='punc'):
+        if not self.accept(value, kind):
+            self.fail(f'expected {value!r}')
+
+    def name(self):
+        kind, value, _ = self.advance()
+        if kind != 'name':
+            self.pos -= 1
+            self.fail('expected a name')
+        return value
+
+    def semicolon(self):
+        if self.accept(';'):
+            return
+        kind, value, newline = self.peek()
+        if not (kind == 'eof' or newline or (kind == 'punc' and value == '}')):
+            self.fail('expected ";"')
+
+    # Statements
+
+    def body(self):
+        statements = []
+        while self.peek()[0] != 'eof':
+            statements.append(self.statement())
+        return statements
+
+    def block(self):
+        self.expect('{')
+        statements = []
+        while not self.accept('}'):
+            statements.append(self.statement())
+        return statements
+
+    def statement(self):
+        kind, value, _ = self.peek()
+        if kind == 'punc':
+            if value == '{':
+                return ('block', self.block())
+            if value == ';':
+                self.advance()
+                return ('empty',)
+        elif kind == 'name':
+            method = getattr(self, f'statement_{value}', None)
+            if method is not None:
+                self.advance()
+                return method()
+            if self.at(':', offset=1):
+                self.fail('labels are not supported')
+        expression = self.expression()
+        self.semicolon()
+        return ('expr', expression)
+
+    def declarations(self):
+        declarations = []
+        while True:
+            name = self.name()
+            init = self.assignment() if self.accept('=') else None
+            declarations.append((name, init))
+            if not self.accept(','):
+                return ('var', declarations)
+
+    def statement_var(self):
+        declarations = self.declarations()
+        self.semicolon()
+        return declarations
+
+    statement_let = statement_const = statement_var
+
+    def statement_function(self):
+        name = self.name()
+        params, body = self.function_rest()
+        return ('funcdecl', name, params, body)
+
+    def statement_return(self):
+        kind, value, newline = self.peek()
+        if kind == 'eof' or newline or (kind == 'punc' and value in (';', '}')):
+            argument = None
+        else:
+            argument = self.expression()
+        self.semicolon()
+        return ('return', argument)
+
+    def statement_if(self):
+        self.expect('(')
+        test = self.expression()
+        self.expect(')')
+        consequent = self.statement()
+        alternate = self.statement() if self.accept('else', 'name') else None
+        return ('if', test, consequent, alternate)
+
+    def statement_for(self):
+        self.expect('(')
+        init = None
+        if self.at(';'):
+            pass
+        elif self.peek()[0] == 'name' and self.peek()[1] in ('var', 'let', 'const'):
+            self.advance()
+            init = self.declarations()
+        else:
+            init = ('expr', self.expression())
+        if self.peek()[0] == 'name' and self.peek()[1] in ('in', 'of'):
+            self.fail('for-in/of loops are not supported')
+        self.expect(';')
+        test = None if self.at(';') else self.expression()
+        self.expect(';')
+        update = None if self.at(')') else self.expression()
+        self.expect(')')
+        return ('for', init, test, update, self.statement())
+
+    def statement_while(self):
+        self.expect('(')
+        test = self.expression()
+        self.expect(')')
+        return ('for', None, test, None, self.statement())
+
+    def statement_do(self):
+        body = self.statement()
+        self.expect('while', 'name')
+        self.expect('(')
+        test = self.expression()
+        self.expect(')')
+        self.accept(';')
+        return ('do', body, test)
+
+    def statement_switch(self):
+        self.expect('(')
+        discriminant = self.expression()
+        self.expect(')')
+        self.expect('{')
+        cases = []
+        while not self.accept('}'):
+            if self.accept('default', 'name'):
+                test = None
+            else:
+                self.expect('case', 'name')
+                test = self.expression()
+            self.expect(':')
+            statements = []
+            while not (self.at('}') or self.at('case', 'name') or self.at('default', 'name')):
+                statements.append(self.statement())
+            cases.append((test, statements))
+        return ('switch', discriminant, cases)
+
+    def _jump(self, kind):
+        token_kind, _, newline = self.peek()
+        if token_kind == 'name' and not newline:
+            self.fail('labels are not supported')
+        self.semicolon()
+        return (kind,)
+
+    def statement_break(self):
+        return self._jump('break')
+
+    def statement_continue(self):
+        return self._jump('continue')
+
+    def statement_throw(self):
+        argument = self.expression()
+        self.semicolon()
+        return ('throw', argument)
+
+    def statement_try(self):
+        block = self.block()
+        param = handler = finalizer = None
+        if self.accept('catch', 'name'):
+            if self.accept('('):
+                param = self.name()
+                self.expect(')')
+            handler = self.block()
+        if self.accept('finally', 'name'):
+            finalizer = self.block()
+        if handler is None and finalizer is None:
+            self.fail('expected catch or finally')
+        return ('try', block, param, handler, finalizer)
+
+    def function_rest(self):
+        self.expect('(')
+        params = []
+        while not self.accept(')'):
+            params.append(self.name())
+            if not self.at(')'):
+                self.expect(',')
+        return params, self.block()
+
+    # Expressions
+
+    def expression(self):
+        expressions = [self.assignment()]
+        while self.accept(','):
+            expressions.append(self.assignment())
+        return expressions[0] if len(expressions) == 1 else ('seq', expressions)
+
+    def assignment(self):
+        left = self.conditional()
+        kind, value, _ = self.peek()
+        if kind == 'punc' and value in _ASSIGN_OPS:
+            if left[0] not in ('name', 'member'):
+                self.fail('invalid assignment target')
+            self.advance()
+            return ('assign', value, left, self.assignment())
+        if kind == 'punc' and value == '=>':
+            self.fail('arrow functions are not supported')
+        return left
+
+    def conditional(self):
+        test = self.binary(1)
+        if not self.accept('?'):
+            return test
+        consequent = self.assignment()
+        self.expect(':')
+        return ('cond', test, consequent, self.assignment())
+
+    def binary(self, min_precedence):
+        left = self.unary()
+        while True:
+            kind, op, _ = self.peek()
+            precedence = _BINARY_PRECEDENCE.get(op) if kind in ('punc', 'name') else None
+            if precedence is None or precedence < min_precedence:
+                return left
+            if op in ('in', 'instanceof'):
+                self.fail(f'operator {op} is not supported')
+            self.advance()
+            right = self.binary(precedence if op == '**' else precedence + 1)
+            if op in ('&&', '||', '??'):
+                left = ('logical', op, left, right)
+            else:
+                left = ('binary', op, left, right)
+
+    def unary(self):
+        kind, value, _ = self.peek()
+        if kind == 'punc' and value in ('!', '-', '+', '~'):
+            self.advance()
+            return ('unary', value, self.unary())
+        if kind == 'punc' and value in ('++', '--'):
+            self.advance()
+            target = self.unary()
+            if target[0] not in ('name', 'member'):
+                self.fail('invalid update target')
+            return ('update', value, True, target)
+        if kind == 'name' and value in ('typeof', 'void'):
+            self.advance()
+            return ('unary', value, self.unary())
+        if kind == 'name' and value == 'delete':
+            self.fail('delete is not supported')
+        expression = self.call()
+        kind, value, newline = self.peek()
+        if kind == 'punc' and value in ('++', '--') and not newline:
+            if expression[0] not in ('name', 'member'):
+                self.fail('invalid update target')
+            self.advance()
+            return ('update', value, False, expression)
+        return expression
+
+    def call(self):
+        if self.accept('new', 'name'):
+            callee = self.members(self.primary(), allow_calls=False)
+            args = self.arguments() if self.at('(') else []
+            expression = ('new', callee, args)
+        else:
+            expression = self.primary()
+        return self.members(expression, allow_calls=True)
+
+    def members(self, expression, allow_calls):
+        while True:
+            if self.accept('.'):
+                expression = ('member', expression, ('const', self.name()), False)
+            elif self.at('?.'):
+                self.advance()
+                if self.accept('['):
+                    key = self.expression()
+                    self.expect(']')
+                elif self.at('('):
+                    self.fail('optional calls are not supported')
+                else:
+                    key = ('const', self.name())
+                expression = ('member', expression, key, True)
+            elif self.accept('['):
+                key = self.expression()
+                self.expect(']')
+                expression = ('member', expression, key, False)
+            elif allow_calls and self.at('('):
+                expression = ('call', expression, self.arguments())
+            else:
+                return expression
+
+    def arguments(self):
+        self.expect('(')
+        args = []
+        while not self.accept(')'):
+            if self.at('...'):
+                self.fail('spread arguments are not supported')
+            args.append(self.assignment())
+            if not self.at(')'):
+                self.expect(',')
+        return args
+
+    def primary(self):
+        kind, value, _ = self.advance()
+        if kind in ('num', 'str'):
+            return ('const', value)
+        if kind == 'punc':
+            if value == '(':
+                expression = self.expression()
+                self.expect(')')
+                return expression
+            if value == '[':
+                elements = []
+                while not self.accept(']'):
+                    if self.at(','):
+                        elements.append(('const', _undefined))
+                    elif self.at('...'):
+                        self.fail('spread elements are not supported')
+                    else:
+                        elements.append(self.assignment())
+                    if not self.at(']'):
+                        self.expect(',')
+                return ('array', elements)
+            if value == '{':
+                properties = []
+                while not self.accept('}'):
+                    key_kind, key, _ = self.advance()
+                    if key_kind == 'num':
+                        key = _to_string(key)
+                    elif key_kind not in ('name', 'str'):
+                        self.pos -= 1
+                        self.fail('unsupported property name')
+                    self.expect(':')
+                    properties.append((key, self.assignment()))
+                    if not self.at('}'):
+                        self.expect(',')
+                return ('object', properties)
+        elif kind == 'name':
+            if value == 'function':
+                name = self.peek()[1] if self.peek()[0] == 'name' else None
+                if name is not None:
+                    self.advance()
+                params, body = self.function_rest()
+                return ('func', name, params, body)
+            if value == 'this':
+                return ('this',)
+            if value == 'null':
+                return ('const', None)
+            if value in ('true', 'false'):
+                return ('const', value == 'true')
+            if value in ('class', 'yield', 'await', 'super', 'import'):
+                self.pos -= 1
+                self.fail(f'{value} is not supported')
+            return ('name', value)
+        self.pos -= 1
+        self.fail('unexpected token')
+
+
+# Value conversions and operators, following the ECMAScript specification
+
+def _truthy(v):
+    t = type(v)
+    if t is bool:
+        return v
+    if t is int:
+        return v != 0
+    if t is str:
+        return v != ''
+    if t is float:
+        return not (v == 0 or v != v)
+    return v is not None and v is not _undefined
+
+
+def _to_string(v):
+    t = type(v)
+    if t is str:
+        return v
+    if t is int:
+        return str(v)
+    if t is bool:
+        return 'true' if v else 'false'
+    if t is float:
+        if v != v:
+            return 'NaN'
+        if v in (math.inf, -math.inf):
+            return 'Infinity' if v > 0 else '-Infinity'
+        if v.is_integer() and abs(v) < 1e21:
+            return str(int(v))
+        return re.sub(r'e([+-])0*(\d)', r'e\1\2', repr(v))
+    if v is None:
+        return 'null'
+    if v is _undefined:
+        return 'undefined'
+    if t is list:
+        return ','.join('' if x is None or x is _undefined else _to_string(x) for x in v)
+    if callable(v):
+        return 'function () { [native code] }'
+    return '[object Object]'
+
+
+_NUMBER_RE = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+
+def _to_number(v):
+    t = type(v)
+    if t is int or t is float:
+        return v
+    if t is bool:
+        return int(v)
+    if v is None:
+        return 0
+    if t is str:
+        s = v.strip()
+        if not s:
+            return 0
+        if s[:2] in ('0x', '0X'):
+            try:
+                return int(s[2:], 16)
+            except ValueError:
+                return _NaN
+        if s.lstrip('+-') == 'Infinity':
+            return -math.inf if s[0] == '-' else math.inf
+        if not _NUMBER_RE.fullmatch(s):
+            return _NaN
+        return int(s) if s.lstrip('+-').isdigit() else float(s)
+    if t is list or t is dict:
+        return _to_number(_to_string(v))
+    return _NaN
+
+
+def _to_primitive(v):
+    if type(v) in (list, dict) or callable(v):
+        return _to_string(v)
+    return v
+
+
+def _to_int32(v):
+    if type(v) is not int:
+        v = _to_number(v)
+        if v != v or v in (math.inf, -math.inf):
+            return 0
+        v = int(v)
+    v &= 0xffffffff
+    return v - 0x100000000 if v & 0x80000000 else v
+
+
+def _to_uint32(v):
+    return _to_int32(v) & 0xffffffff
+
+
+def _add(a, b):
+    if type(a) is int and type(b) is int:
+        return a + b
+    a, b = _to_primitive(a), _to_primitive(b)
+    if type(a) is str or type(b) is str:
+        return _to_string(a) + _to_string(b)
+    return _to_number(a) + _to_number(b)
+
+
+def _sub(a, b):
+    return _to_number(a) - _to_number(b)
+
+
+def _mul(a, b):
+    return _to_number(a) * _to_number(b)
+
+
+def _div(a, b):
+    a, b = _to_number(a), _to_number(b)
+    if b == 0:
+        if a == 0 or a != a:
+            return _NaN
+        return math.copysign(math.inf, a) * math.copysign(1, b)
+    if type(a) is int and type(b) is int and a % b == 0:
+        return a // b
+    return a / b
+
+
+def _mod(a, b):
+    a, b = _to_number(a), _to_number(b)
+    if b == 0 or a != a or b != b or a in (math.inf, -math.inf):
+        return _NaN
+    if b in (math.inf, -math.inf):
+        return a
+    if type(a) is int and type(b) is int:
+        r = abs(a) % abs(b)
+        return -r if a < 0 else r
+    return math.fmod(a, b)
+
+
+def _pow(a, b):
+    a, b = _to_number(a), _to_number(b)
+    try:
+        return a ** b
+    except ZeroDivisionError:
+        return math.inf
+    except OverflowError:
+        return math.inf
+
+
+def _compare(op):
+    def compare(a, b):
+        a, b = _to_primitive(a), _to_primitive(b)
+        if type(a) is str and type(b) is str:
+            return op(a, b)
+        return op(_to_number(a), _to_number(b))
+    return compare
+
+
+def _strict_eq(a, b):
+    ta, tb = type(a), type(b)
+    if ta in (int, float) and tb in (int, float):
+        return a == b
+    if ta is tb and ta in (str, bool):
+        return a == b
+    return a is b
+
+
+def _loose_eq(a, b):
+    if a is None or a is _undefined:
+        return b is None or b is _undefined
+    if b is None or b is _undefined:
+        return False
+    ta, tb = type(a), type(b)
+    if ta is tb or (ta in (int, float) and tb in (int, float)):
+        return _strict_eq(a, b)
+    if ta is bool:
+        return _loose_eq(int(a), b)
+    if tb is bool:
+        return _loose_eq(a, int(b))
+    if ta in (int, float, str) and tb in (int, float, str):
+        return _to_number(a) == _to_number(b)
+    a, b = _to_primitive(a), _to_primitive(b)
+    if type(a) is ta and type(b) is tb:
+        return False
+    return _loose_eq(a, b)
+
+
+def _typeof(v):
+    t = type(v)
+    if v is _undefined:
+        return 'undefined'
+    if t is bool:
+        return 'boolean'
+    if t is int or t is float:
+        return 'number'
+    if t is str:
+        return 'string'
+    if callable(v):
+        return 'function'
+    return 'object'
+
+
+_BINARY_OPS = {
+    '+': _add,
+    '-': _sub,
+    '*': _mul,
+    '/': _div,
+    '%': _mod,
+    '**': _pow,
+    '|': lambda a, b: _to_int32(_to_int32(a) | _to_int32(b)),
+    '^': lambda a, b: _to_int32(_to_int32(a) ^ _to_int32(b)),
+    '&': lambda a, b: _to_int32(a) & _to_int32(b),
+    '<<': lambda a, b: _to_int32(_to_int32(a) << (_to_uint32(b) & 31)),
+    '>>': lambda a, b: _to_int32(a) >> (_to_uint32(b) & 31),
+    '>>>': lambda a, b: _to_uint32(a) >> (_to_uint32(b) & 31),
+    '==': _loose_eq,
+    '!=': lambda a, b: not _loose_eq(a, b),
+    '===': _strict_eq,
+    '!==': lambda a, b: not _strict_eq(a, b),
+    '<': _compare(lambda a, b: a < b),
+    '>': _compare(lambda a, b: a > b),
+    '<=': _compare(lambda a, b: a <= b),
+    '>=': _compare(lambda a, b: a >= b),
+}
+
+
+# Property access and built-in methods
+
+def _array_index(key):
+    t = type(key)
+    if t is int:
+        return key if key >= 0 else None
+    if t is float and key >= 0 and key.is_integer():
+        return int(key)
+    if t is str and key.isdigit() and (key == '0' or key[0] != '0'):
+        return int(key)
+    return None
+
+
+def _property_key(key):
+    return key if type(key) is str else _to_string(key)
+
+
+def _relative_index(value, length, default):
+    if value is _undefined:
+        return default
+    value = _to_number(value)
+    if value != value:
+        return 0
+    if value in (math.inf, -math.inf):
+        return length if value > 0 else 0
+    value = int(value)
+    return max(length + value, 0) if value < 0 else min(value, length)
+
+
+def _call(fn, args, this=_undefined):
+    if not callable(fn):
+        raise TypeError(f'{_to_string(fn)} is not a function')
+    if this is _undefined:
+        return fn(args)
+    return fn(args, {'this': this})
+
+
+def _arg(args, i):
+    return args[i] if len(args) > i else _undefined
+
+
+def _array_push(obj, args):
+    obj.extend(args)
+    return len(obj)
+
+
+def _array_pop(obj, args):
+    return obj.pop() if obj else _undefined
+
+
+def _array_shift(obj, args):
+    return obj.pop(0) if obj else _undefined
+
+
+def _array_unshift(obj, args):
+    obj[0:0] = args
+    return len(obj)
+
+
+def _array_splice(obj, args):
+    start = _relative_index(_arg(args, 0), len(obj), 0)
+    if len(args) < 2:
+        count = len(obj) - start
+    else:
+        count = min(max(int(_to_number(args[1]) or 0), 0), len(obj) - start)
+    removed = obj[start:start + count]
+    obj[start:start + count] = args[2:]
+    return removed
+
+
+def _slice(obj, args):
+    start = _relative_index(_arg(args, 0), len(obj), 0)
+    end = _relative_index(_arg(args, 1), len(obj), len(obj))
+    return obj[start:end]
+
+
+def _array_reverse(obj, args):
+    obj.reverse()
+    return obj
+
+
+def _array_join(obj, args):
+    sep = _arg(args, 0)
+    return _to_string(obj) if sep is _undefined else _to_string(sep).join(
+        '' if x is None or x is _undefined else _to_string(x) for x in obj)
+
+
+def _index_of(obj, args):
+    value = _arg(args, 0)
+    start = _relative_index(_arg(args, 1), len(obj), 0)
+    if type(obj) is str:
+        return obj.find(_to_string(value), start)
+    for i in range(start, len(obj)):
+        if _strict_eq(obj[i], value):
+            return i
+    return -1
+
+
+def _last_index_of(obj, args):
+    value = _arg(args, 0)
+    if type(obj) is str:
+        return obj.rfind(_to_string(value))
+    for i in range(len(obj) - 1, -1, -1):
+        if _strict_eq(obj[i], value):
+            return i
+    return -1
+
+
+def _includes(obj, args):
+    if type(obj) is str:
+        return _to_string(_arg(args, 0)) in obj
+    return _index_of(obj, args) != -1
+
+
+def _concat(obj, args):
+    if type(obj) is str:
+        return obj + ''.join(map(_to_string, args))
+    result = list(obj)
+    for arg in args:
+        if type(arg) is list:
+            result.extend(arg)
+        else:
+            result.append(arg)
+    return result
+
+
+def _array_for_each(obj, args):
+    fn, this = _arg(args, 0), _arg(args, 1)
+    for i, item in enumerate(list(obj)):
+        _call(fn, [item, i, obj], this)
+    return _undefined
+
+
+def _array_map(obj, args):
+    fn, this = _arg(args, 0), _arg(args, 1)
+    return [_call(fn, [item, i, obj], this) for i, item in enumerate(list(obj))]
+
+
+def _array_filter(obj, args):
+    fn, this = _arg(args, 0), _arg(args, 1)
+    return [item for i, item in enumerate(list(obj)) if _truthy(_call(fn, [item, i, obj], this))]
+
+
+def _string_split(obj, args):
+    sep = _arg(args, 0)
+    if sep is _undefined:
+        result = [obj]
+    elif type(sep) is not str:
+        raise TypeError('split only supports string separators')
+    else:
+        result = obj.split(sep) if sep else list(obj)
+    limit = _arg(args, 1)
+    return result if limit is _undefined else result[:_to_uint32(limit)]
+
+
+def _string_substring(obj, args):
+    def clamp(v, default):
+        if v is _undefined:
+            return default
+        v = _to_number(v)
+        return 0 if v != v else min(max(int(v) if v not in (math.inf, -math.inf) else (
+            len(obj) if v > 0 else 0), 0), len(obj))
+    start, end = clamp(_arg(args, 0), 0), clamp(_arg(args, 1), len(obj))
+    return obj[min(start, end):max(start, end)]
+
+
+def _string_substr(obj, args):
+    start = _relative_index(_arg(args, 0), len(obj), 0)
+    length = _arg(args, 1)
+    end = len(obj) if length is _undefined else start + max(int(_to_number(length)), 0)
+    return obj[start:end]
+
+
+def _string_char_at(obj, args):
+    i = int(_to_number(_arg(args, 0)) or 0)
+    return obj[i] if 0 <= i < len(obj) else ''
+
+
+def _string_char_code_at(obj, args):
+    i = int(_to_number(_arg(args, 0)) or 0)
+    return ord(obj[i]) if 0 <= i < len(obj) else _NaN
+
+
+def _to_string_method(obj, args):
+    radix = _arg(args, 0)
+    if radix is _undefined or type(obj) is not int or _to_number(radix) == 10:
+        return _to_string(obj)
+    radix = int(_to_number(radix))
+    digits, n = [], abs(obj)
+    while True:
+        n, d = divmod(n, radix)
+        digits.append('0123456789abcdefghijklmnopqrstuvwxyz'[d])
+        if not n:
+            break
+    return ('-' if obj < 0 else '') + ''.join(reversed(digits))
+
+
+_ARRAY_METHODS = {
+    'push': _array_push,
+    'pop': _array_pop,
+    'shift': _array_shift,
+    'unshift': _array_unshift,
+    'splice': _array_splice,
+    'slice': _slice,
+    'reverse': _array_reverse,
+    'join': _array_join,
+    'indexOf': _index_of,
+    'lastIndexOf': _last_index_of,
+    'includes': _includes,
+    'concat': _concat,
+    'forEach': _array_for_each,
+    'map': _array_map,
+    'filter': _array_filter,
+    'toString': lambda obj, args: _to_string(obj),
+}
+
+_STRING_METHODS = {
+    'split': _string_split,
+    'slice': _slice,
+    'substring': _string_substring,
+    'substr': _string_substr,
+    'charAt': _string_char_at,
+    'charCodeAt': _string_char_code_at,
+    'indexOf': _index_of,
+    'lastIndexOf': _last_index_of,
+    'includes': _includes,
+    'concat': _concat,
+    'toLowerCase': lambda obj, args: obj.lower(),
+    'toUpperCase': lambda obj, args: obj.upper(),
+    'trim': lambda obj, args: obj.strip(),
+    'toString': lambda obj, args: obj,
+}
+
+_NUMBER_METHODS = {
+    'toString': _to_string_method,
+}
+
+
+class _Method:
+    """A built-in method looked up as a value, e.g. ``Array.prototype.push``."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, args, kwargs=None, allow_recursion=100):
+        this = kwargs.get('this', _undefined) if kwargs else _undefined
+        return _call_method(this, self.name, args)
+
+    def __repr__(self):
+        return f'F<{self.name}>'
+
+
+class _Namespace(dict):
+    """A built-in global such as ``Math``, mapping names to functions."""
+
+
+class _Prototype:
+    pass
+
+
+def _builtin(func):
+    def wrapper(args, kwargs=None, allow_recursion=100):
+        return func(*args)
+    return function_with_repr(wrapper, f'F<{func.__name__}>')
+
+
+def _from_char_code(*codes):
+    return ''.join(chr(_to_uint32(code) & 0xffff) for code in codes)
+
+
+def _round(x=_undefined):
+    x = _to_number(x)
+    return x if x != x or x in (math.inf, -math.inf) else math.floor(x + 0.5)
+
+
+def _parse_int(s=_undefined, radix=_undefined):
+    m = re.match(r'\s*([+-]?)(0[xX])?([0-9a-zA-Z]*)', _to_string(s))
+    radix = 16 if m.group(2) and radix is _undefined else int(_to_number(radix) or 10)
+    digits = ''
+    for c in m.group(3):
+        if int(c, 36) >= radix:
+            break
+        digits += c
+    return int(m.group(1) + digits, radix) if digits else _NaN
+
+
+_PROTOTYPE = _Prototype()
+
+_BUILTINS = {
+    'undefined': _undefined,
+    'NaN': _NaN,
+    'Infinity': math.inf,
+    'String': _Namespace(
+        fromCharCode=_builtin(_from_char_code),
+        prototype=_PROTOTYPE),
+    'Array': _Namespace(
+        isArray=_builtin(lambda v=_undefined: type(v) is list),
+        prototype=_PROTOTYPE),
+    'Math': _Namespace(
+        pow=_builtin(lambda a=_undefined, b=_undefined: _pow(a, b)),
+        abs=_builtin(lambda x=_undefined: abs(_to_number(x))),
+        floor=_builtin(lambda x=_undefined: math.floor(_to_number(x))),
+        ceil=_builtin(lambda x=_undefined: math.ceil(_to_number(x))),
+        round=_builtin(_round),
+        max=_builtin(lambda *xs: max(map(_to_number, xs), default=-math.inf)),
+        min=_builtin(lambda *xs: min(map(_to_number, xs), default=math.inf)),
+        sqrt=_builtin(lambda x=_undefined: math.sqrt(_to_number(x)))),
+    'parseInt': _builtin(_parse_int),
+}
+
+
+def _get(obj, key):
+    t = type(obj)
+    if t is list:
+        if type(key) is not int:
+            if key == 'length':
+                return len(obj)
+            index = _array_index(key)
+            if index is None:
+                return _Method(key) if key in _ARRAY_METHODS else _undefined
+            key = index
+        return obj[key] if 0 <= key < len(obj) else _undefined
+    if t is dict:
+        return obj.get(_property_key(key), _undefined)
+    if t is str:
+        if key == 'length':
+            return len(obj)
+        index = _array_index(key)
+        if index is None:
+            return _Method(key) if key in _STRING_METHODS else _undefined
+        return obj[index] if index < len(obj) else _undefined
+    if obj is None or obj is _undefined:
+        raise TypeError(f"Cannot read properties of {_to_string(obj)} (reading '{_to_string(key)}')")
+    if t is _Namespace:
+        return obj.get(key, _undefined)
+    if obj is _PROTOTYPE:
+        return _Method(key)
+    if key in ('call', 'apply', 'toString') or (t in (int, float) and key in _NUMBER_METHODS):
+        return _Method(key)
+    return _undefined
+
+
+def _set(obj, key, value):
+    t = type(obj)
+    if t is list:
+        index = _array_index(key)
+        if index is None:
+            if key != 'length':
+                raise TypeError(f'Cannot set array property {key!r}')
+            length = _to_uint32(value)
+            del obj[length:]
+            obj.extend([_undefined] * (length - len(obj)))
+        elif index < len(obj):
+            obj[index] = value
+        else:
+            obj.extend([_undefined] * (index - len(obj)))
+            obj.append(value)
+    elif t is dict:
+        obj[_property_key(key)] = value
+    elif obj is None or obj is _undefined:
+        raise TypeError(f"Cannot set properties of {_to_string(obj)} (setting '{_to_string(key)}')")
+    return value
+
+
+def _call_method(obj, key, args):
+    t = type(obj)
+    if type(key) is not str:
+        pass
+    elif t is list:
+        method = _ARRAY_METHODS.get(key)
+        if method is not None:
+            return method(obj, args)
+    elif t is str:
+        method = _STRING_METHODS.get(key)
+        if method is not None:
+            return method(obj, args)
+    elif t in (int, float) and key in _NUMBER_METHODS:
+        return _NUMBER_METHODS[key](obj, args)
+    elif callable(obj) and key in ('call', 'apply'):
+        this = _arg(args, 0)
+        if key == 'call':
+            return _call(obj, list(args[1:]), this)
+        rest = _arg(args, 1)
+        return _call(obj, list(rest) if type(rest) is list else [], this)
+    return _call(_get(obj, key), args, obj)
+
+
+# Compilation
+
+class _Return:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+_BREAK = object()
+_CONTINUE = object()
+
+
+def _run_all(statements):
+    if len(statements) == 1:
+        return statements[0]
+
+    def run(fs):
+        for statement in statements:
+            result = statement(fs)
+            if result is not None:
+                return result
+    return run
+
+
+class _Scope:
+    """Compile-time record of the variables of one function."""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.level = 0 if parent is None else parent.level + 1
+        self.slots = {}
+        self.blocks = []
+        self.size = 0
+        self.this_slot = self.new_slot()
+
+    def declare(self, name):
+        if name not in self.slots:
+            self.slots[name] = self.new_slot()
+        return self.slots[name]
+
+    def new_slot(self):
+        self.size += 1
+        return self.size - 1
+
+    def resolve(self, name):
+        scope = self
+        while scope is not None:
+            for block in reversed(scope.blocks):
+                if name in block:
+                    return scope.level, block[name]
+            if name in scope.slots:
+                return scope.level, scope.slots[name]
+            scope = scope.parent
+        return None
+
+
+class JSCompiler(JSInterpreter):
+    """A :class:`JSInterpreter` that compiles the functions it extracts."""
+
+    def __init__(self, code, objects=None, function_code=None, object_code=None):
+        super().__init__(code, objects=objects, function_code=function_code, object_code=object_code)
+        self._globals = dict(_BUILTINS)
+        self._undefined_globals = set()
+
+    def extract_function(self, funcname):
+        argnames, code = self.function_code(funcname)
+        try:
+            func = self.compile_function(argnames, code)
+        except self.Exception as e:
+            logger.debug(f'interpreting {funcname}: {e}')
+            return super().extract_function(funcname)
+        return function_with_repr(func, f'F<{funcname}>')
+
+    def extract_object(self, objname, *global_stack):
+        obj = {}
+        for name, (argnames, code) in self.object_code(objname).items():
+            try:
+                func = self.compile_function(argnames, code)
+            except self.Exception as e:
+                logger.debug(f'interpreting {objname}.{name}: {e}')
+                func = self.build_function(argnames, code, *global_stack)
+            obj[name] = function_with_repr(func, f'F<{name}>')
+        return obj
+
+    def compile_function(self, argnames, code):
+        """Compile a function body into a callable taking ``(args, kwargs)``.
+
+        :raises JSInterpreter.Exception:
+            If the body uses something the compiler does not support.
+        """
+        params = [name.strip() for name in argnames if name.strip()]
+        body = _Parser(code).body()
+        return self._function(None, params, body, None)(())
+
+    def _global(self, name):
+        try:
+            return self._globals[name]
+        except KeyError:
+            pass
+        if name in self._undefined_globals:
+            raise self.Exception(f'{name} is not defined')
+        if name in self._objects:
+            value = self._objects[name]
+        elif name in self._functions:
+            value = self._functions[name]
+        elif name in self._object_code:
+            value = self._objects[name] = self.extract_object(name)
+        else:
+            try:
+                value = self._functions[name] = self.extract_function(name)
+            except self.Exception:
+                try:
+                    value = self._objects[name] = self.extract_object(name)
+                except self.Exception:
+                    self._undefined_globals.add(name)
+                    raise self.Exception(f'{name} is not defined')
+        self._globals[name] = value
+        return value
+
+    # Functions and statements
+
+    def _function(self, name, params, body, parent):
+        scope = _Scope(parent)
+        this_slot = scope.this_slot
+        param_slots = [scope.declare(param) for param in params]
+        self_slot = scope.declare(name) if name and name not in params else None
+        declarations = []
+        self._hoist(body, scope, declarations)
+        hoisted = [
+            (scope.slots[fname], self._function(fname, fparams, fbody, scope))
+            for fname, fparams, fbody in declarations
+        ]
+        run = self._statements(body, scope)
+        size = scope.size
+
+        def make(fs):
+            def js_function(args=(), kwargs=None, allow_recursion=100):
+                frame = [_undefined] * size
+                if kwargs:
+                    frame[this_slot] = kwargs.get('this', _undefined)
+                for slot, value in zip(param_slots, args):
+                    frame[slot] = value
+                frames = fs + (frame,)
+                if self_slot is not None:
+                    frame[self_slot] = js_function
+                for slot, make_function in hoisted:
+                    frame[slot] = make_function(frames)
+                result = run(frames)
+                if type(result) is _Return:
+                    return result.value
+                return _undefined
+            return js_function
+        return make
+
+    def _hoist(self, statements, scope, declarations):
+        for statement in statements:
+            kind = statement[0]
+            if kind == 'var':
+                for name, _ in statement[1]:
+                    scope.declare(name)
+            elif kind == 'funcdecl':
+                scope.declare(statement[1])
+                declarations.append(statement[1:])
+            elif kind == 'block':
+                self._hoist(statement[1], scope, declarations)
+            elif kind == 'if':
+                self._hoist([s for s in statement[2:] if s], scope, declarations)
+            elif kind == 'for':
+                self._hoist([s for s in (statement[1], statement[4]) if s], scope, declarations)
+            elif kind == 'do':
+                self._hoist([statement[1]], scope, declarations)
+            elif kind == 'switch':
+                for _, body in statement[2]:
+                    self._hoist(body, scope, declarations)
+            elif kind == 'try':
+                for block in (statement[1], statement[3], statement[4]):
+                    if block:
+                        self._hoist(block, scope, declarations)
+
+    def _statement(self, node, scope):
+        return getattr(self, f'_statement_{node[0]}')(node, scope)
+
+    def _statements(self, statements, scope):
+        compiled = [self._statement(s, scope) for s in statements if s[0] not in ('empty', 'funcdecl')]
+        return _run_all(compiled) if compiled else (lambda fs: None)
+
+    def _statement_empty(self, node, scope):
+        return lambda fs: None
+
+    _statement_funcdecl = _statement_empty
+
+    def _statement_block(self, node, scope):
+        return self._statements(node[1], scope)
+
+    def _statement_expr(self, node, scope):
+        expression = self._expression(node[1], scope)
+
+        def run(fs):
+            expression(fs)
+        return run
+
+    def _statement_var(self, node, scope):
+        assignments = [
+            self._assign_to(('name', name), self._expression(init, scope), scope)
+            for name, init in node[1] if init is not None
+        ]
+        return self._statements_of(assignments)
+
+    @staticmethod
+    def _statements_of(expressions):
+        def run(fs):
+            for expression in expressions:
+                expression(fs)
+        return run
+
+    def _statement_return(self, node, scope):
+        if node[1] is None:
+            return lambda fs: _Return(_undefined)
+        argument = self._expression(node[1], scope)
+        return lambda fs: _Return(argument(fs))
+
+    def _statement_if(self, node, scope):
+        test = self._expression(node[1], scope)
+        consequent = self._statement(node[2], scope)
+        alternate = self._statement(node[3], scope) if node[3] else (lambda fs: None)
+
+        def run(fs):
+            if _truthy(test(fs)):
+                return consequent(fs)
+            return alternate(fs)
+        return run
+
+    def _statement_for(self, node, scope):
+        _, init, test, update, body = node
+        init = self._statement(init, scope) if init else (lambda fs: None)
+        test = self._expression(test, scope) if test else (lambda fs: True)
+        update = self._expression(update, scope) if update else (lambda fs: None)
+        body = self._statement(body, scope)
+
+        def run(fs):
+            init(fs)
+            while _truthy(test(fs)):
+                result = body(fs)
+                if result is not None and result is not _CONTINUE:
+                    if result is _BREAK:
+                        break
+                    return result
+                update(fs)
+        return run
+
+    def _statement_do(self, node, scope):
+        body = self._statement(node[1], scope)
+        test = self._expression(node[2], scope)
+
+        def run(fs):
+            while True:
+                result = body(fs)
+                if result is not None and result is not _CONTINUE:
+                    if result is _BREAK:
+                        break
+                    return result
+                if not _truthy(test(fs)):
+                    break
+        return run
+
+    def _statement_switch(self, node, scope):
+        discriminant = self._expression(node[1], scope)
+        tests = [self._expression(test, scope) if test else None for test, _ in node[2]]
+        bodies = [self._statements(body, scope) for _, body in node[2]]
+        default = next((i for i, (test, _) in enumerate(node[2]) if test is None), None)
+
+        def run(fs):
+            value = discriminant(fs)
+            start = default
+            for i, test in enumerate(tests):
+                if test is not None and _strict_eq(value, test(fs)):
+                    start = i
+                    break
+            if start is None:
+                return None
+            for body in bodies[start:]:
+                result = body(fs)
+                if result is not None:
+                    return None if result is _BREAK else result
+        return run
+
+    def _statement_break(self, node, scope):
+        return lambda fs: _BREAK
+
+    def _statement_continue(self, node, scope):
+        return lambda fs: _CONTINUE
+
+    def _statement_throw(self, node, scope):
+        argument = self._expression(node[1], scope)
+
+        def run(fs):
+            raise JS_Throw(argument(fs))
+        return run
+
+    def _statement_try(self, node, scope):
+        _, block, param, handler, finalizer = node
+        block = self._statements(block, scope)
+        level, error_slot = scope.level, scope.new_slot()
+        if handler is not None:
+            scope.blocks.append({param: error_slot} if param else {})
+            handler = self._statements(handler, scope)
+            scope.blocks.pop()
+        if finalizer is not None:
+            finalizer = self._statements(finalizer, scope)
+
+        def run(fs):
+            try:
+                if handler is None:
+                    return block(fs)
+                try:
+                    return block(fs)
+                except Exception as e:
+                    fs[level][error_slot] = e.error if isinstance(e, JS_Throw) else e
+                    return handler(fs)
+            finally:
+                if finalizer is not None:
+                    result = finalizer(fs)
+                    if result is not None:
+                        return result
+        return run
+
+    # Expressions
+
+    def _expression(self, node, scope):
+        return getattr(self, f'_expression_{node[0]}')(node, scope)
+
+    def _expression_const(self, node, scope):
+        value = node[1]
+        return lambda fs: value
+
+    def _expression_name(self, node, scope):
+        name = node[1]
+        if name == 'arguments':
+            raise self.Exception('Cannot compile: arguments is not supported')
+        resolved = scope.resolve(name)
+        if resolved is None:
+            lookup = self._global
+            return lambda fs: lookup(name)
+        level, slot = resolved
+        return lambda fs: fs[level][slot]
+
+    def _expression_this(self, node, scope):
+        level, slot = scope.level, scope.this_slot
+        return lambda fs: fs[level][slot]
+
+    def _expression_array(self, node, scope):
+        elements = [self._expression(e, scope) for e in node[1]]
+        return lambda fs: [e(fs) for e in elements]
+
+    def _expression_object(self, node, scope):
+        properties = [(key, self._expression(value, scope)) for key, value in node[1]]
+        return lambda fs: {key: value(fs) for key, value in properties}
+
+    def _expression_func(self, node, scope):
+        _, name, params, body = node
+        make = self._function(name, params, body, scope)
+        return make
+
+    def _expression_seq(self, node, scope):
+        expressions = [self._expression(e, scope) for e in node[1]]
+
+        def run(fs):
+            for expression in expressions:
+                value = expression(fs)
+            return value
+        return run
+
+    def _expression_unary(self, node, scope):
+        op, argument = node[1], self._expression(node[2], scope)
+        if op == '!':
+            return lambda fs: not _truthy(argument(fs))
+        if op == '-':
+            return lambda fs: -_to_number(argument(fs))
+        if op == '+':
+            return lambda fs: _to_number(argument(fs))
+        if op == '~':
+            return lambda fs: _to_int32(~_to_int32(argument(fs)))
+        if op == 'typeof':
+            if node[2][0] == 'name' and scope.resolve(node[2][1]) is None:
+                # typeof tolerates names that are not defined anywhere
+                def safe(fs):
+                    try:
+                        return argument(fs)
+                    except self.Exception:
+                        return _undefined
+                return lambda fs: _typeof(safe(fs))
+            return lambda fs: _typeof(argument(fs))
+
+        def void(fs):
+            argument(fs)
+            return _undefined
+        return void
+
+    def _expression_binary(self, node, scope):
+        op = _BINARY_OPS[node[1]]
+        left, right = self._expression(node[2], scope), self._expression(node[3], scope)
+        return lambda fs: op(left(fs), right(fs))
+
+    def _expression_logical(self, node, scope):
+        op = node[1]
+        left, right = self._expression(node[2], scope), self._expression(node[3], scope)
+        if op == '&&':
+            def run(fs):
+                value = left(fs)
+                return right(fs) if _truthy(value) else value
+        elif op == '||':
+            def run(fs):
+                value = left(fs)
+                return value if _truthy(value) else right(fs)
+        else:
+            def run(fs):
+                value = left(fs)
+                return right(fs) if value is None or value is _undefined else value
+        return run
+
+    def _expression_cond(self, node, scope):
+        test = self._expression(node[1], scope)
+        consequent = self._expression(node[2], scope)
+        alternate = self._expression(node[3], scope)
+        return lambda fs: consequent(fs) if _truthy(test(fs)) else alternate(fs)
+
+    def _expression_member(self, node, scope):
+        _, obj, key, optional = node
+        obj = self._expression(obj, scope)
+        if key[0] == 'const':
+            name = key[1]
+            if optional:
+                def run(fs):
+                    value = obj(fs)
+                    return _undefined if value is None or value is _undefined else _get(value, name)
+                return run
+            return lambda fs: _get(obj(fs), name)
+        key = self._expression(key, scope)
+        if optional:
+            def run(fs):
+                value = obj(fs)
+                return _undefined if value is None or value is _undefined else _get(value, key(fs))
+            return run
+        return lambda fs: _get(obj(fs), key(fs))
+
+    def _expression_call(self, node, scope):
+        _, callee, args = node
+        args = [self._expression(a, scope) for a in args]
+        if callee[0] == 'member' and not callee[3]:
+            obj, key = self._expression(callee[1], scope), self._expression(callee[2], scope)
+            return lambda fs: _call_method(obj(fs), key(fs), [a(fs) for a in args])
+        callee = self._expression(callee, scope)
+        return lambda fs: _call(callee(fs), [a(fs) for a in args])
+
+    def _expression_new(self, node, scope):
+        _, callee, args = node
+        if callee != ('name', 'Date') or len(args) != 1 or scope.resolve('Date'):
+            raise self.Exception('Cannot compile: only new Date(...) is supported')
+        argument = self._expression(args[0], scope)
+
+        def run(fs):
+            date = unified_timestamp(_to_string(argument(fs)), False)
+            if date is None:
+                raise self.Exception(f'Failed to parse date {argument(fs)!r}')
+            return int(date * 1000)
+        return run
+
+    def _expression_assign(self, node, scope):
+        _, op, target, value = node
+        value = self._expression(value, scope)
+        if op == '=':
+            return self._assign_to(target, value, scope)
+        binary = _BINARY_OPS[op[:-1]]
+        if target[0] == 'member':
+            return self._assign_member(target, scope, value, binary)
+        current = self._expression(target, scope)
+        return self._assign_to(target, lambda fs: binary(current(fs), value(fs)), scope)
+
+    def _assign_to(self, target, value, scope):
+        if target[0] == 'member':
+            return self._assign_member(target, scope, value, None)
+        name = target[1]
+        resolved = scope.resolve(name)
+        if resolved is None:
+            assigned = self._globals
+
+            def run(fs):
+                assigned[name] = result = value(fs)
+                return result
+            return run
+        level, slot = resolved
+
+        def run(fs):
+            fs[level][slot] = result = value(fs)
+            return result
+        return run
+
+    def _assign_member(self, target, scope, value, binary):
+        obj, key = self._expression(target[1], scope), self._expression(target[2], scope)
+        if binary is None:
+            def run(fs):
+                o, k = obj(fs), key(fs)
+                return _set(o, k, value(fs))
+        else:
+            def run(fs):
+                o, k = obj(fs), key(fs)
+                return _set(o, k, binary(_get(o, k), value(fs)))
+        return run
+
+    def _expression_update(self, node, scope):
+        _, op, prefix, target = node
+        delta = 1 if op == '++' else -1
+        if target[0] == 'member':
+            obj, key = self._expression(target[1], scope), self._expression(target[2], scope)
+
+            def run(fs):
+                o, k = obj(fs), key(fs)
+                old = _to_number(_get(o, k))
+                _set(o, k, old + delta)
+                return old + delta if prefix else old
+            return run
+        name = target[1]
+        resolved = scope.resolve(name)
+        if resolved is None:
+            lookup, assigned = self._global, self._globals
+
+            def run(fs):
+                old = _to_number(lookup(name))
+                assigned[name] = old + delta
+                return old + delta if prefix else old
+            return run
+        level, slot = resolved
+
+        def run(fs):
+            frame = fs[level]
+            old = _to_number(frame[slot])
+            frame[slot] = old + delta
+            return old + delta if prefix else old
+        return run
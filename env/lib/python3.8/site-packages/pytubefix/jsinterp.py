@@ -526,9 +526,13 @@ class JSInterpreter:
         'y': 4096,  # Perform a "sticky" search that matches starting at the current position in the target string
     }
 
-    def __init__(self, code, objects=None):
+    def __init__(self, code, objects=None, function_code=None, object_code=None):
         self.code, self._functions = code, {}
         self._objects = {} if objects is None else objects
+        # argnames and code of functions, as returned by `function_code`
+        self._function_code = {} if function_code is None else function_code
+        # methods of objects, as returned by `object_code`
+        self._object_code = {} if object_code is None else object_code
 
     class Exception(Exception):
         def __init__(self, msg, expr=None, *args, **kwargs):
@@ -1136,6 +1140,21 @@ class JSInterpreter:
         return code
 
     def extract_object(self, objname, *global_stack):
+        obj = {}
+        for name, (argnames, code) in self.object_code(objname).items():
+            obj[name] = function_with_repr(
+                self.build_function(argnames, code, *global_stack), f'F<{name}>')
+
+        return obj
+
+    def object_code(self, objname):
+        """ @returns dict of method name -> (argnames, code), extracted once """
+        if objname not in self._object_code:
+            self._object_code[objname] = self.extract_object_code(objname)
+        return self._object_code[objname]
+
+    def extract_object_code(self, objname):
+        """ @returns dict of method name -> (argnames, code) """
         _FUNC_NAME_RE = r'''(?:[a-zA-Z$0-9]+|"[a-zA-Z$0-9]+"|'[a-zA-Z$0-9]+')'''
         obj = {}
         obj_m = re.search(
@@ -1157,8 +1176,7 @@ class JSInterpreter:
         for f in fields_m:
             argnames = f.group('args').split(',')
             name = remove_quotes(f.group('key'))
-            obj[name] = function_with_repr(
-                self.build_function(argnames, f.group('code'), *global_stack), f'F<{name}>')
+            obj[name] = (argnames, f.group('code'))
 
         return obj
 
@@ -1179,9 +1197,16 @@ class JSInterpreter:
         code, _ = self._separate_at_paren(func_m.group('code'))
         return [x.strip() for x in func_m.group('args').split(',')], code
 
+    def function_code(self, funcname):
+        """ @returns argnames, code ready to be built into a function """
+        if funcname not in self._function_code:
+            self._function_code[funcname] = _fixup_n_function_code(
+                *self.extract_function_code(funcname), self.code)
+        return self._function_code[funcname]
+
     def extract_function(self, funcname):
         return function_with_repr(
-            self.extract_function_from_code(*_fixup_n_function_code(*self.extract_function_code(funcname), self.code)),
+            self.extract_function_from_code(*self.function_code(funcname)),
             f'F<{funcname}>')
 
     def extract_function_from_code(self, argnames, code, *global_stack):
@@ -1199,7 +1224,9 @@ class JSInterpreter:
         return self.build_function(argnames, code, local_vars, *global_stack)
 
     def call_function(self, funcname, *args):
-        return self.extract_function(funcname)(args)
+        if funcname not in self._functions:
+            self._functions[funcname] = self.extract_function(funcname)
+        return self._functions[funcname](args)
 
     def build_function(self, argnames, code, *global_stack):
         global_stack = list(global_stack) or [{}]
@@ -6,9 +6,15 @@ class Monostate:
                 on_progress: Optional[Callable[[Any, bytes, int], None]],
                 on_complete: Optional[Callable[[Any, Optional[str]], None]],
                 title: Optional[str] = None,
-                duration: Optional[int] = None,):
+                duration: Optional[int] = None,
+                youtube: Optional[Any] = None,
+                on_url_refresh: Optional[Callable[[Any], None]] = None):
         
         self.on_progress = on_progress
         self.on_complete = on_complete
         self.title = title
         self.duration = duration
+        # The owning YouTube object, used to re-sign expired stream urls.
+        self.youtube = youtube
+        # Called with a stream once its url has been re-signed.
+        self.on_url_refresh = on_url_refresh
@@ -3,6 +3,8 @@ import json
 import re
 from pytubefix.exceptions import HTMLParseError
 
+_json_decoder = json.JSONDecoder()
+
 
 def parse_for_all_objects(html, preceding_regex):
     """Parses input html to find all matches for the input starting point.
@@ -68,16 +70,17 @@ def find_object_from_startpoint(html, start_point):
     :returns:
         A dict created from parsing the object.
     """
-    html = html[start_point:]
-    if html[0] not in ['{','[']:
-        raise HTMLParseError(f'Invalid start point. Start of HTML:\n{html[:20]}')
+    if html[start_point:start_point + 1] not in ['{','[']:
+        raise HTMLParseError(f'Invalid start point. Start of HTML:\n{html[start_point:start_point + 20]}')
 
     # First letter MUST be a open brace, so we put that in the stack,
-    # and skip the first character.
+    # and skip the first character. The page is scanned in place rather
+    # than copying everything after the start point.
     last_char = '{'
     curr_char = None
-    stack = [html[0]]
-    i = 1
+    stack = [html[start_point]]
+    i = start_point + 1
+    end = len(html)
 
     context_closers = {
         '{': '}',
@@ -87,7 +90,7 @@ def find_object_from_startpoint(html, start_point):
         '/': '/' # javascript regex
     }
 
-    while i < len(html):
+    while i < end:
         if not stack:
             break
         if curr_char not in [' ', '\n']:
@@ -117,7 +120,7 @@ def find_object_from_startpoint(html, start_point):
 
         i += 1
 
-    full_obj = html[:i]
+    full_obj = html[start_point:i]
     return full_obj  # noqa: R504
 
 
@@ -132,6 +135,14 @@ def parse_for_object_from_startpoint(html, start_point):
     :returns:
         A dict created from parsing the object.
     """
+    # Most objects embedded in the page are plain JSON, which the C decoder
+    # can read in place. JavaScript literals fall back to the scanner below.
+    if html[start_point:start_point + 1] in ('{', '['):
+        try:
+            return _json_decoder.raw_decode(html, start_point)[0]
+        except json.decoder.JSONDecodeError:
+            pass
+
     full_obj = find_object_from_startpoint(html, start_point)
     try:
         return json.loads(full_obj)
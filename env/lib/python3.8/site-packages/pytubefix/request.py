@@ -1,19 +1,199 @@
-"""Implements a simple wrapper around urlopen."""
+"""Implements a simple wrapper around urlopen backed by a keep-alive connection pool."""
 import http.client
+import io
+import itertools
 import json
 import logging
 import re
 import socket
+import ssl
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from urllib import parse
-from urllib.error import URLError
-from urllib.request import Request, urlopen
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, getproxies, urlopen
 
 from pytubefix.exceptions import RegexMatchError, MaxRetriesExceeded
-from pytubefix.helpers import regex_search
+from pytubefix.helpers import installed_proxies
 
 logger = logging.getLogger(__name__)
 default_range_size = 9437184  # 9MB
+default_max_connections = 4  # ranges fetched concurrently by parallel_stream
+default_max_idle_connections = 10  # idle keep-alive connections kept per host
+_max_redirects = 10
+_redirect_codes = (301, 302, 303, 307, 308)
+
+
+class _PooledResponse:
+    """HTTP response that hands its connection back to the pool once read."""
+
+    def __init__(self, response, pool, key, conn, url):
+        self._response = response
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self.url = url
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        if response.length == 0:
+            # HEAD and empty responses never get read by the caller
+            self.read()
+
+    def read(self, amt=None):
+        data = self._response.read(amt)
+        if self._response.isclosed():
+            self._release()
+        return data
+
+    def info(self):
+        return self.headers
+
+    def getcode(self):
+        return self.status
+
+    def geturl(self):
+        return self.url
+
+    def getheader(self, name, default=None):
+        return self._response.getheader(name, default)
+
+    def close(self):
+        if self._conn is not None and not self._response.isclosed():
+            # A partially read body leaves the connection unusable
+            self._conn.close()
+            self._conn = None
+        self._response.close()
+        self._release()
+
+    def _release(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        if self._response.will_close:
+            conn.close()
+        else:
+            self._pool.put(self._key, conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive connections keyed by host.
+
+    Connections are checked out for a single request and returned once the
+    response body has been fully read. At most
+    ``default_max_idle_connections`` idle connections are kept per host.
+    """
+
+    def __init__(self):
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._ssl_context = None
+
+    def urlopen(self, method, url, headers, data=None, timeout=socket._GLOBAL_DEFAULT_TIMEOUT):
+        """Send a request, following redirects like :func:`urllib.request.urlopen`."""
+        for _ in range(_max_redirects + 1):
+            response = self._send(method, url, headers, data, timeout)
+            location = response.getheader("Location")
+            if response.status not in _redirect_codes or not location:
+                break
+            response.read()
+            url = parse.urljoin(url, location)
+            if response.status != 307 and response.status != 308 and method not in ("GET", "HEAD"):
+                method, data = "GET", None
+                headers = {
+                    k: v for k, v in headers.items()
+                    if k.lower() not in ("content-type", "content-length")
+                }
+
+        if not 200 <= response.status < 300:
+            body = response.read()
+            raise HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+        return response
+
+    def put(self, key, conn):
+        """Return an idle connection to the pool."""
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < default_max_idle_connections:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def clear(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _acquire(self, key, timeout, fresh=False):
+        if not fresh:
+            with self._lock:
+                idle = self._idle.get(key)
+                conn = idle.pop() if idle else None
+            if conn is not None:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(
+                        socket.getdefaulttimeout() if timeout is socket._GLOBAL_DEFAULT_TIMEOUT else timeout
+                    )
+                return conn, True
+
+        scheme, host, port = key
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _send(self, method, url, headers, data, timeout):
+        split_url = parse.urlsplit(url)
+        scheme = split_url.scheme.lower()
+        key = (scheme, split_url.hostname, split_url.port or (443 if scheme == "https" else 80))
+        selector = split_url.path or "/"
+        if split_url.query:
+            selector = f"{selector}?{split_url.query}"
+
+        # A reused connection may have been closed by the server while idle,
+        # in that case the request is retried once on a new connection.
+        for attempt in range(2):
+            conn, reused = self._acquire(key, timeout, fresh=attempt > 0)
+            try:
+                conn.request(method, selector, body=data, headers=headers)
+            except OSError as err:
+                conn.close()
+                if reused:
+                    continue
+                raise URLError(err)
+            try:
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            return _PooledResponse(response, self, key, conn, url)
+
+
+_pool = ConnectionPool()
+
+
+def _is_proxied(url):
+    """Proxied requests are left to urllib, which knows how to route them."""
+    scheme = url.split(":", 1)[0].lower()
+    return bool(installed_proxies.get(scheme) or getproxies().get(scheme))
 
 
 def _execute_request(
@@ -28,11 +208,13 @@ def _execute_request(
         base_headers.update(headers)
     if data and not isinstance(data, bytes): # encode data for request
             data = bytes(json.dumps(data), encoding="utf-8")
-    if url.lower().startswith("http"):
-        request = Request(url, headers=base_headers, method=method, data=data)
-    else:
+    if not url.lower().startswith("http"):
         raise ValueError("Invalid URL")
-    return urlopen(request, timeout=timeout)  # nosec
+    if _is_proxied(url):
+        request = Request(url, headers=base_headers, method=method, data=data)
+        return urlopen(request, timeout=timeout)  # nosec
+    method = method or ("GET" if data is None else "POST")
+    return _pool.urlopen(method, url, base_headers, data=data, timeout=timeout)
 
 
 def get(url, extra_headers=None, timeout=socket._GLOBAL_DEFAULT_TIMEOUT):
@@ -83,64 +265,113 @@ def post(url, extra_headers=None, data=None, timeout=socket._GLOBAL_DEFAULT_TIME
     return response.read().decode("utf-8")
 
 
+def _sequence_urls(url):
+    """Return a function building the ``sq=N`` url of each segment of ``url``.
+
+    :param str url: The URL of a segmented (OTF) stream.
+    :rtype: Callable[[int], str]
+    """
+    # YouTube expects a request sequence number as part of the parameters.
+    split_url = parse.urlsplit(url)
+    base_url = f'{split_url.scheme}://{split_url.netloc}/{split_url.path}?'
+    querys = dict(parse.parse_qsl(split_url.query))
+
+    def sequence_url(seq_num):
+        return base_url + parse.urlencode({**querys, 'sq': seq_num})
+    return sequence_url
+
+
+def _segment_count(header):
+    """Read the number of segments from the header (``sq=0``) of a stream.
+
+    :param bytes header: The body of the 0th sequential request.
+    :rtype: int
+    """
+    segment_regex = b'Segment-Count: (\\d+)'
+    match = re.search(segment_regex, header)
+    if not match:
+        raise RegexMatchError('segment_count', segment_regex)
+    return int(match.group(1))
+
+
 def seq_stream(
             url,
             timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
-            max_retries=0):
+            max_retries=0,
+            max_connections=None):
 
     """Read the response in sequence.
+
+    Segments after the header are fetched concurrently and yielded in order.
+
     :param str url: The URL to perform the GET request for.
+    :param int max_connections:
+        Number of segments fetched concurrently, defaults to
+        ``default_max_connections``.
     :rtype: Iterable[bytes]
     """
-    # YouTube expects a request sequence number as part of the parameters.
-    split_url = parse.urlsplit(url)
-    base_url = f'{split_url.scheme}://{split_url.netloc}/{split_url.path}?'
-
-    querys = dict(parse.parse_qsl(split_url.query))
+    sequence_url = _sequence_urls(url)
 
     # The 0th sequential request provides the file headers, which tell us
     #  information about how the file is segmented.
-    querys['sq'] = 0
-    url = base_url + parse.urlencode(querys)
-
-    segment_data = b''
-    for chunk in stream(url, timeout=timeout, max_retries=max_retries):
+    header_chunks = []
+    for chunk in stream(sequence_url(0), timeout=timeout, max_retries=max_retries):
         yield chunk
-        segment_data += chunk
-
-    # We can then parse the header to find the number of segments
-    stream_info = segment_data.split(b'\r\n')
-    segment_count_pattern = re.compile(b'Segment-Count: (\\d+)')
-    for line in stream_info:
-        match = segment_count_pattern.search(line)
-        if match:
-            segment_count = int(match.group(1).decode('utf-8'))
-
-    # We request these segments sequentially to build the file.
-    seq_num = 1
-    while seq_num <= segment_count:
-        # Create sequential request URL
-        querys['sq'] = seq_num
-        url = base_url + parse.urlencode(querys)
-
-        yield from stream(url, timeout=timeout, max_retries=max_retries)
-        seq_num += 1
+        header_chunks.append(chunk)
+    segment_count = _segment_count(b''.join(header_chunks))
+
+    def fetch_segment(seq_num):
+        return b''.join(
+            stream(sequence_url(seq_num), timeout=timeout, max_retries=max_retries)
+        )
+
+    # The segments are requested through a bounded window to build the file.
+    yield from _imap_ordered(
+        fetch_segment,
+        range(1, segment_count + 1),
+        max_connections or default_max_connections
+    )
     return  # pylint: disable=R1711
 
 
-# TODO: Refactor this code
+def _total_size(response, requested):
+    """Work out the full size of a resource from a ranged response.
+
+    :param response: Response to a ``&range=start-stop`` request.
+    :param int requested: Number of bytes the range asked for.
+    :returns: int or None when the response does not tell.
+    """
+    content_range = response.info().get("Content-Range")
+    if content_range:
+        total = content_range.rpartition("/")[2]
+        if total.isdigit():
+            return int(total)
+    content_length = response.info().get("Content-Length")
+    if content_length and content_length.isdigit() and int(content_length) < requested:
+        # A short first range already holds the whole file.
+        return int(content_length)
+    return None
+
+
 def stream(url,
            timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
-           max_retries=0):
+           max_retries=0,
+           filesize=None):
     """Read the response in chunks.
+
+    The total size is taken from ``filesize`` when known, otherwise from the
+    first ranged response, falling back to a HEAD request.
+
     :param str url: The URL to perform the GET request for.
+    :param int filesize: (Optional) Size of the stream in bytes.
     :rtype: Iterable[bytes]
     """
-    file_size: int = default_range_size  # fake filesize to start
+    file_size = filesize or None
     downloaded = 0
-    while downloaded < file_size:
-        stop_pos = min(downloaded + default_range_size, file_size) - 1
-        range_header = f"bytes={downloaded}-{stop_pos}"
+    while file_size is None or downloaded < file_size:
+        stop_pos = downloaded + default_range_size - 1
+        if file_size is not None:
+            stop_pos = min(stop_pos, file_size - 1)
         tries = 0
 
         # Attempt to make the request multiple times as necessary.
@@ -169,31 +400,152 @@ def stream(url,
                 break
             tries += 1
 
-        if file_size == default_range_size:
+        if file_size is None:
+            file_size = _total_size(response, stop_pos - downloaded + 1)
+        if file_size is None:
             try:
-                resp = _execute_request(
-                    f"{url}&range=0-99999999999",
-                    method="GET",
-                    timeout=timeout
-                )
-                content_range = resp.info()["Content-Length"]
-                file_size = int(content_range)
-            except (KeyError, IndexError, ValueError) as e:
+                file_size = int(head(url)["content-length"])
+            except (HTTPError, KeyError, ValueError) as e:
+                # Without a size, keep requesting until a range comes back empty.
                 logger.error(e)
-        while True:
-            try:
-                chunk = response.read()
-            except StopIteration:
-                return
+                file_size = None
 
+        received = 0
+        while True:
+            chunk = response.read()
             if not chunk:
                 break
-
-            if chunk: downloaded += len(chunk)
+            received += len(chunk)
+            downloaded += len(chunk)
             yield chunk
+
+        if not received:
+            return
     return  # pylint: disable=R1711
 
 
+def segment_ranges(size, segment_size=None):
+    """Split ``size`` bytes into inclusive ``(start, stop)`` byte ranges.
+
+    :param int size: Total size in bytes.
+    :param int segment_size: Size of each range, defaults to 9MB.
+    :rtype: List[Tuple[int, int]]
+    """
+    segment_size = segment_size or default_range_size
+    return [
+        (start, min(start + segment_size, size) - 1)
+        for start in range(0, size, segment_size)
+    ]
+
+
+def missing_ranges(size, completed, segment_size=None):
+    """Split the bytes of ``size`` not covered by ``completed`` into ranges.
+
+    :param int size: Total size in bytes.
+    :param completed: Inclusive ``(start, stop)`` ranges already fetched.
+    :param int segment_size: Size of each range, defaults to 9MB.
+    :rtype: List[Tuple[int, int]]
+    """
+    ranges = []
+    position = 0
+    for start, stop in sorted(completed) + [(size, size)]:
+        if start > position:
+            ranges.extend(
+                (position + first, position + last)
+                for first, last in segment_ranges(start - position, segment_size)
+            )
+        position = max(position, stop + 1)
+    return ranges
+
+
+def fetch_range(url,
+                start,
+                stop,
+                timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
+                max_retries=0):
+    """Fetch the inclusive byte range ``start``-``stop`` of a stream.
+
+    Timeouts and short reads are retried up to ``max_retries`` times.
+
+    :param str url: The URL to perform the GET request for.
+    :param int start: First byte of the range.
+    :param int stop: Last byte of the range.
+    :rtype: bytes
+    """
+    expected = stop - start + 1
+    tries = 0
+    while True:
+        if tries >= 1 + max_retries:
+            raise MaxRetriesExceeded()
+        try:
+            response = _execute_request(
+                f"{url}&range={start}-{stop}",
+                method="GET",
+                timeout=timeout
+            )
+            chunk = response.read()
+        except URLError as e:
+            if not isinstance(e.reason, socket.timeout):
+                raise
+        except (socket.timeout, http.client.IncompleteRead):
+            pass
+        else:
+            if len(chunk) == expected:
+                return chunk
+            logger.debug(f"short read for range {start}-{stop}: {len(chunk)} bytes")
+        tries += 1
+
+
+def _imap_ordered(func, items, max_workers):
+    """Map ``func`` over ``items`` on a thread pool, yielding results in order.
+
+    No more than ``2 * max_workers`` results are in flight or waiting to be
+    consumed at any time, so a slow head item does not let memory grow.
+    """
+    items = iter(items)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for item in itertools.islice(items, 2 * max_workers):
+                pending.append(executor.submit(func, item))
+            while pending:
+                result = pending.popleft().result()
+                for item in itertools.islice(items, 1):
+                    pending.append(executor.submit(func, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def parallel_stream(url,
+                    ranges,
+                    max_connections=None,
+                    timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
+                    max_retries=0,
+                    on_segment=None):
+    """Fetch byte ranges over several connections, yielding them in order.
+
+    :param str url: The URL to perform the GET requests for.
+    :param ranges: Inclusive ``(start, stop)`` byte ranges to fetch.
+    :param int max_connections:
+        Number of ranges fetched concurrently, defaults to
+        ``default_max_connections``.
+    :param on_segment:
+        Optional callable run on the worker thread as ``on_segment(start, chunk)``
+        as soon as a range arrives, e.g. to write it at its offset.
+    :rtype: Iterable[Tuple[int, bytes]]
+    """
+    def fetch(byte_range):
+        start, stop = byte_range
+        chunk = fetch_range(url, start, stop, timeout=timeout, max_retries=max_retries)
+        if on_segment is not None:
+            on_segment(start, chunk)
+        return start, chunk
+
+    yield from _imap_ordered(fetch, ranges, max_connections or default_max_connections)
+
+
 @lru_cache()
 def filesize(url):
     """Fetch size in bytes of file at given URL
@@ -211,49 +563,20 @@ def seq_filesize(url):
     :param str url: The URL to get the size of
     :returns: int: size in bytes of remote file
     """
-    total_filesize = 0
-    # YouTube expects a request sequence number as part of the parameters.
-    split_url = parse.urlsplit(url)
-    base_url = f'{split_url.scheme}://{split_url.netloc}/{split_url.path}?'
-    querys = dict(parse.parse_qsl(split_url.query))
+    sequence_url = _sequence_urls(url)
 
     # The 0th sequential request provides the file headers, which tell us
     #  information about how the file is segmented.
-    querys['sq'] = 0
-    url = base_url + parse.urlencode(querys)
-    response = _execute_request(
-        url, method="GET"
-    )
+    response_value = _execute_request(sequence_url(0), method="GET").read()
+    segment_count = _segment_count(response_value)
 
-    response_value = response.read()
+    # We make concurrent HEAD requests to the segments to find the total filesize.
     # The file header must be added to the total filesize
-    total_filesize += len(response_value)
-
-    # We can then parse the header to find the number of segments
-    segment_count = 0
-    stream_info = response_value.split(b'\r\n')
-    segment_regex = b'Segment-Count: (\\d+)'
-    for line in stream_info:
-        # One of the lines should contain the segment count, but we don't know
-        #  which, so we need to iterate through the lines to find it
-        try:
-            segment_count = int(regex_search(segment_regex, line, 1))
-        except RegexMatchError:
-            pass
-
-    if segment_count == 0:
-        raise RegexMatchError('seq_filesize', segment_regex)
-
-    # We make HEAD requests to the segments sequentially to find the total filesize.
-    seq_num = 1
-    while seq_num <= segment_count:
-        # Create sequential request URL
-        querys['sq'] = seq_num
-        url = base_url + parse.urlencode(querys)
-
-        total_filesize += int(head(url)['content-length'])
-        seq_num += 1
-    return total_filesize
+    return len(response_value) + sum(_imap_ordered(
+        lambda seq_num: int(head(sequence_url(seq_num))['content-length']),
+        range(1, segment_count + 1),
+        default_max_connections
+    ))
 
 
 def head(url):
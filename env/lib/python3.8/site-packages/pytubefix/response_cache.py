@@ -0,0 +1,185 @@
+"""
+This module caches InnerTube player and next responses.
+
+The cache is disabled by default. Once enabled, responses are kept in memory
+(least recently used first out) and, optionally, on disk so other processes
+can reuse them. A player response is only kept until the earliest ``expire``
+of its stream urls, since the signed urls are useless afterwards.
+
+Entries are stored as json text, so every hit is a new copy that callers are
+free to modify.
+"""
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+enabled = False  # cache responses in memory
+use_disk = False  # also cache them on disk, shared between processes
+max_entries = 128  # responses kept in memory
+next_ttl = 3600  # seconds a next response is reused
+
+# Leave some time to start a download before the urls expire
+_expiration_margin = 60
+
+_cache_dir = pathlib.Path(__file__).parent.resolve() / '__cache__' / 'responses'
+
+_entries: "OrderedDict[Tuple[str, ...], Tuple[float, str]]" = OrderedDict()
+_entries_lock = threading.Lock()
+
+_expire_regex = re.compile(r'[?&]expire=(\d+)')
+
+
+def _path(key: Tuple[str, ...]) -> pathlib.Path:
+    # The video id comes first so discard() can find every entry of a video
+    digest = hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+    return _cache_dir / f'{key[2]}-{digest}.json'
+
+
+def _load(key: Tuple[str, ...]) -> Optional[Tuple[float, str]]:
+    path = _path(key)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('key') != list(key) or time.time() >= data.get('expires', 0):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    return data['expires'], json.dumps(data['response'])
+
+
+def _store(key: Tuple[str, ...], expires: float, response: Dict) -> None:
+    path = _path(key)
+    try:
+        os.makedirs(_cache_dir, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'expires': expires, 'response': response}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug(f'could not write response cache {path}: {e}')
+
+
+def get(key: Tuple[str, ...]) -> Optional[Dict]:
+    """Return a copy of the cached response for ``key``, if still valid.
+
+    :param tuple key:
+        ``(endpoint, client, video_id, identity, signature_timestamp)``
+    :rtype: Optional[Dict]
+    """
+    if not enabled:
+        return None
+    with _entries_lock:
+        entry = _entries.get(key)
+        if entry and time.time() >= entry[0]:
+            del _entries[key]
+            entry = None
+        if entry:
+            _entries.move_to_end(key)
+    if entry is None and use_disk:
+        entry = _load(key)
+        if entry:
+            with _entries_lock:
+                _remember(key, entry)
+    if entry is None:
+        return None
+    logger.debug(f'using cached {key[0]} response of {key[2]}')
+    return json.loads(entry[1])
+
+
+def _remember(key: Tuple[str, ...], entry: Tuple[float, str]) -> None:
+    _entries[key] = entry
+    _entries.move_to_end(key)
+    while len(_entries) > max_entries:
+        _entries.popitem(last=False)
+
+
+def put(key: Tuple[str, ...], response: Dict, expires: Optional[float]) -> None:
+    """Cache ``response`` for ``key`` until the ``expires`` timestamp.
+
+    :param tuple key:
+        ``(endpoint, client, video_id, identity, signature_timestamp)``
+    :param dict response:
+        The InnerTube response.
+    :param float expires:
+        Epoch time after which the response must not be used. If None,
+        the response is not cached.
+    """
+    if not enabled or expires is None or time.time() >= expires:
+        return
+    with _entries_lock:
+        _remember(key, (expires, json.dumps(response)))
+    if use_disk:
+        _store(key, expires, response)
+
+
+def player_expiration(response: Dict) -> Optional[float]:
+    """Return until when a player response can be reused.
+
+    :param dict response:
+        The player response.
+    :rtype: Optional[float]
+    :returns:
+        Epoch time shortly before its earliest stream url expires, or None
+        if the response has no playable streams.
+    """
+    streaming_data = response.get('streamingData')
+    if response.get('playabilityStatus', {}).get('status') != 'OK' or not streaming_data:
+        return None
+
+    expirations = []
+    if 'expiresInSeconds' in streaming_data:
+        expirations.append(time.time() + int(streaming_data['expiresInSeconds']))
+    formats = streaming_data.get('formats', []) + streaming_data.get('adaptiveFormats', [])
+    for fmt in formats:
+        url = fmt.get('url')
+        if url is None and 'signatureCipher' in fmt:
+            url = parse_qs(fmt['signatureCipher']).get('url', [''])[0]
+        match = _expire_regex.search(url or '')
+        if match:
+            expirations.append(int(match.group(1)))
+    if not expirations:
+        return None
+    return min(expirations) - _expiration_margin
+
+
+def discard(video_id: str) -> None:
+    """Drop every cached response of ``video_id``.
+
+    :param str video_id:
+        A YouTube video identifier.
+    """
+    with _entries_lock:
+        for key in [key for key in _entries if key[2] == video_id]:
+            del _entries[key]
+    if use_disk and _cache_dir.is_dir():
+        for path in _cache_dir.glob(f'{video_id}-*.json'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def clear() -> None:
+    """Drop every cached response."""
+    with _entries_lock:
+        _entries.clear()
+    if _cache_dir.is_dir():
+        for path in _cache_dir.glob('*.json'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -7,19 +7,24 @@ has been renamed to accommodate DASH (which serves the audio and video
 separately).
 """
 
+import asyncio
+import json
 import logging
 import os
 from math import ceil
 import sys
+import threading
+import time
 import warnings
 
 from datetime import datetime
-from typing import BinaryIO, Dict, Optional, Tuple, Iterator, Callable
+from functools import lru_cache
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple, Iterator, Callable
 from urllib.error import HTTPError
 from urllib.parse import parse_qs
 from pathlib import Path
 
-from pytubefix import extract, request
+from pytubefix import async_request, extract, request, response_cache
 from pytubefix.helpers import safe_filename, target_directory
 from pytubefix.itags import get_format_profile
 from pytubefix.monostate import Monostate
@@ -27,9 +32,135 @@ from pytubefix.file_system import file_system_verify
 
 logger = logging.getLogger(__name__)
 
+_write_lock = threading.Lock()
+
+# Seconds between two writes of a download journal
+_journal_interval = 1.0
+
+
+def _pwrite(fd: int, data: bytes, offset: int) -> None:
+    """Write ``data`` at ``offset`` without moving a shared file position."""
+    if hasattr(os, "pwrite"):
+        os.pwrite(fd, data, offset)
+        return
+    # Platforms without pwrite (Windows) share one seek position per fd
+    with _write_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+
+
+class _RangeJournal:
+    """Sidecar record of the byte ranges already written to a ``.part`` file.
+
+    A range is only saved after the ``.part`` file was synced to disk, so a
+    resumed download never trusts bytes lost in a crash. Adjacent ranges are
+    merged and the journal is written at most every ``_journal_interval``
+    seconds, so it stays small and cheap over long downloads.
+    """
+
+    def __init__(self, path: str, itag: int, filesize: int):
+        self.path = path
+        self.itag = itag
+        self.filesize = filesize
+        self.ranges: List[Tuple[int, int]] = []
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+        self._unsaved = False
+
+    @property
+    def completed_bytes(self) -> int:
+        return sum(stop - start + 1 for start, stop in self.ranges)
+
+    def load(self) -> bool:
+        """Read the journal, returning False unless it matches this stream."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            ranges = [(int(start), int(stop)) for start, stop in data["ranges"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        if data.get("itag") != self.itag or data.get("filesize") != self.filesize:
+            return False
+        if not all(0 <= start <= stop < self.filesize for start, stop in ranges):
+            return False
+        self.ranges = ranges
+        return True
+
+    def add(self, start: int, stop: int, fd: int) -> None:
+        """Record a range written to ``fd``, saving the journal if it is due."""
+        with self._lock:
+            merged: List[Tuple[int, int]] = []
+            for first, last in sorted(self.ranges + [(start, stop)]):
+                if merged and first <= merged[-1][1] + 1:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+                else:
+                    merged.append((first, last))
+            self.ranges = merged
+            self._unsaved = True
+            if time.monotonic() - self._saved_at >= _journal_interval:
+                self._flush(fd)
+
+    def flush(self, fd: int) -> None:
+        """Save the ranges not saved yet."""
+        with self._lock:
+            if self._unsaved:
+                self._flush(fd)
+
+    def _flush(self, fd: int) -> None:
+        # The recorded ranges were written before they were added
+        os.fsync(fd)
+        self._save()
+        self._saved_at = time.monotonic()
+        self._unsaved = False
+
+    def reset(self) -> None:
+        self.ranges = []
+        self._unsaved = False
+        self.remove()
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _save(self) -> None:
+        data = {"itag": self.itag, "filesize": self.filesize, "ranges": self.ranges}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+@lru_cache(maxsize=1024)
+def _parse_mime_type(mime_type_codec: str) -> Tuple[str, Tuple[str, ...], str, str]:
+    """Parse a mimeType once for all the streams sharing it.
+
+    'video/webm; codecs="vp8, vorbis"' -> 'video/webm', ('vp8', 'vorbis'), 'video', 'webm'
+    """
+    mime_type, codecs = extract.mime_type_codec(mime_type_codec)
+    type_, subtype = mime_type.split("/")
+    return mime_type, tuple(codecs), type_, subtype
+
+
+_format_profile = lru_cache(maxsize=1024)(get_format_profile)
+
+
+def _size_in(size: int, unit: int) -> float:
+    """Round ``size`` bytes up to three decimals of ``unit`` bytes."""
+    return float(ceil(size / unit * 1000) / 1000)
+
 
 class Stream:
-    """Container for stream manifest data."""
+    """Container for stream manifest data.
+
+    Videos have dozens of streams, so a stream only keeps the format data it
+    was built from and derives everything else from it when asked.
+    """
+
+    __slots__ = ('_monostate', '_format', 'url', 'itag', '_filesize', '_subtype')
 
     def __init__(
         self, stream: Dict, monostate: Monostate
@@ -46,69 +177,131 @@ class Stream:
         # (Borg pattern).
         self._monostate = monostate
 
+        # the format data the stream was built from
+        self._format = stream
+
         self.url = stream["url"]  # signed download url
         self.itag = int(
             stream["itag"]
         )  # stream format id (youtube nomenclature)
 
-        # set type and codec info
+        # filesize in bytes
+        self._filesize: Optional[int] = int(stream.get('contentLength', 0))
+
+        # set when the file extension differs from the mime subtype
+        self._subtype: Optional[str] = None
 
-        # 'video/webm; codecs="vp8, vorbis"' -> 'video/webm', ['vp8', 'vorbis']
-        self.mime_type, self.codecs = extract.mime_type_codec(stream["mimeType"])
+    @property
+    def mime_type(self) -> str:
+        """'video/webm; codecs="vp8, vorbis"' -> 'video/webm'"""
+        return _parse_mime_type(self._format["mimeType"])[0]
 
-        # 'video/webm' -> 'video', 'webm'
-        self.type, self.subtype = self.mime_type.split("/")
+    @property
+    def codecs(self) -> List[str]:
+        """'video/webm; codecs="vp8, vorbis"' -> ['vp8', 'vorbis']"""
+        return list(_parse_mime_type(self._format["mimeType"])[1])
 
-        # ['vp8', 'vorbis'] -> video_codec: vp8, audio_codec: vorbis. DASH
-        # streams return NoneType for audio/video depending.
-        self.video_codec, self.audio_codec = self.parse_codecs()
+    @property
+    def type(self) -> str:
+        """'video/webm' -> 'video'"""
+        return _parse_mime_type(self._format["mimeType"])[2]
 
-        self.is_otf: bool = stream["is_otf"]
-        self.bitrate: Optional[int] = stream["bitrate"]
+    @property
+    def subtype(self) -> str:
+        """'video/webm' -> 'webm'"""
+        if self._subtype is not None:
+            return self._subtype
+        return _parse_mime_type(self._format["mimeType"])[3]
 
-        # filesize in bytes
-        self._filesize: Optional[int] = int(stream.get('contentLength', 0))
-        
-        # filesize in kilobytes
-        self._filesize_kb: Optional[float] = float(ceil(float(stream.get('contentLength', 0)) / 1024 * 1000) / 1000)
-        
-        # filesize in megabytes
-        self._filesize_mb: Optional[float] = float(ceil(float(stream.get('contentLength', 0)) / 1024 / 1024 * 1000) / 1000)
-        
-        # filesize in gigabytes(fingers crossed we don't need terabytes going forward though)
-        self._filesize_gb: Optional[float] = float(ceil(float(stream.get('contentLength', 0)) / 1024 / 1024 / 1024 * 1000) / 1000)
-
-        # Additional information about the stream format, such as resolution,
-        # frame rate, and whether the stream is live (HLS) or 3D.
-        itag_profile = get_format_profile(self.itag)
-        self.is_dash = itag_profile["is_dash"]
-        self.abr = itag_profile["abr"]  # average bitrate (audio streams only)
-        if 'fps' in stream:
-            self.fps = stream['fps']  # Video streams only
-        self.resolution = itag_profile[
-            "resolution"
-        ]  # resolution (e.g.: "480p")
-
-        self._width = stream["width"] if 'width' in stream else None
-        self._height = stream["height"] if 'height' in stream else None
-
-        self.is_3d = itag_profile["is_3d"]
-        self.is_hdr = itag_profile["is_hdr"]
-        self.is_live = itag_profile["is_live"]
-
-        self.includes_multiple_audio_tracks: bool = 'audioTrack' in stream
+    @subtype.setter
+    def subtype(self, value: str):
+        self._subtype = value
+
+    @property
+    def video_codec(self) -> Optional[str]:
+        """The video codec, None for audio only streams."""
+        return self.parse_codecs()[0]
+
+    @property
+    def audio_codec(self) -> Optional[str]:
+        """The audio codec, None for video only streams."""
+        return self.parse_codecs()[1]
+
+    @property
+    def is_otf(self) -> bool:
+        return self._format["is_otf"]
+
+    @property
+    def bitrate(self) -> Optional[int]:
+        return self._format["bitrate"]
+
+    @property
+    def fps(self) -> Optional[int]:
+        """Frames per second, None for audio only streams."""
+        return self._format.get("fps")
+
+    # Additional information about the stream format, such as resolution,
+    # frame rate, and whether the stream is live (HLS) or 3D.
+
+    @property
+    def is_dash(self) -> bool:
+        return _format_profile(self.itag)["is_dash"]
+
+    @property
+    def abr(self) -> Optional[str]:
+        """Average bitrate (audio streams only)."""
+        return _format_profile(self.itag)["abr"]
+
+    @property
+    def resolution(self) -> Optional[str]:
+        """Resolution (e.g.: "480p")."""
+        return _format_profile(self.itag)["resolution"]
+
+    @property
+    def is_3d(self) -> bool:
+        return _format_profile(self.itag)["is_3d"]
+
+    @property
+    def is_hdr(self) -> bool:
+        return _format_profile(self.itag)["is_hdr"]
+
+    @property
+    def is_live(self) -> bool:
+        return _format_profile(self.itag)["is_live"]
+
+    @property
+    def includes_multiple_audio_tracks(self) -> bool:
+        return 'audioTrack' in self._format
+
+    @property
+    def is_default_audio_track(self) -> bool:
         if self.includes_multiple_audio_tracks:
-            self.is_default_audio_track = stream['audioTrack']['audioIsDefault']
-            self.audio_track_name_regionalized = str(stream['audioTrack']['displayName']).replace(" original", "")
-            self.audio_track_name = self.audio_track_name_regionalized.split(" ")[0]
-            self.audio_track_language_id_regionalized= str(stream['audioTrack']['id']).split(".")[0]
-            self.audio_track_language_id= self.audio_track_language_id_regionalized.split("-")[0] 
-        else:
-            self.is_default_audio_track = self.includes_audio_track and not self.includes_video_track
-            self.audio_track_name_regionalized = None
-            self.audio_track_name = None
-            self.audio_track_language_id_regionalized = None
-            self.audio_track_language_id= None
+            return self._format['audioTrack']['audioIsDefault']
+        return self.includes_audio_track and not self.includes_video_track
+
+    @property
+    def audio_track_name_regionalized(self) -> Optional[str]:
+        if self.includes_multiple_audio_tracks:
+            return str(self._format['audioTrack']['displayName']).replace(" original", "")
+        return None
+
+    @property
+    def audio_track_name(self) -> Optional[str]:
+        if self.includes_multiple_audio_tracks:
+            return self.audio_track_name_regionalized.split(" ")[0]
+        return None
+
+    @property
+    def audio_track_language_id_regionalized(self) -> Optional[str]:
+        if self.includes_multiple_audio_tracks:
+            return str(self._format['audioTrack']['id']).split(".")[0]
+        return None
+
+    @property
+    def audio_track_language_id(self) -> Optional[str]:
+        if self.includes_multiple_audio_tracks:
+            return self.audio_track_language_id_regionalized.split("-")[0]
+        return None
 
     @property
     def is_adaptive(self) -> bool:
@@ -118,7 +311,7 @@ class Stream:
         """
         # if codecs has two elements (e.g.: ['vp8', 'vorbis']): 2 % 2 = 0
         # if codecs has one element (e.g.: ['vp8']) 1 % 2 = 1
-        return bool(len(self.codecs) % 2)
+        return bool(len(_parse_mime_type(self._format["mimeType"])[1]) % 2)
 
     @property
     def is_progressive(self) -> bool:
@@ -157,14 +350,15 @@ class Stream:
             A two element tuple with audio and video codecs.
 
         """
+        codecs = _parse_mime_type(self._format["mimeType"])[1]
         video = None
         audio = None
         if not self.is_adaptive:
-            video, audio = self.codecs
+            video, audio = codecs
         elif self.includes_video_track:
-            video = self.codecs[0]
+            video = codecs[0]
         elif self.includes_audio_track:
-            audio = self.codecs[0]
+            audio = codecs[0]
         return video, audio
 
     @property
@@ -175,7 +369,7 @@ class Stream:
         :returns:
             Returns an int of the video width
         """
-        return self._width
+        return self._format.get("width")
 
     @property
     def height(self) -> int:
@@ -185,7 +379,7 @@ class Stream:
         :returns:
             Returns an int of the video height
         """
-        return self._height
+        return self._format.get("height")
 
     @property
     def filesize(self) -> int:
@@ -212,14 +406,7 @@ class Stream:
         :returns:
             Rounded filesize (in kilobytes) of the stream.
         """
-        if self._filesize_kb == 0:
-            try:
-                self._filesize_kb = float(ceil(request.filesize(self.url)/1024 * 1000) / 1000)
-            except HTTPError as e:
-                if e.code != 404:
-                    raise
-                self._filesize_kb = float(ceil(request.seq_filesize(self.url)/1024 * 1000) / 1000)
-        return self._filesize_kb
+        return _size_in(self.filesize, 1024)
     
     @property
     def filesize_mb(self) -> float:
@@ -229,14 +416,7 @@ class Stream:
         :returns:
             Rounded filesize (in megabytes) of the stream.
         """
-        if self._filesize_mb == 0:
-            try:
-                self._filesize_mb = float(ceil(request.filesize(self.url)/1024/1024 * 1000) / 1000)
-            except HTTPError as e:
-                if e.code != 404:
-                    raise
-                self._filesize_mb = float(ceil(request.seq_filesize(self.url)/1024/1024 * 1000) / 1000)
-        return self._filesize_mb
+        return _size_in(self.filesize, 1024 * 1024)
 
     @property
     def filesize_gb(self) -> float:
@@ -246,14 +426,7 @@ class Stream:
         :returns:
             Rounded filesize (in gigabytes) of the stream.
         """
-        if self._filesize_gb == 0:
-            try:
-                self._filesize_gb = float(ceil(request.filesize(self.url)/1024/1024/1024 * 1000) / 1000)
-            except HTTPError as e:
-                if e.code != 404:
-                    raise
-                self._filesize_gb = float(ceil(request.seq_filesize(self.url)/1024/1024/1024 * 1000) / 1000)
-        return self._filesize_gb
+        return _size_in(self.filesize, 1024 * 1024 * 1024)
     
     @property
     def title(self,) -> str:
@@ -308,7 +481,10 @@ class Stream:
         skip_existing: bool = True,
         timeout: Optional[int] = None,
         max_retries: int = 0,
-        interrupt_checker: Optional[Callable[[], bool]] = None
+        interrupt_checker: Optional[Callable[[], bool]] = None,
+        max_connections: Optional[int] = None,
+        segment_size: Optional[int] = None,
+        resume: bool = True
     ) -> Optional[str]:
         
         """
@@ -322,6 +498,9 @@ class Stream:
             timeout (Optional[int]): Maximum time, in seconds, to wait for the download request. Defaults to None for no timeout.
             max_retries (int): The number of times to retry the download if it fails. Defaults to 0 (no retries).
             interrupt_checker (Optional[Callable[[], bool]]): A callable function that is checked periodically during the download. If it returns True, the download will stop without errors.
+            max_connections (Optional[int]): Number of byte ranges fetched concurrently. Defaults to `request.default_max_connections`.
+            segment_size (Optional[int]): Size in bytes of each range request. Defaults to `request.default_range_size`.
+            resume (bool): Whether to continue a previous partial download of the same stream. Defaults to True.
 
         Returns:
             Optional[str]: The full file path of the downloaded file, or None if the download was skipped or failed.
@@ -333,8 +512,119 @@ class Stream:
             - The `skip_existing` flag avoids redownloading if the file already exists in the target location.
             - The `interrupt_checker` allows for the download to be halted cleanly if certain conditions are met during the download process.
             - Download progress can be monitored using the `on_progress` callback, and the `on_complete` callback is triggered once the download is finished.
+            - Streams with a known size are split into ranges that are downloaded in parallel and written at their offsets; `on_progress` still fires in file order.
+            - Those streams are written to `<filename>.part` next to a journal of finished ranges, so an interrupted or failed download only fetches what is missing when run again. Expired urls are re-signed through the owning `YouTube` object.
         """
-   
+        file_path = self._download_file_path(output_path, filename, filename_prefix)
+
+        if skip_existing and self.exists_at_path(file_path):
+            logger.debug(f'file {file_path} already exists, skipping')
+            self.on_complete(file_path)
+            return file_path
+
+        if not self.is_otf:
+            if not self._download_segmented(
+                file_path,
+                timeout=timeout,
+                max_retries=max_retries,
+                interrupt_checker=interrupt_checker,
+                max_connections=max_connections,
+                segment_size=segment_size,
+                resume=resume
+            ):
+                return
+            self.on_complete(file_path)
+            return file_path
+
+        bytes_remaining = self.filesize
+        logger.debug(f'downloading ({self.filesize} total bytes) file to {file_path}')
+
+        with open(file_path, "wb") as fh:
+            # Some adaptive streams need to be requested with sequence numbers
+            for chunk in request.seq_stream(
+                self.url,
+                timeout=timeout,
+                max_retries=max_retries,
+                max_connections=max_connections
+            ):
+                if interrupt_checker is not None and interrupt_checker() == True:
+                    logger.debug('interrupt_checker returned True, causing to force stop the downloading')
+                    return
+                # reduce the (bytes) remainder by the length of the chunk.
+                bytes_remaining -= len(chunk)
+                # send to the on_progress callback.
+                self.on_progress(chunk, fh, bytes_remaining)
+
+        self.on_complete(file_path)
+        return file_path
+
+    async def download_async(
+        self,
+        output_path: Optional[str] = None,
+        filename: Optional[str] = None,
+        filename_prefix: Optional[str] = None,
+        skip_existing: bool = True,
+        timeout: Optional[int] = None,
+        max_retries: int = 0
+    ) -> str:
+        """Download the stream without blocking the event loop.
+
+        The stream is read one chunk at a time over a pooled asyncio
+        connection, so many downloads can run concurrently on one thread.
+        The arguments are the same as :meth:`download`.
+
+        :rtype: str
+        :returns:
+            The full file path of the downloaded file.
+        """
+        file_path = self._download_file_path(output_path, filename, filename_prefix)
+
+        if skip_existing and self.exists_at_path(file_path):
+            logger.debug(f'file {file_path} already exists, skipping')
+            self.on_complete(file_path)
+            return file_path
+
+        if self.is_expired:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._refresh_url)
+
+        bytes_remaining = await self._filesize_async()
+        logger.debug(f'downloading ({bytes_remaining} total bytes) file to {file_path}')
+
+        with open(file_path, "wb") as fh:
+            async for chunk in self._aiter_stream(timeout=timeout, max_retries=max_retries):
+                # reduce the (bytes) remainder by the length of the chunk.
+                bytes_remaining -= len(chunk)
+                # send to the on_progress callback.
+                self.on_progress(chunk, fh, bytes_remaining)
+
+        self.on_complete(file_path)
+        return file_path
+
+    async def _filesize_async(self) -> int:
+        if self._filesize == 0:
+            try:
+                self._filesize = await async_request.filesize(self.url)
+            except HTTPError as e:
+                if e.code != 404:
+                    raise
+                self._filesize = await async_request.seq_filesize(self.url)
+        return self._filesize
+
+    async def _aiter_stream(self, **kwargs) -> AsyncIterator[bytes]:
+        if self.is_otf:
+            stream = async_request.seq_stream(self.url, **kwargs)
+        else:
+            stream = async_request.stream(self.url, filesize=await self._filesize_async(), **kwargs)
+        async for chunk in stream:
+            yield chunk
+
+    def _download_file_path(
+        self,
+        output_path: Optional[str],
+        filename: Optional[str],
+        filename_prefix: Optional[str]
+    ) -> str:
         kernel = sys.platform
 
         if kernel == "linux":
@@ -352,55 +642,130 @@ class Stream:
         if filename:
             filename = filename.translate(translation_table)
 
-        file_path = self.get_file_path(
+        return self.get_file_path(
             filename=filename,
             output_path=output_path,
             filename_prefix=filename_prefix,
             file_system=file_system
         )
 
-        if skip_existing and self.exists_at_path(file_path):
-            logger.debug(f'file {file_path} already exists, skipping')
-            self.on_complete(file_path)
-            return file_path
+    def _download_segmented(
+        self,
+        file_path: str,
+        timeout: Optional[int] = None,
+        max_retries: int = 0,
+        interrupt_checker: Optional[Callable[[], bool]] = None,
+        max_connections: Optional[int] = None,
+        segment_size: Optional[int] = None,
+        resume: bool = True
+    ) -> bool:
+        """Download the stream as concurrent byte ranges written in place.
 
-        bytes_remaining = self.filesize
-        logger.debug(f'downloading ({self.filesize} total bytes) file to {file_path}')
+        Ranges are written to ``<file_path>.part`` and recorded in a journal
+        next to it, which is renamed to ``file_path`` once complete.
 
-        with open(file_path, "wb") as fh:
-            try:
-                for chunk in request.stream(
-                    self.url,
-                    timeout=timeout,
-                    max_retries=max_retries
-                ):
-                    if interrupt_checker is not None and interrupt_checker() == True:
-                        logger.debug('interrupt_checker returned True, causing to force stop the downloading')
-                        return
-                    # reduce the (bytes) remainder by the length of the chunk.
-                    bytes_remaining -= len(chunk)
-                    # send to the on_progress callback.
-                    self.on_progress(chunk, fh, bytes_remaining)
-            except HTTPError as e:
-                if e.code != 404:
-                    raise
-            except StopIteration:
-                # Some adaptive streams need to be requested with sequence numbers
-                for chunk in request.seq_stream(
+        :rtype: bool
+        :returns:
+            False if `interrupt_checker` stopped the download, True otherwise.
+        """
+        filesize = self.filesize
+        part_path = f"{file_path}.part"
+        journal = _RangeJournal(f"{part_path}.json", itag=self.itag, filesize=filesize)
+        if not (
+            resume
+            and journal.load()
+            and os.path.isfile(part_path)
+            and os.path.getsize(part_path) == filesize
+        ):
+            journal.reset()
+
+        bytes_remaining = filesize - journal.completed_bytes
+        if journal.ranges:
+            logger.debug(f'resuming ({bytes_remaining} of {filesize} bytes left) file {part_path}')
+        else:
+            logger.debug(f'downloading ({filesize} total bytes) file to {file_path}')
+
+        if self.is_expired:
+            self._refresh_url()
+
+        def on_segment(offset: int, chunk: bytes) -> None:
+            _pwrite(fd, chunk, offset)
+            journal.add(offset, offset + len(chunk) - 1, fd)
+
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        if not journal.ranges:
+            flags |= os.O_TRUNC
+        fd = os.open(part_path, flags, 0o666)
+        try:
+            os.ftruncate(fd, filesize)
+            refreshed = False
+            while True:
+                segments = request.parallel_stream(
                     self.url,
+                    request.missing_ranges(filesize, journal.ranges, segment_size),
+                    max_connections=max_connections,
                     timeout=timeout,
-                    max_retries=max_retries
-                ):
-                    if interrupt_checker is not None and interrupt_checker() == True:
-                        logger.debug('interrupt_checker returned True, causing to force stop the downloading')
-                        return
-                    # reduce the (bytes) remainder by the length of the chunk.
-                    bytes_remaining -= len(chunk)
-                    # send to the on_progress callback.
-                    self.on_progress(chunk, fh, bytes_remaining)
+                    max_retries=max_retries,
+                    on_segment=on_segment
+                )
+                try:
+                    for _, chunk in segments:
+                        if interrupt_checker is not None and interrupt_checker() == True:
+                            logger.debug('interrupt_checker returned True, causing to force stop the downloading')
+                            return False
+                        # reduce the (bytes) remainder by the length of the chunk.
+                        bytes_remaining -= len(chunk)
+                        # send to the on_progress callback.
+                        self.on_progress_for_chunks(chunk, bytes_remaining)
+                    break
+                except HTTPError as e:
+                    # The url expired mid-download, re-sign it once and carry on
+                    if e.code != 403 or refreshed or not self._refresh_url():
+                        raise
+                    refreshed = True
+                finally:
+                    # waits for in-flight ranges before the descriptor is closed
+                    segments.close()
+        finally:
+            try:
+                # Keeps what was downloaded since the last save
+                journal.flush(fd)
+            finally:
+                os.close(fd)
 
-        self.on_complete(file_path)
-        return file_path
+        os.replace(part_path, file_path)
+        journal.remove()
+        return True
+
+    @property
+    def is_expired(self) -> bool:
+        """Whether the signed url of this stream has expired."""
+        try:
+            return self.expiration <= datetime.utcnow()
+        except (IndexError, KeyError, ValueError):
+            return False
+
+    def _refresh_url(self) -> bool:
+        """Re-sign the url of this stream through the owning YouTube object.
+
+        :rtype: bool
+        :returns:
+            False if the stream has no YouTube object or is no longer listed.
+        """
+        youtube = self._monostate.youtube
+        if youtube is None:
+            return False
+        logger.debug(f'refreshing url of itag {self.itag}')
+        response_cache.discard(youtube.video_id)
+        youtube.vid_info = None
+        youtube._fmt_streams = None
+        for stream in youtube.fmt_streams:
+            if stream.itag == self.itag:
+                self.url = stream.url
+                if self._monostate.on_url_refresh is not None:
+                    self._monostate.on_url_refresh(self)
+                return True
+        return False
 
     def get_file_path(
         self,
@@ -441,7 +806,12 @@ class Stream:
             "downloading (%s total bytes) file to buffer", self.filesize,
         )
 
-        for chunk in request.stream(self.url):
+        if self.is_otf:
+            stream = request.seq_stream(self.url)
+        else:
+            stream = request.stream(self.url, filesize=self.filesize)
+
+        for chunk in stream:
             # reduce the (bytes) remainder by the length of the chunk.
             bytes_remaining -= len(chunk)
             # send to the on_progress callback.
@@ -564,7 +934,10 @@ class Stream:
             self.filesize,
         )
         try:
-            stream = request.stream(self.url)
+            if self.is_otf:
+                stream = request.seq_stream(self.url)
+            else:
+                stream = request.stream(self.url, filesize=self.filesize)
         except HTTPError as e:
             if e.code != 404:
                 raise
@@ -576,3 +949,28 @@ class Stream:
             yield chunk
 
         self.on_complete(None)
+
+    async def aiter_chunks(self, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Get the chunks directly, without blocking the event loop.
+
+        Example:
+        async for chunk in stream.aiter_chunks():
+            out_file.write(chunk)
+
+        :param int chunk size:
+        The size in the bytes of each chunk read
+        :rtype: AsyncIterator[bytes]
+        """
+        bytes_remaining = await self._filesize_async()
+
+        logger.info(
+            "downloading (%s total bytes) file to buffer",
+            bytes_remaining,
+        )
+
+        async for chunk in self._aiter_stream(chunk_size=chunk_size):
+            bytes_remaining -= len(chunk)
+            self.on_progress_for_chunks(chunk, bytes_remaining)
+            yield chunk
+
+        self.on_complete(None)
@@ -4,10 +4,14 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from threading import Thread
 import subprocess
-from pytubefix import YouTube, exceptions
+from pytubefix import YouTube, exceptions, response_cache
 import re
 import shutil
 
+# Downloading the same video again reuses its streams until their urls expire.
+# Only kept in memory: the signed urls are bound to this session's IP.
+response_cache.enabled = True
+
 class YouTubeDownloader:
     def __init__(self, root):
         self.root = root
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The package is kept in the virtualenv of the app
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'env', 'lib', 'python3.8', 'site-packages'))
+sys.path.insert(0, os.path.dirname(__file__))
@@ -0,0 +1,18 @@
+/* Trimmed player: the signature and n functions of a base.js with the
+   rest of the player replaced by a few unrelated functions. */
+var pad0=function(q){return q+0};
+var pad1=function(q){return q+1};
+var pad2=function(q){return q+2};
+var pad3=function(q){return q+3};
+var pad4=function(q){return q+4};
+'use strict';var XX="push splice length reverse unshift pop join split forEach indexOf fromCharCode enhanced_except_AbCd_w8_".split(" ");
+var Xy={ab:function(a,b){a.splice(0,b)},cd:function(a){a.reverse()},ef:function(a,b){var c=a[0];a[0]=a[b%a.length];a[b%a.length]=c}};
+Qb=function(a){a=a.split("");Xy.cd(a,1);Xy.ab(a,2);Xy.ef(a,5);Xy.ef(a,41);Xy.cd(a,8);return a.join("")};
+Nq=function(a){var b=a[XX[7]](""),c=[function(d,e){e=(e%d[XX[2]]+d[XX[2]])%d[XX[2]];d[XX[1]](e,1)},-1290604739,function(d,e){e=(e%d.length+d.length)%d.length;var f=d[0];d[0]=d[e];d[e]=f},"abc",function(d){d[XX[3]]()},function(d,e){d[XX[0]](e)},function(d,e){for(e=(e%d.length+d.length)%d.length;e--;)d[XX[4]](d[XX[5]]())},null,b,function(d,e){for(var f=64,h=[];++f-h.length-32;){switch(f){case 58:f=96;continue;case 91:f=44;break;case 65:f=47;continue;case 46:f=153;case 123:f-=58;default:h.push(String[XX[10]](f))}}d[XX[8]](function(l,m,n){this.push(n[m]=h[(h[XX[9]](l)-h[XX[9]](this[m])+m-32+f--)%h.length])},e.split(""))},"Wq3xZk_u8-PoLnbVc2dE9fG",function(d,e){e=(e%d.length+d.length)%d.length;d.splice(0,1,d.splice(e,1,d[0])[0])},-2116430087,1537402453,true,function(d,e){d.length>e&&(d[e]=d[e]^1)},"B7Rt0-yuIopKjh_nm4aSdF"];try{c[0](c[8],3),c[4](c[8]),c[9](c[8],c[10]),c[6](c[8],c[12]),c[11](c[8],7),c[2](c[8],c[13]),c[5](c[8],c[3]),c[9](c[8],c[16]),c[6](c[8],c[1]),c[11](c[8],c[14]),c[0](c[8],c[13]),c[4](c[8]),c[2](c[8],c[1]),c[9](c[8],c[10]),c[5](c[8],c[10]),c[6](c[8],5)}catch(d){return XX[11]+a}return b[XX[6]]("")};
+function zz(c){c.get("n"))&&(b=Nf[0](c),a.set("n",b))}
+var Nf=[Nq];
+var pad0=function(q){return q+0};
+var pad1=function(q){return q+1};
+var pad2=function(q){return q+2};
+var pad3=function(q){return q+3};
+var pad4=function(q){return q+4};
@@ -0,0 +1,230 @@
+"""Local stand-ins for the YouTube servers, used by the tests and benchmarks."""
+import contextlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def make_blob(size):
+    """Deterministic bytes that are not a repeating pattern of small period."""
+    return bytes((i * 7 + i // 251) % 256 for i in range(size))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+@contextlib.contextmanager
+def serve(handler):
+    """Serve ``handler`` on a free local port, yielding the server.
+
+    The server has a ``base_url`` attribute and a ``stats`` dict counting the
+    requests by what the handler passes to ``count``.
+    """
+    server = _Server(('127.0.0.1', 0), handler)
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    server.stats = {}
+    server.stats_lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # http.server writes the headers and the body separately
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def count(self, name):
+        with self.server.stats_lock:
+            self.server.stats[name] = self.server.stats.get(name, 0) + 1
+
+    def reply(self, body, status=200, content_type='application/json'):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def json_body(self):
+        return json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+
+
+def range_handler(blob, rate=0, content_range=False, ignore_range=False):
+    """Serve ``blob`` like googlevideo, honouring ``?range=a-b``.
+
+    :param int rate: Bytes per second per connection, 0 for no limit.
+    :param bool content_range: Tell the full size in a Content-Range header.
+    :param bool ignore_range: Answer every GET with the whole of ``blob``.
+    """
+    class RangeHandler(Handler):
+        def do_HEAD(self):
+            self.count('HEAD')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(blob)))
+            self.end_headers()
+
+        def do_GET(self):
+            self.count('GET')
+            query = parse_qs(urlsplit(self.path).query)
+            start, stop = 0, len(blob) - 1
+            if 'range' in query:
+                self.count('range')
+                if not ignore_range:
+                    start, stop = map(int, query['range'][0].split('-'))
+                    stop = min(stop, len(blob) - 1)
+            data = blob[start:stop + 1]
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            if content_range:
+                self.send_header('Content-Range', f'bytes {start}-{stop}/{len(blob)}')
+            self.end_headers()
+            step = 256 * 1024
+            for i in range(0, len(data), step):
+                part = data[i:i + step]
+                self.wfile.write(part)
+                if rate:
+                    time.sleep(len(part) / rate)
+
+    return RangeHandler
+
+
+def segment_handler(segments, delays=None):
+    """Serve a segmented (OTF) stream, ``sq=0`` being its header.
+
+    ``segments[i]`` is the body of ``sq=i+1``, answered after ``delays[i+1]``
+    seconds if given, honouring ``?range=a-b``. The handler class records the
+    segments as they are requested in ``started`` and answered in
+    ``answered``, and the most segments answered at once in ``peak``.
+    """
+    delays = delays or {}
+
+    class SegmentHandler(Handler):
+        started = []
+        answered = []
+        peak = 0
+        _in_flight = 0
+        _lock = threading.Lock()
+
+        def _segment(self):
+            query = parse_qs(urlsplit(self.path).query)
+            sq = int(query['sq'][0])
+            if sq == 0:
+                return b'Segment-Count: %d\r\n' % len(segments)
+            cls = type(self)
+            with cls._lock:
+                cls.started.append(sq)
+                cls._in_flight += 1
+                cls.peak = max(cls.peak, cls._in_flight)
+            time.sleep(delays.get(sq, 0))
+            with cls._lock:
+                cls._in_flight -= 1
+                cls.answered.append(sq)
+            return segments[sq - 1]
+
+        def do_HEAD(self):
+            self.count('HEAD')
+            body = self._segment()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+
+        def do_GET(self):
+            self.count('GET')
+            body = self._segment()
+            query = parse_qs(urlsplit(self.path).query)
+            if 'range' in query:
+                start, stop = map(int, query['range'][0].split('-'))
+                body = body[start:stop + 1]
+            self.reply(body, content_type='video/mp4')
+
+    return SegmentHandler
+
+
+def connection_handler():
+    """Serve a few canned answers, counting the connections and requests.
+
+    ``/ok`` answers ``ok``, ``/chunked`` answers ``chunked body`` in chunks,
+    ``/redirect`` redirects to ``/ok``, ``/missing`` answers 404 and
+    ``/close`` answers ``ok`` then closes the connection without saying so,
+    like a server dropping an idle connection.
+    """
+    class ConnectionHandler(Handler):
+        def setup(self):
+            super().setup()
+            self.count('connection')
+
+        def do_GET(self):
+            path = urlsplit(self.path).path
+            self.count(path)
+            if path == '/chunked':
+                self.send_response(200)
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for part in (b'chunked', b' ', b'body'):
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(part), part))
+                self.wfile.write(b'0\r\n\r\n')
+            elif path == '/redirect':
+                self.send_response(302)
+                self.send_header('Location', '/ok')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            elif path == '/missing':
+                self.reply(b'not found', status=404, content_type='text/plain')
+            else:
+                self.reply(b'ok', content_type='text/plain')
+                if path == '/close':
+                    self.close_connection = True
+
+    return ConnectionHandler
+
+
+def echo_handler():
+    """Answer every innertube POST with the path and json it was sent."""
+    class EchoHandler(Handler):
+        def do_POST(self):
+            path = urlsplit(self.path).path
+            self.count(path.rsplit('/', 1)[-1])
+            self.reply({'path': path, 'body': self.json_body()})
+
+    return EchoHandler
+
+
+def playlist_items(video_ids, next_page=None):
+    """The entries of a playlist page, with the continuation to ``next_page``."""
+    items = [{'playlistVideoRenderer': {'videoId': video_id}} for video_id in video_ids]
+    if next_page is not None:
+        items.append({'continuationItemRenderer': {
+            'continuationEndpoint': {'continuationCommand': {'token': f'p{next_page}'}}}})
+    return items
+
+
+def browse_handler(videos, page_size=100):
+    """Answer the playlist continuation ``p<n>`` with the n-th page of ``videos``.
+
+    ``videos`` is a list of video ids, read on every request so it can be
+    changed between requests.
+    """
+    class BrowseHandler(Handler):
+        def do_POST(self):
+            n = int(self.json_body()['continuation'][1:])
+            self.count('browse')
+            self.count(f'p{n}')
+            more = len(videos) > (n + 1) * page_size
+            items = playlist_items(videos[n * page_size:(n + 1) * page_size], n + 1 if more else None)
+            self.reply({'onResponseReceivedActions': [
+                {'appendContinuationItemsAction': {'continuationItems': items}}]})
+
+    return BrowseHandler
@@ -0,0 +1,78 @@
+"""The asyncio connection pool against a stand-in server."""
+import asyncio
+from urllib.error import HTTPError
+
+import pytest
+
+import standin
+from pytubefix import async_request
+
+
+@pytest.fixture
+def server():
+    with standin.serve(standin.connection_handler()) as server:
+        yield server
+
+
+async def get(url):
+    response = await async_request._execute_request(url)
+    return await response.read()
+
+
+def test_keep_alive_connection_is_reused(server):
+    async def main():
+        return [await get(f'{server.base_url}/ok') for _ in range(3)]
+
+    assert asyncio.run(main()) == [b'ok'] * 3
+    assert server.stats['connection'] == 1
+
+
+def test_chunked_body(server):
+    async def main():
+        response = await async_request._execute_request(f'{server.base_url}/chunked')
+        chunks = []
+        while True:
+            chunk = await response.read(3)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        # The connection went back to the pool once the last chunk was read
+        return chunks, await get(f'{server.base_url}/chunked')
+
+    chunks, body = asyncio.run(main())
+    assert b''.join(chunks) == body == b'chunked body'
+    assert all(len(chunk) <= 3 for chunk in chunks)
+    assert server.stats['connection'] == 1
+
+
+def test_connection_closed_while_idle_is_replaced(server):
+    async def main():
+        first = await get(f'{server.base_url}/close')
+        # Lets the pool notice nothing, the server is gone all the same
+        await asyncio.sleep(0.05)
+        return first, await get(f'{server.base_url}/ok')
+
+    assert asyncio.run(main()) == (b'ok', b'ok')
+    assert server.stats['connection'] == 2
+    assert server.stats['/ok'] == 1
+
+
+def test_redirect_is_followed(server):
+    async def main():
+        response = await async_request._execute_request(f'{server.base_url}/redirect')
+        return response.geturl(), await response.read()
+
+    assert asyncio.run(main()) == (f'{server.base_url}/ok', b'ok')
+    assert server.stats['connection'] == 1
+
+
+def test_error_status_raises(server):
+    async def main():
+        with pytest.raises(HTTPError) as e:
+            await get(f'{server.base_url}/missing')
+        # The error body was read, so the connection is reused
+        return e.value, await get(f'{server.base_url}/ok')
+
+    error, body = asyncio.run(main())
+    assert (error.code, error.read(), body) == (404, b'not found', b'ok')
+    assert server.stats['connection'] == 1
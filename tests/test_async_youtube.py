@@ -0,0 +1,127 @@
+"""AsyncYouTube.resolve with the player requests replaced."""
+import asyncio
+import threading
+from urllib.error import HTTPError
+
+import pytest
+
+from pytubefix import AsyncYouTube, exceptions
+
+from test_youtube import ERROR, LOGIN_REQUIRED, NOT_AVAILABLE, _InnerTube, playable
+
+
+class _Probe(AsyncYouTube):
+    built_in = None
+
+    @property
+    def fmt_streams(self):
+        if self._fmt_streams is None:
+            type(self).built_in = threading.current_thread()
+            self._fmt_streams = ['stream']
+        return self._fmt_streams
+
+
+def test_streams_are_built_off_the_event_loop():
+    yt = _Probe('https://www.youtube.com/watch?v=2lAe1cqCOXo', client='ANDROID_VR')
+    yt.vid_info = {'playabilityStatus': {'status': 'OK'}, 'streamingData': {}}
+
+    async def main():
+        loop_thread = threading.current_thread()
+        assert await yt.resolve() is yt
+        return loop_thread
+
+    loop_thread = asyncio.run(main())
+    assert _Probe.built_in is not None and _Probe.built_in is not loop_thread
+    assert yt.fmt_streams == ['stream']
+
+
+def answering(responses, hedge_delay=None, cls=AsyncYouTube):
+    """An AsyncYouTube whose player requests answer ``responses[client] = (delay, response)``."""
+    yt = cls('https://www.youtube.com/watch?v=2lAe1cqCOXo', client='ANDROID_VR',
+                      hedge_delay=hedge_delay)
+    yt.fallback_clients = ['TV', 'IOS']
+    yt.requested = []
+    yt.cancelled = []
+
+    async def prepare_client(client):
+        pass
+
+    async def call_innertube(client):
+        yt.requested.append(client)
+        delay, response = responses[client]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            yt.cancelled.append(client)
+            raise
+        if isinstance(response, Exception):
+            raise response
+        return _InnerTube(client), response
+
+    yt._prepare_client = prepare_client
+    yt._call_innertube_async = call_innertube
+    return yt
+
+
+def fetch(yt):
+    asyncio.run(yt._fetch_vid_info())
+    return yt.vid_info
+
+
+def test_not_available_switches_client():
+    yt = answering({'ANDROID_VR': (0, NOT_AVAILABLE), 'TV': (0, playable('TV')), 'IOS': (0, playable('IOS'))})
+    assert fetch(yt) == playable('TV')
+    assert yt.requested == ['ANDROID_VR', 'TV'] and yt.client == 'TV'
+
+
+def test_missing_playability_status_is_kept():
+    yt = answering({'ANDROID_VR': (0, {'videoDetails': {}})})
+    assert fetch(yt) == {'videoDetails': {}}
+    assert yt.requested == ['ANDROID_VR']
+
+
+def test_empty_response_raises():
+    yt = answering({'ANDROID_VR': (0, {})})
+    with pytest.raises(exceptions.InnerTubeResponseError):
+        fetch(yt)
+
+
+def test_slow_client_is_hedged_after_the_delay():
+    yt = answering({
+        'ANDROID_VR': (5, playable('ANDROID_VR')),
+        'TV': (0.01, playable('TV')),
+        'IOS': (5, playable('IOS')),
+    }, hedge_delay=0.05)
+    assert fetch(yt) == playable('TV')
+    assert yt.client == 'TV'
+    # The requests that lost the race do not keep running
+    assert sorted(yt.cancelled) == ['ANDROID_VR', 'IOS']
+    assert yt._hedged_clients == ['ANDROID_VR', 'TV', 'IOS']
+
+
+def test_hedged_result_matches_the_sequential_fallback():
+    yt = answering({
+        'ANDROID_VR': (0, NOT_AVAILABLE),
+        'TV': (0.05, LOGIN_REQUIRED),
+        'IOS': (0, ERROR),
+    }, hedge_delay=5)
+    assert fetch(yt) == LOGIN_REQUIRED
+    assert yt.client == 'TV'
+
+
+def test_resolve_only_skips_unavailable_clients():
+    yt = answering({'TV': (0, LOGIN_REQUIRED), 'IOS': (0, playable('IOS'))}, cls=_Probe)
+    yt.vid_info = {'playabilityStatus': {'status': 'OK'}}
+
+    asyncio.run(yt.resolve())
+    assert yt.requested == ['TV', 'IOS'] and yt.vid_info == playable('IOS')
+
+
+def test_resolve_raises_request_errors():
+    error = HTTPError('https://www.youtube.com/youtubei/v1/player', 500, 'Error', {}, None)
+    yt = answering({'TV': (0, error), 'IOS': (0, playable('IOS'))})
+    yt.vid_info = {'playabilityStatus': {'status': 'OK'}}
+
+    with pytest.raises(HTTPError):
+        asyncio.run(yt.resolve())
+    assert yt.requested == ['TV']
@@ -0,0 +1,208 @@
+"""resolve_many and download_many with the resolution itself replaced.
+
+download_many reads the streams from a stand-in, resolving every video
+from a manifest pointing to it.
+"""
+import itertools
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import standin
+from pytubefix import YouTube, batch
+from pytubefix.exceptions import PytubeFixError
+from pytubefix.monostate import Monostate
+from pytubefix.streams import Stream
+
+BLOB = standin.make_blob(64 * 1024)
+
+
+def test_resolve_many_submits_a_bounded_window(monkeypatch):
+    resolved = []
+    lock = threading.Lock()
+
+    def resolve(video_id, shared, kwargs):
+        time.sleep(0.01)
+        with lock:
+            resolved.append(video_id)
+        if video_id == 'v3':
+            raise ValueError(video_id)
+        return video_id.upper()
+
+    monkeypatch.setattr(batch, '_resolve', resolve)
+    pulled = []
+
+    def video_ids():
+        for i in itertools.count():
+            pulled.append(i)
+            yield f'v{i}'
+
+    results = batch.resolve_many(video_ids(), max_workers=4)
+    first = [next(results) for _ in range(6)]
+    results.close()
+
+    assert len(pulled) <= 4 + 6
+    assert set(resolved) <= {f'v{i}' for i in pulled}
+    for video_id, result in first:
+        if video_id == 'v3':
+            assert isinstance(result, ValueError)
+        else:
+            assert result == video_id.upper()
+
+
+def test_resolve_many_resolves_everything(monkeypatch):
+    monkeypatch.setattr(batch, '_resolve', lambda video_id, shared, kwargs: video_id)
+    ids = [f'v{i}' for i in range(50)]
+    assert sorted(result for _, result in batch.resolve_many(ids, max_workers=3)) == sorted(ids)
+
+
+def manifest(video_id, base_url):
+    return json.dumps({
+        'version': 1,
+        'video_id': video_id,
+        'client': 'ANDROID_VR',
+        'title': video_id,
+        'author': 'author',
+        'length': 10,
+        'streams': [{
+            'itag': 18,
+            'mimeType': 'video/mp4; codecs="avc1.42001E, mp4a.40.2"',
+            'is_otf': False,
+            'bitrate': 1,
+            'contentLength': str(len(BLOB)),
+            'url': f'{base_url}/videoplayback?expire=9999999999&itag=18&id={video_id}',
+        }],
+    })
+
+
+def counting_handler(rate=0):
+    """range_handler also recording the most GETs answered at once."""
+    class CountingHandler(standin.range_handler(BLOB, rate)):
+        def do_GET(self):
+            stats, lock = self.server.stats, self.server.stats_lock
+            with lock:
+                stats['active'] = stats.get('active', 0) + 1
+                stats['peak'] = max(stats.get('peak', 0), stats['active'])
+            try:
+                super().do_GET()
+            finally:
+                with lock:
+                    stats['active'] -= 1
+
+    return CountingHandler
+
+
+@pytest.fixture
+def server():
+    with standin.serve(counting_handler()) as server:
+        yield server
+
+
+def resolver(base_url, resolved, fail=()):
+    def resolve(video_id, shared, kwargs):
+        resolved.append(video_id)
+        if video_id in fail:
+            raise PytubeFixError(f'{video_id} is unavailable')
+        return YouTube.from_manifest(manifest(video_id, base_url))
+    return resolve
+
+
+def ids(n):
+    return [f'video{i:06d}' for i in range(n)]
+
+
+def statuses(results):
+    return {r.video_id: r.status for r in results}
+
+
+def test_download_many_resumes_from_the_journal(monkeypatch, server, tmp_path):
+    resolved = []
+    monkeypatch.setattr(batch, '_resolve', resolver(server.base_url, resolved))
+
+    first = batch.download_many(ids(3), str(tmp_path), max_connections=1)
+    assert [r.video_id for r in first] == ids(3)
+    assert set(statuses(first).values()) == {'downloaded'}
+    for result in first:
+        with open(result.file_path, 'rb') as f:
+            assert f.read() == BLOB
+
+    resolved.clear()
+    gets = server.stats['GET']
+    second = batch.download_many(ids(4), str(tmp_path), max_connections=1)
+    assert statuses(second) == {**dict.fromkeys(ids(3), 'skipped'), ids(4)[3]: 'downloaded'}
+    assert [r.file_path for r in second[:3]] == [r.file_path for r in first]
+    assert resolved == [ids(4)[3]]
+    assert server.stats['GET'] == gets + 1
+
+
+def test_download_many_isolates_a_failing_item(monkeypatch, server, tmp_path):
+    failing = ids(5)[2]
+    monkeypatch.setattr(batch, '_resolve', resolver(server.base_url, [], fail={failing}))
+
+    results = batch.download_many(ids(5), str(tmp_path), max_connections=1)
+    assert statuses(results) == {**dict.fromkeys(ids(5), 'downloaded'), failing: 'failed'}
+    assert isinstance(results[2].error, PytubeFixError)
+
+    # Only the failed one is tried again
+    resolved = []
+    monkeypatch.setattr(batch, '_resolve', resolver(server.base_url, resolved))
+    results = batch.download_many(ids(5), str(tmp_path), max_connections=1)
+    assert statuses(results) == {**dict.fromkeys(ids(5), 'skipped'), failing: 'downloaded'}
+    assert resolved == [failing]
+
+
+def test_download_many_fails_without_a_stream(monkeypatch, server, tmp_path):
+    monkeypatch.setattr(batch, '_resolve', resolver(server.base_url, []))
+    results = batch.download_many(ids(2), str(tmp_path), select_stream=lambda yt: None)
+    assert statuses(results) == dict.fromkeys(ids(2), 'failed')
+    assert not os.path.exists(tmp_path / '.pytubefix-journal.jsonl')
+
+
+def test_download_many_limits_each_host(monkeypatch, tmp_path):
+    # 64 KiB at 256 KiB/s, so the downloads overlap
+    with standin.serve(counting_handler(rate=256 * 1024)) as server:
+        monkeypatch.setattr(batch, '_resolve', resolver(server.base_url, []))
+        results = batch.download_many(
+            ids(6), str(tmp_path), max_downloads=6, max_per_host=2, max_connections=1)
+        assert set(statuses(results).values()) == {'downloaded'}
+        assert server.stats['peak'] == 2
+
+
+def test_download_many_stops_when_interrupted(monkeypatch, tmp_path):
+    with standin.serve(counting_handler(rate=256 * 1024)) as server:
+        monkeypatch.setattr(batch, '_resolve', resolver(server.base_url, []))
+        results = batch.download_many(
+            ids(6), str(tmp_path), max_downloads=1, max_connections=1,
+            interrupt_checker=lambda: server.stats.get('GET', 0) >= 2)
+
+        done = [r.video_id for r in results if r.status == 'downloaded']
+        assert set(statuses(results).values()) <= {'downloaded', 'interrupted'}
+        assert len(done) <= 1 and statuses(results)[ids(6)[5]] == 'interrupted'
+
+        results = batch.download_many(ids(6), str(tmp_path), max_connections=1)
+        assert statuses(results) == {
+            **dict.fromkeys(ids(6), 'downloaded'), **dict.fromkeys(done, 'skipped')}
+        for result in results:
+            with open(result.file_path, 'rb') as f:
+                assert f.read() == BLOB
+
+
+def test_host_slot_moves_with_a_refreshed_url():
+    monostate = Monostate(None, None)
+    stream = Stream({'url': 'https://a.example/videoplayback', 'itag': 18}, monostate)
+    hosts = batch._HostLimiter(1)
+
+    with hosts.hold(stream):
+        assert not hosts.semaphore('https://a.example').acquire(blocking=False)
+        stream.url = 'https://b.example/videoplayback'
+        monostate.on_url_refresh(stream)
+        # The slot of the old host is free, the one of the new host is held
+        assert hosts.semaphore('https://a.example').acquire(blocking=False)
+        hosts.semaphore('https://a.example').release()
+        assert not hosts.semaphore('https://b.example').acquire(blocking=False)
+
+    assert monostate.on_url_refresh is None
+    assert hosts.semaphore('https://b.example').acquire(blocking=False)
@@ -0,0 +1,151 @@
+"""The botGuard worker pool and poToken cache, with python in place of node."""
+import sys
+import threading
+
+import pytest
+
+from pytubefix.botGuard import bot_guard
+
+# Answers like vm/worker.js, tagging every poToken with the worker pid
+WORKER = '''
+import json, os, sys
+print(json.dumps({'ready': True}), flush=True)
+for line in sys.stdin:
+    print(json.dumps({'po_token': f'{line.strip()}-{os.getpid()}'}), flush=True)
+'''
+
+# Like vm/worker.js when botGuard.js cannot be loaded
+BROKEN_WORKER = '''
+import json
+print(json.dumps({'error': 'botGuard.js entry point not found'}), flush=True)
+'''
+
+# Like vm/botGuard.js, a poToken for the visitorData of argv
+ONCE = '''
+import sys
+print(f'{sys.argv[1]}-once')
+'''
+
+
+@pytest.fixture
+def node(monkeypatch, tmp_path):
+    """Run the python scripts written with ``node.write(worker=..., once=...)``."""
+    class Node:
+        def write(self, worker=WORKER, once=ONCE):
+            (tmp_path / 'worker.py').write_text(worker)
+            (tmp_path / 'once.py').write_text(once)
+
+    monkeypatch.setattr(bot_guard, 'NODE_PATH', sys.executable)
+    monkeypatch.setattr(bot_guard, 'WORKER_PATH', str(tmp_path / 'worker.py'))
+    monkeypatch.setattr(bot_guard, 'VM_PATH', str(tmp_path / 'once.py'))
+    monkeypatch.setattr(bot_guard, '_po_tokens', {})
+    monkeypatch.setattr(bot_guard, '_po_token_locks', {})
+    node = Node()
+    node.write()
+    bot_guard.stop_workers()
+    yield node
+    bot_guard.stop_workers()
+
+
+def test_workers_are_reused_up_to_max_workers(node, monkeypatch):
+    monkeypatch.setattr(bot_guard, 'max_workers', 2)
+    tokens = []
+    lock = threading.Lock()
+
+    def generate(i):
+        token = bot_guard.generate_po_token(f'visitor{i}')
+        with lock:
+            tokens.append(token)
+
+    threads = [threading.Thread(target=generate, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    pids = {token.rsplit('-', 1)[1] for token in tokens}
+    assert len(tokens) == 20 and 1 <= len(pids) <= 2
+    assert bot_guard._worker_count == len(pids)
+
+
+def test_dead_worker_is_replaced(node):
+    first = bot_guard.generate_po_token('a')
+    worker = bot_guard._idle_workers.get_nowait()
+    bot_guard._idle_workers.put(worker)
+    worker.close()
+
+    with pytest.raises(bot_guard.subprocess.CalledProcessError):
+        bot_guard.generate_po_token('b')
+    second = bot_guard.generate_po_token('b')
+    assert first.rsplit('-', 1)[1] != second.rsplit('-', 1)[1]
+    assert bot_guard._worker_count == 1
+
+
+def test_po_token_is_reused_until_it_expires(node, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(bot_guard.time, 'time', lambda: now[0])
+    monkeypatch.setattr(bot_guard, 'po_token_ttl', 10)
+    # Every run prints a different poToken
+    node.write(worker=BROKEN_WORKER, once='import sys, time; print(sys.argv[1], time.time())')
+
+    token = bot_guard.generate_po_token('a')
+    now[0] += 9
+    assert bot_guard.generate_po_token('a') == token
+    now[0] += 1
+    assert bot_guard.generate_po_token('a') != token
+
+
+def test_po_tokens_are_bounded(node, monkeypatch):
+    monkeypatch.setattr(bot_guard, 'max_po_tokens', 3)
+    for i in range(5):
+        bot_guard.generate_po_token(f'visitor{i}')
+    assert list(bot_guard._po_tokens) == ['visitor2', 'visitor3', 'visitor4']
+    assert set(bot_guard._po_token_locks) == set(bot_guard._po_tokens)
+
+
+def test_expired_po_tokens_are_dropped(node, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(bot_guard.time, 'time', lambda: now[0])
+    monkeypatch.setattr(bot_guard, 'po_token_ttl', 10)
+    bot_guard.generate_po_token('a')
+    bot_guard.generate_po_token('b')
+    now[0] += 5
+    bot_guard.generate_po_token('c')
+    now[0] += 6
+    bot_guard.generate_po_token('d')
+    assert list(bot_guard._po_tokens) == ['c', 'd']
+    assert set(bot_guard._po_token_locks) == {'c', 'd'}
+
+
+def test_broken_worker_falls_back_to_a_run_per_token(node, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(bot_guard.time, 'time', lambda: now[0])
+    monkeypatch.setattr(bot_guard, 'worker_retry_delay', 10)
+    node.write(worker=BROKEN_WORKER)
+
+    assert bot_guard.generate_po_token('a') == 'a-once'
+    assert bot_guard._worker_count == 0
+    assert bot_guard._workers_retry_at == 1010
+
+    # Not tried again until the delay passed, then twice as long
+    node.write()
+    assert bot_guard.generate_po_token('b') == 'b-once'
+    node.write(worker=BROKEN_WORKER)
+    now[0] += 10
+    assert bot_guard.generate_po_token('c') == 'c-once'
+    assert bot_guard._workers_retry_at == 1030
+
+    # A worker that starts again is used from then on
+    node.write()
+    now[0] += 20
+    assert not bot_guard.generate_po_token('d').endswith('-once')
+    assert bot_guard._worker_failures == 0
+    assert not bot_guard.generate_po_token('e').endswith('-once')
+
+
+def test_stop_workers_retries_a_broken_worker(node):
+    node.write(worker=BROKEN_WORKER)
+    assert bot_guard.generate_po_token('a') == 'a-once'
+    node.write()
+    bot_guard.stop_workers()
+    assert not bot_guard.generate_po_token('b').endswith('-once')
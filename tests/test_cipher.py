@@ -0,0 +1,95 @@
+"""The Cipher shared by every YouTube of the same player."""
+import copy
+from collections import OrderedDict
+from urllib.parse import parse_qs, quote, urlsplit
+
+import pytest
+
+import pytubefix
+from pytubefix import YouTube, cipher, exceptions, js_cache, request
+
+from test_jscompiler import NODE, PLAYER
+
+JS_URL = 'https://www.youtube.com/s/player/sample/player_ias.vflset/en_US/base.js'
+(S, SIG), (N, DECIPHERED_N) = NODE['sig'][0], NODE['n'][0]
+URL = f'https://rr1---sn-a5mekn6d.googlevideo.com/videoplayback?itag=251&n={N}'
+VID_INFO = {
+    'playabilityStatus': {'status': 'OK'},
+    'videoDetails': {'videoId': '2lAe1cqCOXo', 'title': 'Title', 'lengthSeconds': '10'},
+    'streamingData': {'adaptiveFormats': [{
+        'itag': 251,
+        'mimeType': 'audio/webm; codecs="opus"',
+        'bitrate': 1,
+        'signatureCipher': f's={quote(S)}&sp=sig&url={quote(URL)}',
+    }]},
+}
+
+
+@pytest.fixture
+def built(tmp_path, monkeypatch):
+    """The js_url of every Cipher built."""
+    monkeypatch.setattr(js_cache, '_cache_dir', tmp_path / 'js')
+    monkeypatch.setattr(cipher, '_ciphers', OrderedDict())
+    monkeypatch.setattr(pytubefix, '__js__', None)
+    monkeypatch.setattr(pytubefix, '__js_url__', None)
+    built = []
+
+    class Counted(cipher.Cipher):
+        def __init__(self, js, js_url):
+            built.append(js_url)
+            super().__init__(js, js_url)
+
+    monkeypatch.setattr(cipher, 'Cipher', Counted)
+    return built
+
+
+def youtube():
+    yt = YouTube('https://www.youtube.com/watch?v=2lAe1cqCOXo', client='WEB_CREATOR')
+    yt.vid_info = copy.deepcopy(VID_INFO)
+    yt._js, yt._js_url = PLAYER, JS_URL
+    return yt
+
+
+def query(yt):
+    stream, = yt.fmt_streams
+    return {k: v[0] for k, v in parse_qs(urlsplit(stream.url).query).items()}
+
+
+def test_youtubes_of_the_same_player_share_the_cipher(built):
+    first, second = youtube(), youtube()
+    assert query(first) == query(second) == {'itag': '251', 'n': DECIPHERED_N, 'sig': SIG}
+    assert built == [JS_URL]
+
+
+def test_least_recently_used_cipher_is_dropped(built, monkeypatch):
+    monkeypatch.setattr(js_cache, 'load_functions', lambda js_url: None)
+    urls = [f'{JS_URL}?{i}' for i in range(5)]
+    ciphers = [cipher.get_cipher(PLAYER, url) for url in urls[:4]]
+    assert cipher.get_cipher(PLAYER, urls[0]) is ciphers[0]
+
+    cipher.get_cipher(PLAYER, urls[4])
+    assert list(cipher._ciphers) == [urls[2], urls[3], urls[0], urls[4]]
+    assert cipher.get_cipher(PLAYER, urls[1]) is not ciphers[1]
+    assert len(cipher._ciphers) == cipher._max_ciphers == 4
+    assert built == urls + [urls[1]]
+
+
+def test_failing_cipher_is_rebuilt_with_a_new_player(built, monkeypatch):
+    class Stale:
+        def get_signature(self, ciphered_signature):
+            raise exceptions.InterpretationError(js_url=JS_URL)
+
+    cipher._ciphers[JS_URL] = Stale()
+    fetched = []
+
+    def get(url, *args, **kwargs):
+        fetched.append(url)
+        return PLAYER
+
+    monkeypatch.setattr(request, 'get', get)
+    monkeypatch.setattr(YouTube, 'js_url', property(lambda self: self._js_url or JS_URL))
+    yt = youtube()
+    assert query(yt) == {'itag': '251', 'n': DECIPHERED_N, 'sig': SIG}
+    assert fetched == [JS_URL]
+    assert built == [JS_URL]
+    assert not isinstance(cipher._ciphers[JS_URL], Stale)
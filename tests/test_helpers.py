@@ -0,0 +1,104 @@
+"""DeferredGeneratorList against a plain list."""
+import itertools
+
+import pytest
+
+from pytubefix.helpers import DeferredGeneratorList
+
+ITEMS = list(range(10))
+
+
+def deferred(items=ITEMS):
+    """A DeferredGeneratorList of ``items`` recording how many were generated."""
+    generated = []
+
+    def gen():
+        for item in items:
+            generated.append(item)
+            yield item
+
+    result = DeferredGeneratorList(gen())
+    result.generated = generated
+    return result
+
+
+_bounds = [None, -12, -10, -3, -1, 0, 1, 3, 9, 10, 12]
+
+
+def test_slices_match_a_list():
+    for start, stop, step in itertools.product(_bounds, _bounds, [None, 1, 2, 3, -1, -2, -4]):
+        assert deferred()[start:stop:step] == ITEMS[start:stop:step], (start, stop, step)
+
+
+@pytest.mark.parametrize('key,needed', [
+    (slice(0, 3), 3),
+    (slice(2, 5, 2), 5),
+    (slice(None, 4), 4),
+    (slice(4, None, -1), 5),
+    (slice(6, 1, -2), 7),
+])
+def test_slices_only_generate_what_they_need(key, needed):
+    result = deferred()
+    assert result[key] == ITEMS[key]
+    assert len(result.generated) == needed
+
+
+@pytest.mark.parametrize('key', [slice(-3, None), slice(0, -1), slice(None, None, -1), slice(2, None)])
+def test_open_or_negative_slices_generate_everything(key):
+    result = deferred()
+    assert result[key] == ITEMS[key]
+    assert len(result.generated) == len(ITEMS)
+
+
+@pytest.mark.parametrize('index', [0, 3, 9, -1, -10])
+def test_indexes_match_a_list(index):
+    result = deferred()
+    assert result[index] == ITEMS[index]
+    assert len(result.generated) == (len(ITEMS) if index < 0 else index + 1)
+
+
+@pytest.mark.parametrize('index', [10, -11])
+def test_index_out_of_range(index):
+    with pytest.raises(IndexError):
+        deferred()[index]
+
+
+def test_bool_reads_one_element():
+    result = deferred()
+    assert result
+    assert result.generated == [0]
+    assert not deferred([])
+
+
+def test_repr_reads_nothing():
+    result = deferred()
+    assert repr(result) == '[...]'
+    assert result.generated == []
+    result[1]
+    assert repr(result) == '[0, 1, ...]'
+    assert result.generated == [0, 1]
+    result.generate_all()
+    assert repr(result) == repr(ITEMS)
+
+
+def test_iteration_and_length():
+    result = deferred()
+    iterator = iter(result)
+    assert [next(iterator) for _ in range(3)] == [0, 1, 2]
+    assert result.generated == [0, 1, 2]
+    assert list(result) == ITEMS and len(result) == len(ITEMS)
+    assert list(reversed(result)) == ITEMS[::-1]
+
+
+def test_known_length_is_called_once_and_then_exact():
+    calls = []
+
+    def known_length():
+        calls.append(1)
+        return 42
+
+    result = DeferredGeneratorList(iter(ITEMS), known_length)
+    assert result.known_length == 42 and result.known_length == 42
+    assert calls == [1]
+    result.generate_all()
+    assert result.known_length == len(ITEMS)
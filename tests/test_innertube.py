@@ -0,0 +1,135 @@
+"""Concurrent requests on a shared InnerTube against a local stand-in."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import standin
+from pytubefix import innertube
+from pytubefix.innertube import InnerTube
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with standin.serve(standin.echo_handler()) as server:
+        monkeypatch.setattr(InnerTube, 'base_url', property(lambda self: server.base_url + '/youtubei/v1'))
+        monkeypatch.setattr(innertube.response_cache, 'enabled', False)
+        yield server
+
+
+@pytest.mark.parametrize('client', ['WEB', 'ANDROID_VR'])
+def test_shared_client_does_not_mix_payloads(server, client):
+    yt = InnerTube(client)
+    context = yt.base_data['context']
+    visitor = [None]
+    visitor_lock = threading.Lock()
+
+    def call(i):
+        kind = i % 4
+        if kind == 0:
+            return kind, i, yt.player(f'player{i:05}')
+        if kind == 1:
+            return kind, i, yt.next(f'next{i:07}')
+        if kind == 2:
+            return kind, i, yt.browse(continuation=f'cont{i}', visitor_data=f'browse{i}')
+        with visitor_lock:
+            visitor[0] = f'inserted{i}'
+            yt.insert_visitor_data(visitor[0])
+        return kind, i, yt.next(continuation=f'cont{i}')
+
+    with ThreadPoolExecutor(16) as executor:
+        results = list(executor.map(call, range(2000)))
+
+    crossed = []
+    for kind, i, response in results:
+        body = response['body']
+        expected = {
+            0: {'videoId': f'player{i:05}', 'contentCheckOk': 'true'},
+            1: {'videoId': f'next{i:07}', 'contentCheckOk': 'true'},
+            2: {'continuation': f'cont{i}'},
+            3: {'continuation': f'cont{i}'},
+        }[kind]
+        own = {key: body.get(key) for key in ('videoId', 'contentCheckOk', 'continuation') if key in body}
+        client_data = body['context']['client']
+        if own != expected:
+            crossed.append((i, own))
+        elif kind == 2 and client_data.get('visitorData') != f'browse{i}':
+            crossed.append((i, client_data.get('visitorData')))
+        elif client_data['clientName'] != context['client']['clientName']:
+            crossed.append((i, client_data['clientName']))
+    assert crossed == []
+    assert server.stats == {'player': 500, 'next': 1000, 'browse': 500}
+
+    # Requests never wrote into the client's own payload
+    assert 'videoId' not in yt.base_data and 'continuation' not in yt.base_data
+    assert yt.base_data['context']['client']['visitorData'] == visitor[0]
+    assert InnerTube(client).base_data['context'] == context
+
+
+@pytest.fixture
+def shared_visitor_data():
+    innertube.clear_visitor_data()
+    yield
+    innertube.clear_visitor_data()
+
+
+def test_response_visitor_data_matches_the_key():
+    params = [{'key': 'c', 'value': 'WEB'}, {'key': 'visitor_data', 'value': 'CgtWaXNpdG9y'}]
+    response = {'responseContext': {'serviceTrackingParams': [
+        {'service': 'GFEEDBACK', 'params': [{'key': 'logged_in', 'value': '0'}]},
+        {'service': 'GOOGLE_HELP', 'params': params},
+    ]}}
+    assert innertube._response_visitor_data(response) == 'CgtWaXNpdG9y'
+    del params[1]
+    assert innertube._response_visitor_data(response) is None
+    assert innertube._response_visitor_data({'responseContext': {'visitorData': 'abc'}}) == 'abc'
+
+
+@pytest.mark.parametrize('identity', ['anonymous', 'oauth', 'po_token'])
+def test_only_anonymous_responses_are_shared(shared_visitor_data, identity):
+    yt = InnerTube('ANDROID_VR')
+    if identity == 'oauth':
+        yt.use_oauth = True
+    elif identity == 'po_token':
+        yt.insert_po_token('bound', 'pot')
+    yt._api_result(b'{"responseContext": {"visitorData": "seen"}}')
+    assert innertube.get_visitor_data() == ('seen' if identity == 'anonymous' else None)
+
+
+def test_visitor_data_request_does_not_hold_the_lock(shared_visitor_data, monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def player(self, video_id):
+        calls.append(self.timeout)
+        release.wait(5)
+        return {'responseContext': {'visitorData': 'fresh'}}
+
+    monkeypatch.setattr(InnerTube, 'player', player)
+    with ThreadPoolExecutor(4) as executor:
+        requests = [executor.submit(innertube.get_visitor_data, 'video') for _ in range(3)]
+        while not calls:
+            time.sleep(0.001)
+        # Readers and sharers do not wait for the pending request
+        assert innertube.get_visitor_data() is None
+        innertube.share_visitor_data('shared')
+        assert innertube.get_visitor_data() == 'shared'
+        release.set()
+        results = [request.result(5) for request in requests]
+    assert calls == [innertube.visitor_data_timeout]
+    assert all(result in ('fresh', 'shared') for result in results)
+
+
+def test_waiters_give_up_on_a_hanging_request(shared_visitor_data, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(InnerTube, 'player', lambda self, video_id: release.wait(5) and {})
+    monkeypatch.setattr(innertube, 'visitor_data_timeout', 0.1)
+    with ThreadPoolExecutor(1) as executor:
+        hanging = executor.submit(innertube.get_visitor_data, 'video')
+        while innertube._visitor_data_request is None:
+            time.sleep(0.001)
+        assert innertube.get_visitor_data('video') is None
+        release.set()
+        assert hanging.result(5) is None
+    assert innertube._visitor_data_request is None
@@ -0,0 +1,99 @@
+"""The on-disk cache of base.js and of what Cipher extracts from it."""
+import json
+import os
+
+import pytest
+
+from pytubefix import cipher, js_cache
+from pytubefix.jsinterp import JSInterpreter
+
+from test_jscompiler import NODE, PLAYER
+
+JS_URL = 'https://www.youtube.com/s/player/0000aaaa/player_ias.vflset/en_US/base.js'
+OTHER_URL = 'https://www.youtube.com/s/player/1111bbbb/player_ias.vflset/en_US/base.js'
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(js_cache, '_cache_dir', tmp_path / 'js')
+    return tmp_path / 'js'
+
+
+def test_entries_are_keyed_by_js_url():
+    js_cache.save_js(JS_URL, 'var a=1;')
+    js_cache.save_functions(JS_URL, 'Qb', 'Nq', {'Qb': [['a'], 'return a']})
+    assert js_cache.load_js(JS_URL) == 'var a=1;'
+    assert js_cache.load_functions(JS_URL)['functions'] == {'Qb': [['a'], 'return a']}
+    assert js_cache.load_js(OTHER_URL) is None
+    assert js_cache.load_functions(OTHER_URL) is None
+
+    js_cache.remove(JS_URL)
+    assert js_cache.load_js(JS_URL) is None
+    assert js_cache.load_functions(JS_URL) is None
+
+
+def test_entry_of_another_url_in_the_same_file_is_ignored():
+    js_cache.save_functions(OTHER_URL, 'Qb', 'Nq', {})
+    os.replace(js_cache._path(OTHER_URL, '.json'), js_cache._path(JS_URL, '.json'))
+    assert js_cache.load_functions(JS_URL) is None
+
+
+def test_entry_of_another_version_is_ignored():
+    js_cache.save_functions(JS_URL, 'Qb', 'Nq', {})
+    path = js_cache._path(JS_URL, '.json')
+    with open(path) as f:
+        data = json.load(f)
+    assert data['version'] == js_cache.__version__
+    with open(path, 'w') as f:
+        json.dump({**data, 'version': '0.0.1'}, f)
+    assert js_cache.load_functions(JS_URL) is None
+
+
+def test_write_replaces_the_entry_at_once(cache_dir, monkeypatch):
+    js_cache.save_js(JS_URL, 'old')
+    written = []
+
+    def replace(src, dst):
+        # The new content is complete before it takes the place of the old
+        with open(src) as f:
+            written.append(f.read())
+        assert js_cache.load_js(JS_URL) == 'old'
+        os.rename(src, dst)
+
+    monkeypatch.setattr(js_cache.os, 'replace', replace)
+    js_cache.save_js(JS_URL, 'new' * 1000)
+    assert written == ['new' * 1000]
+    assert js_cache.load_js(JS_URL) == 'new' * 1000
+    assert [p.suffix for p in cache_dir.iterdir()] == ['.js']
+
+
+def test_failed_write_keeps_the_old_entry(cache_dir, monkeypatch):
+    js_cache.save_js(JS_URL, 'old')
+
+    def replace(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(js_cache.os, 'replace', replace)
+    js_cache.save_js(JS_URL, 'new')
+    assert js_cache.load_js(JS_URL) == 'old'
+
+
+def test_cold_cipher_does_not_scan_the_player_again(monkeypatch):
+    (sig, sig_expected), (n, n_expected) = NODE['sig'][0], NODE['n'][0]
+    first = cipher.Cipher(PLAYER, JS_URL)
+    assert first.get_signature(sig) == sig_expected
+    assert first.get_throttling(n) == n_expected
+    cached = js_cache.load_functions(JS_URL)
+    assert set(cached['functions']) >= {'Qb', 'Nq'}
+    assert cached['objects']
+
+    def scan(self, name):
+        raise AssertionError(f'scanned base.js for {name}')
+
+    monkeypatch.setattr(cipher, 'get_initial_function_name', scan)
+    monkeypatch.setattr(cipher, 'get_throttling_function_name', scan)
+    monkeypatch.setattr(JSInterpreter, 'extract_function_code', scan)
+    monkeypatch.setattr(JSInterpreter, 'extract_object_code', scan)
+    second = cipher.Cipher(PLAYER, JS_URL)
+    assert second.get_signature(sig) == sig_expected
+    assert second.get_throttling(n) == n_expected
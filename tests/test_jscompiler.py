@@ -0,0 +1,95 @@
+"""JSCompiler against JSInterpreter and node on a trimmed player.
+
+``fixtures/player_sample_node.json`` holds the output of node for the sig
+and n functions of ``fixtures/player_sample.js``.
+"""
+import json
+import os
+
+import pytest
+
+from pytubefix import cipher
+from pytubefix.jscompiler import JSCompiler
+from pytubefix.jsinterp import JSInterpreter
+
+_fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+with open(os.path.join(_fixtures, 'player_sample.js')) as f:
+    PLAYER = f.read()
+with open(os.path.join(_fixtures, 'player_sample_node.json')) as f:
+    NODE = json.load(f)
+
+SIG_NAME = cipher.get_initial_function_name(PLAYER, 'player_sample.js')
+N_NAME = cipher.get_throttling_function_name(PLAYER, 'player_sample.js')
+
+# Inputs the interpreter raises on; the compiler still has to match node.
+_INTERPRETER_FAILS = {'x', '', NODE['sig'][1][0]}
+
+
+def test_function_names():
+    assert (SIG_NAME, N_NAME) == ('Qb', 'Nq')
+
+
+@pytest.mark.parametrize('kind,name', [('n', N_NAME), ('sig', SIG_NAME)])
+def test_compiler_matches_node(kind, name):
+    compiler = JSCompiler(PLAYER)
+    for arg, expected in NODE[kind]:
+        assert compiler.call_function(name, arg) == expected, arg
+
+
+@pytest.mark.parametrize('kind,name', [('n', N_NAME), ('sig', SIG_NAME)])
+def test_compiler_matches_interpreter(kind, name):
+    compiler, interpreter = JSCompiler(PLAYER), JSInterpreter(PLAYER)
+    for arg, _ in NODE[kind]:
+        if arg in _INTERPRETER_FAILS:
+            continue
+        assert compiler.call_function(name, arg) == interpreter.call_function(name, arg), arg
+
+
+def test_compiled_functions_are_reused():
+    compiler = JSCompiler(PLAYER)
+    arg, expected = NODE['n'][0]
+    assert compiler.call_function(N_NAME, arg) == expected
+    func = compiler._functions[N_NAME]
+    assert compiler.call_function(N_NAME, arg) == expected
+    assert compiler._functions[N_NAME] is func
+
+
+@pytest.mark.parametrize('body,message', [
+    ('return a.replace(/[0-9]/g,"")', 'regular expressions'),
+    ('x:for(var i=0;i<3;i++){continue x}return a', 'labels'),
+    ('return [a].map(b=>b+1)', 'arrow functions'),
+])
+def test_unsupported_syntax_falls_back(monkeypatch, body, message):
+    js = 'var zz=function(a){%s};' % body
+    with pytest.raises(JSInterpreter.Exception, match=message):
+        JSCompiler(js).compile_function(['a'], body)
+
+    interpreted = []
+    original = JSInterpreter.extract_function
+
+    def extract_function(self, funcname):
+        interpreted.append(funcname)
+        return original(self, funcname)
+
+    monkeypatch.setattr(JSInterpreter, 'extract_function', extract_function)
+    func = JSCompiler(js).extract_function('zz')
+    assert interpreted == ['zz']
+    assert func is not None
+
+
+def test_object_methods_fall_back_one_at_a_time(monkeypatch):
+    # Only the method using a regex is interpreted, the rest stay compiled
+    js = ('var Ob={rv:function(a){a.reverse()},'
+          'rx:function(a){return a.join("").replace(/a/g,"")}};'
+          'var Sg=function(a){a=a.split("");Ob.rv(a);return a.join("")};')
+    built = []
+    original = JSInterpreter.build_function
+
+    def build_function(self, argnames, code, *global_stack):
+        built.append(code)
+        return original(self, argnames, code, *global_stack)
+
+    monkeypatch.setattr(JSInterpreter, 'build_function', build_function)
+    assert JSCompiler(js).call_function('Sg', 'abc') == 'cba'
+    assert len(built) == 1 and 'replace' in built[0]
@@ -0,0 +1,76 @@
+"""The raw_decode fast path of the parser against the scanning fallback."""
+import json
+import random
+
+import pytest
+
+from pytubefix import parser
+from pytubefix.exceptions import HTMLParseError
+
+_CHARS = 'abcXYZ09 {}[]"\'/\\:,;\n\té€😀<>'
+
+
+def _string(rng):
+    return ''.join(rng.choice(_CHARS) for _ in range(rng.randint(0, 12)))
+
+
+def _value(rng, depth=0):
+    kind = rng.randint(0, 7 if depth < 4 else 3)
+    if kind == 0:
+        return _string(rng)
+    if kind == 1:
+        return rng.randint(-10 ** 12, 10 ** 12)
+    if kind == 2:
+        return rng.choice([True, False, None, 0.5, -1.25e-7])
+    if kind == 3:
+        return {}
+    if kind < 6:
+        return {_string(rng): _value(rng, depth + 1) for _ in range(rng.randint(1, 5))}
+    return [_value(rng, depth + 1) for _ in range(rng.randint(0, 5))]
+
+
+def page(obj, **dumps):
+    """Embed ``obj`` in a watch page like ``ytInitialPlayerResponse``."""
+    return (
+        '<html><script>var x=1;</script><script nonce="n">'
+        f'var ytInitialPlayerResponse = {json.dumps(obj, **dumps)};'
+        'var meta = document.createElement(\'meta\');</script></html>'
+    )
+
+
+def _fallback(html, start):
+    return json.loads(parser.find_object_from_startpoint(html, start))
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_fast_path_matches_fallback(seed):
+    rng = random.Random(seed)
+    obj = {'streamingData': _value(rng), 'videoDetails': [_value(rng) for _ in range(3)]}
+    html = page(obj, ensure_ascii=bool(seed % 2))
+    start = html.index('= {') + 2
+
+    assert parser.parse_for_object_from_startpoint(html, start) == obj
+    assert _fallback(html, start) == obj
+    assert parser.parse_for_object(html, r'ytInitialPlayerResponse\s*=\s*') == obj
+
+
+def test_single_quoted_literal_falls_back():
+    html = ("<script>var ytcfg = {'INNERTUBE_API_KEY': 'key', 'n': [1, 2, {'a': \"b}\"}]};"
+            "ytcfg.set({'x': 1});</script>")
+    expected = {'INNERTUBE_API_KEY': 'key', 'n': [1, 2, {'a': 'b}'}]}
+    assert parser.parse_for_object(html, r'ytcfg\s*=\s*') == expected
+    assert parser.parse_for_all_objects(html, r'ytcfg\s*=\s*|ytcfg\.set\(') == [expected, {'x': 1}]
+
+
+def test_unparsable_object_raises():
+    with pytest.raises(HTMLParseError):
+        parser.parse_for_object('var a = {b: function(){}};', r'a\s*=\s*')
+
+
+def test_json_does_not_scan(monkeypatch):
+    def scan(html, start_point):
+        raise AssertionError('scanned a JSON object')
+
+    monkeypatch.setattr(parser, 'find_object_from_startpoint', scan)
+    html = page({'a': ['}', '{"', {'b': '/'}]})
+    assert parser.parse_for_object(html, r'ytInitialPlayerResponse\s*=\s*') == {'a': ['}', '{"', {'b': '/'}]}
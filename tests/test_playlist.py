@@ -0,0 +1,167 @@
+"""Playlist.sync against a local browse stand-in."""
+import json
+import threading
+import time
+
+import pytest
+
+import standin
+from pytubefix import Playlist
+from pytubefix.contrib import playlist as playlist_module
+from pytubefix.innertube import InnerTube
+
+
+def page(videos):
+    """The playlist page holding the first 100 of ``videos``."""
+    count = len(videos)
+    data = {
+        'responseContext': {'webResponseContextExtensionData': {'ytConfigData': {'visitorData': 'visitor'}}},
+        'sidebar': {'playlistSidebarRenderer': {'items': [{'playlistSidebarPrimaryInfoRenderer': {'stats': [
+            {'runs': [{'text': f'{count} videos'}]},
+            {'simpleText': '9 views'},
+            {'runs': [{'text': 'Last updated on '}, {'text': 'Jan 1, 2024'}]},
+        ]}}]}},
+        'contents': {'twoColumnBrowseResultsRenderer': {'tabs': [{'tabRenderer': {'content': {
+            'sectionListRenderer': {'contents': [{'itemSectionRenderer': {'contents': [{
+                'playlistVideoListRenderer': {'contents': standin.playlist_items(
+                    videos[:100], 1 if count > 100 else None)}
+            }]}}]}}}}]}},
+    }
+    return f'<html><script>var ytInitialData = {json.dumps(data)};</script></html>'
+
+
+def ids(start, stop):
+    return [f'vid{i:08d}' for i in range(start, stop)]
+
+
+@pytest.fixture
+def videos():
+    return ids(0, 240)
+
+
+@pytest.fixture
+def server(videos, monkeypatch):
+    with standin.serve(standin.browse_handler(videos)) as server:
+        monkeypatch.setattr(InnerTube, 'base_url', property(lambda self: server.base_url + '/youtubei/v1'))
+        yield server
+
+
+@pytest.fixture
+def sync(videos, server, tmp_path):
+    state_file = str(tmp_path / 'sync.json')
+
+    def sync(read_ahead=None, **kwargs):
+        server.stats.clear()
+        playlist = Playlist('https://www.youtube.com/playlist?list=PLsync')
+        playlist._html = page(videos)
+        if read_ahead is not None:
+            playlist.read_ahead = read_ahead
+        return [url.rsplit('=', 1)[1] for url in playlist.sync(state_file=state_file, **kwargs)], dict(server.stats)
+
+    sync.state_file = state_file
+    return sync
+
+
+def test_first_sync_returns_everything_then_nothing(sync):
+    assert sync() == (ids(0, 240), {'browse': 2, 'p1': 1, 'p2': 1})
+    assert sync() == ([], {})
+
+
+@pytest.mark.parametrize('read_ahead', [0, None])
+def test_appended_entries_are_read_from_the_last_page(sync, videos, read_ahead):
+    sync()
+    videos.extend(ids(240, 310))
+    assert sync(read_ahead) == (ids(240, 310), {'browse': 2, 'p2': 1, 'p3': 1})
+    with open(sync.state_file) as f:
+        assert json.load(f)['cursor'] == {'continuation': 'p3', 'ids': ids(300, 310)}
+
+
+def test_changed_entries_are_read_in_full(sync, videos):
+    sync()
+    del videos[150]
+    videos.extend(['vidnew00001', 'vidnew00002'])
+    assert sync() == (['vidnew00001', 'vidnew00002'], {'browse': 3, 'p1': 1, 'p2': 2})
+
+
+def test_state_keeps_the_latest_ids(sync, monkeypatch):
+    monkeypatch.setattr(playlist_module, '_sync_max_ids', 150)
+    sync()
+    with open(sync.state_file) as f:
+        assert json.load(f)['ids'] == ids(90, 240)
+
+
+def test_list_longer_than_the_state_is_read_in_full(sync, videos, monkeypatch):
+    monkeypatch.setattr(playlist_module, '_sync_max_ids', 50)
+    sync()
+    with open(sync.state_file + '.ids') as f:
+        assert f.read().split() == ids(0, 190)
+
+    # The ids that fell off the state are still known when reading in full
+    del videos[10]
+    videos.extend(['vidnew00001', 'vidnew00002'])
+    assert sync() == (['vidnew00001', 'vidnew00002'], {'browse': 3, 'p1': 1, 'p2': 2})
+    with open(sync.state_file + '.ids') as f:
+        assert f.read().split() == ids(0, 190) + ids(190, 192)
+    with open(sync.state_file) as f:
+        assert json.load(f)['ids'] == ids(192, 240) + ['vidnew00001', 'vidnew00002']
+
+
+def test_ids_of_another_list_are_dropped(sync, monkeypatch):
+    monkeypatch.setattr(playlist_module, '_sync_max_ids', 50)
+    with open(sync.state_file + '.ids', 'w') as f:
+        f.write('\n'.join(ids(0, 240)))
+    assert sync()[0] == ids(0, 240)
+    with open(sync.state_file + '.ids') as f:
+        assert f.read().split() == ids(0, 190)
+
+
+@pytest.fixture
+def fetching():
+    """A Playlist whose pages ``p<n>`` list ``v<n>`` and lead to the next one, up to p5."""
+    playlist = Playlist('https://www.youtube.com/playlist?list=PLpages')
+    playlist.fetched = []
+    playlist.fetched_in = set()
+    playlist.failing = None
+
+    def fetch_page(token, context=None):
+        playlist.fetched.append(token)
+        playlist.fetched_in.add(threading.current_thread())
+        n = int(token[1:])
+        # Later pages answer sooner
+        time.sleep(0.01 * (5 - n))
+        if token == playlist.failing:
+            raise ValueError(token)
+        return [f'v{n}'], f'p{n + 1}' if n < 5 else None
+
+    playlist._fetch_page = fetch_page
+    return playlist
+
+
+def test_pages_read_ahead_are_yielded_in_order(fetching):
+    assert list(fetching._continuation_pages('p1', with_tokens=True)) == [
+        (f'p{n}', [f'v{n}']) for n in range(1, 6)]
+    assert threading.current_thread() not in fetching.fetched_in
+
+
+def test_error_of_the_read_ahead_is_raised_in_order(fetching):
+    fetching.failing = 'p3'
+    pages = fetching._continuation_pages('p1')
+    assert next(pages) == ['v1'] and next(pages) == ['v2']
+    with pytest.raises(ValueError, match='p3'):
+        next(pages)
+    assert fetching.fetched == ['p1', 'p2', 'p3']
+
+
+def test_read_ahead_stops_with_the_caller(fetching):
+    fetching.read_ahead = 2
+    pages = fetching._continuation_pages('p1')
+    assert next(pages) == ['v1']
+    # Let the thread fill its slots
+    time.sleep(0.2)
+    pages.close()
+
+    thread, = fetching.fetched_in
+    thread.join(timeout=1)
+    assert not thread.is_alive()
+    # The page being read, and no more than read_ahead after it
+    assert fetching.fetched == ['p1', 'p2', 'p3']
@@ -0,0 +1,184 @@
+import hashlib
+import threading
+import time
+import urllib.request
+from urllib.error import HTTPError
+
+import pytest
+
+from pytubefix import Stream, helpers, request
+from pytubefix.monostate import Monostate
+
+import standin
+
+
+@pytest.fixture
+def server():
+    request._pool.clear()
+    with standin.serve(standin.connection_handler()) as server:
+        yield server
+    request._pool.clear()
+
+
+def test_keep_alive_connection_is_reused(server):
+    assert [request.get(f'{server.base_url}/ok') for _ in range(3)] == ['ok'] * 3
+    with request._execute_request(f'{server.base_url}/chunked') as response:
+        assert response.read() == b'chunked body'
+    assert server.stats['connection'] == 1
+
+
+def test_partly_read_response_closes_its_connection(server):
+    response = request._execute_request(f'{server.base_url}/chunked')
+    assert response.read(3) == b'chu'
+    response.close()
+    assert request.get(f'{server.base_url}/ok') == 'ok'
+    assert server.stats['connection'] == 2
+
+
+def test_redirect_is_followed(server):
+    response = request._execute_request(f'{server.base_url}/redirect')
+    assert (response.geturl(), response.read()) == (f'{server.base_url}/ok', b'ok')
+    assert server.stats['connection'] == 1
+
+
+def test_error_status_raises(server):
+    with pytest.raises(HTTPError) as e:
+        request.get(f'{server.base_url}/missing')
+    assert (e.value.code, e.value.read()) == (404, b'not found')
+    # The error body was read, so the connection is reused
+    assert request.get(f'{server.base_url}/ok') == 'ok'
+    assert server.stats['connection'] == 1
+
+
+def test_connection_closed_while_idle_is_replaced(server):
+    assert request.get(f'{server.base_url}/close') == 'ok'
+    assert request.get(f'{server.base_url}/ok') == 'ok'
+    assert server.stats['connection'] == 2
+    assert server.stats['/ok'] == 1
+
+
+def test_proxied_requests_bypass_the_pool(server, monkeypatch):
+    monkeypatch.setattr(urllib.request, '_opener', None)
+    monkeypatch.setattr(helpers, 'installed_proxies', {})
+    monkeypatch.setattr(request, 'installed_proxies', helpers.installed_proxies)
+    # The stand-in answers the absolute url a proxy is sent
+    helpers.install_proxy({'http': server.base_url})
+
+    assert request.get('http://youtube.invalid/ok') == 'ok'
+    assert request.get('http://youtube.invalid/ok') == 'ok'
+    assert server.stats['/ok'] == 2
+    assert request._pool._idle == {}
+
+
+def test_segment_ranges():
+    assert request.segment_ranges(10, 4) == [(0, 3), (4, 7), (8, 9)]
+    assert request.segment_ranges(8, 4) == [(0, 3), (4, 7)]
+    assert request.segment_ranges(0, 4) == []
+
+
+def test_missing_ranges():
+    assert request.missing_ranges(10, [], 4) == [(0, 3), (4, 7), (8, 9)]
+    assert request.missing_ranges(10, [(4, 7)], 4) == [(0, 3), (8, 9)]
+    assert request.missing_ranges(10, [(0, 3), (2, 9)], 4) == []
+    # Unsorted, with a gap smaller than a segment
+    assert request.missing_ranges(12, [(6, 11), (0, 1)], 3) == [(2, 4), (5, 5)]
+
+
+def test_parallel_stream_yields_in_order_and_writes_each_range():
+    blob = standin.make_blob(1_000_003)
+    ranges = request.segment_ranges(len(blob), 100_000)
+    written = {}
+    lock = threading.Lock()
+
+    def on_segment(start, chunk):
+        with lock:
+            written[start] = chunk
+
+    with standin.serve(standin.range_handler(blob)) as server:
+        segments = list(request.parallel_stream(
+            f'{server.base_url}/videoplayback?itag=18', ranges, max_connections=4, on_segment=on_segment
+        ))
+        assert server.stats['range'] == len(ranges)
+
+    assert [start for start, _ in segments] == [start for start, _ in ranges]
+    assert b''.join(chunk for _, chunk in segments) == blob
+    assert sorted(written) == [start for start, _ in ranges]
+    assert all(written[start] == blob[start:stop + 1] for start, stop in ranges)
+
+
+def test_stream_download_writes_ranges_in_place(tmp_path):
+    blob = standin.make_blob(2_500_000)
+    progress = []
+    monostate = Monostate(on_progress=lambda stream, chunk, remaining: progress.append(remaining),
+                          on_complete=None, title='test')
+    with standin.serve(standin.range_handler(blob)) as server:
+        stream = Stream({
+            'url': f'{server.base_url}/videoplayback?expire=9999999999&itag=137',
+            'itag': 137,
+            'mimeType': 'video/mp4; codecs="avc1.640028"',
+            'bitrate': 1,
+            'contentLength': str(len(blob)),
+            'is_otf': False,
+        }, monostate)
+        path = stream.download(output_path=str(tmp_path), filename='out.mp4', skip_existing=False,
+                               max_connections=4, segment_size=300_000)
+        assert server.stats['range'] == 9
+
+    with open(path, 'rb') as f:
+        assert hashlib.sha1(f.read()).digest() == hashlib.sha1(blob).digest()
+    assert progress == sorted(progress, reverse=True)
+    assert progress[-1] == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['out.mp4']
+
+
+def test_seq_stream_yields_segments_in_order_within_the_window():
+    segments = [standin.make_blob(1000 + i) for i in range(12)]
+    # The first segments answer last
+    handler = standin.segment_handler(segments, {1: 0.3, 2: 0.2, 3: 0.1})
+    with standin.serve(handler) as server:
+        chunks = []
+        for chunk in request.seq_stream(f'{server.base_url}/videoplayback?itag=18', max_connections=2):
+            if chunks:
+                # At most 2 * max_connections segments are requested ahead
+                assert max(handler.started) <= len(chunks) + 4
+            chunks.append(chunk)
+            time.sleep(0.01)
+
+    assert handler.answered[:3] != [1, 2, 3]
+    assert chunks[0] == b'Segment-Count: 12\r\n'
+    assert chunks[1:] == segments
+    assert handler.peak == 2
+
+
+def test_seq_filesize_adds_up_the_segments():
+    segments = [standin.make_blob(1000 + i) for i in range(6)]
+    handler = standin.segment_handler(segments, {1: 0.1})
+    with standin.serve(handler) as server:
+        size = request.seq_filesize(f'{server.base_url}/videoplayback?itag=18&filesize')
+        assert server.stats == {'GET': 1, 'HEAD': 6}
+    assert size == len(b'Segment-Count: 6\r\n') + sum(map(len, segments))
+
+
+@pytest.mark.parametrize('options,filesize,stats', [
+    # The size comes with the first range
+    ({'content_range': True}, None, {'GET': 3, 'range': 3}),
+    # or from a HEAD request when the first range does not tell
+    ({}, None, {'GET': 3, 'range': 3, 'HEAD': 1}),
+    ({}, 250_000, {'GET': 3, 'range': 3}),
+    # A server ignoring the range sends the whole body at once
+    ({'ignore_range': True}, None, {'GET': 1, 'range': 1, 'HEAD': 1}),
+])
+def test_stream_finds_the_size(monkeypatch, options, filesize, stats):
+    monkeypatch.setattr(request, 'default_range_size', 100_000)
+    blob = standin.make_blob(250_000)
+    with standin.serve(standin.range_handler(blob, **options)) as server:
+        url = f'{server.base_url}/videoplayback?itag=18'
+        assert b''.join(request.stream(url, filesize=filesize)) == blob
+        assert server.stats == stats
+
+
+def test_short_first_range_holds_the_whole_file():
+    blob = standin.make_blob(50_000)
+    with standin.serve(standin.range_handler(blob)) as server:
+        assert b''.join(request.stream(f'{server.base_url}/videoplayback?itag=18')) == blob
+        assert server.stats == {'GET': 1, 'range': 1}
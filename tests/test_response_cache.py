@@ -0,0 +1,142 @@
+"""The InnerTube response cache, in memory and on disk."""
+import json
+import os
+import time
+from collections import OrderedDict
+
+import pytest
+
+from pytubefix import response_cache
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(response_cache, 'enabled', True)
+    monkeypatch.setattr(response_cache, 'use_disk', False)
+    monkeypatch.setattr(response_cache, '_cache_dir', tmp_path / 'responses')
+    monkeypatch.setattr(response_cache, '_entries', OrderedDict())
+    return response_cache
+
+
+def key(video_id, endpoint='player'):
+    return (endpoint, 'ANDROID_VR', video_id, '', '')
+
+
+def player(*expires, status='OK', **streaming_data):
+    formats = [{'itag': 18, 'url': f'https://rr1---sn.googlevideo.com/videoplayback?expire={e}&itag=18'}
+               for e in expires]
+    return {'playabilityStatus': {'status': status}, 'streamingData': {'formats': formats, **streaming_data}}
+
+
+def test_player_expiration_is_the_earliest_url():
+    margin = response_cache._expiration_margin
+    assert response_cache.player_expiration(player(2000000000, 1900000000)) == 1900000000 - margin
+
+    cipher = {'signatureCipher': 's=abc&sp=sig&url=https%3A%2F%2Fx.googlevideo.com%2Fvideoplayback%3Fexpire%3D1800000000'}
+    response = player(2000000000)
+    response['streamingData']['adaptiveFormats'] = [cipher]
+    assert response_cache.player_expiration(response) == 1800000000 - margin
+
+
+def test_player_expiration_in_seconds():
+    before = time.time()
+    expiration = response_cache.player_expiration(player(2000000000, expiresInSeconds='100'))
+    assert before + 100 - response_cache._expiration_margin <= expiration <= time.time() + 100
+
+
+@pytest.mark.parametrize('response', [
+    player(2000000000, status='LOGIN_REQUIRED'),
+    {'playabilityStatus': {'status': 'OK'}},
+    player(),
+])
+def test_unplayable_player_is_not_cached(response):
+    assert response_cache.player_expiration(response) is None
+
+
+def test_hits_are_copies(cache):
+    cache.put(key('a'), {'x': [1]}, time.time() + 60)
+    hit = cache.get(key('a'))
+    hit['x'].append(2)
+    assert cache.get(key('a')) == {'x': [1]}
+
+
+def test_disabled_or_expired_is_not_cached(cache, monkeypatch):
+    cache.put(key('a'), {}, None)
+    cache.put(key('b'), {}, time.time() - 1)
+    assert cache.get(key('a')) is None and cache.get(key('b')) is None
+
+    now = time.time()
+    cache.put(key('c'), {'c': 1}, now + 10)
+    monkeypatch.setattr(response_cache.time, 'time', lambda: now + 10)
+    assert cache.get(key('c')) is None and key('c') not in cache._entries
+
+    monkeypatch.setattr(response_cache, 'enabled', False)
+    cache.put(key('d'), {'d': 1}, now + 60)
+    assert cache.get(key('d')) is None
+
+
+def test_least_recently_used_is_evicted(cache, monkeypatch):
+    monkeypatch.setattr(response_cache, 'max_entries', 3)
+    expires = time.time() + 60
+    for video_id in 'abc':
+        cache.put(key(video_id), {'id': video_id}, expires)
+    cache.get(key('a'))
+    cache.put(key('d'), {'id': 'd'}, expires)
+
+    assert [k[2] for k in cache._entries] == ['c', 'a', 'd']
+    assert cache.get(key('b')) is None
+
+
+def test_discard_and_clear(cache):
+    expires = time.time() + 60
+    cache.put(key('a'), {}, expires)
+    cache.put(key('a', 'next'), {}, expires)
+    cache.put(key('b'), {}, expires)
+
+    cache.discard('a')
+    assert cache.get(key('a')) is None and cache.get(key('a', 'next')) is None
+    assert cache.get(key('b')) == {}
+
+    cache.clear()
+    assert cache.get(key('b')) is None
+
+
+def test_disk_round_trip(cache, monkeypatch):
+    monkeypatch.setattr(response_cache, 'use_disk', True)
+    expires = time.time() + 60
+    cache.put(key('a'), {'id': 'a'}, expires)
+    cache.put(key('b'), {'id': 'b'}, expires)
+    files = sorted(os.listdir(cache._cache_dir))
+    assert len(files) == 2 and files[0].startswith('a-') and not any(f.endswith('.tmp') for f in files)
+
+    # Another process starts with nothing in memory
+    cache._entries.clear()
+    assert cache.get(key('a')) == {'id': 'a'}
+    assert key('a') in cache._entries
+
+    cache.discard('a')
+    assert sorted(os.listdir(cache._cache_dir)) == files[1:]
+    cache._entries.clear()
+    assert cache.get(key('a')) is None
+
+    cache.clear()
+    assert os.listdir(cache._cache_dir) == []
+
+
+def test_disk_entry_of_another_key_or_expired_is_removed(cache, monkeypatch):
+    monkeypatch.setattr(response_cache, 'use_disk', True)
+    now = time.time()
+    cache.put(key('a'), {'id': 'a'}, now + 60)
+    path = response_cache._path(key('a'))
+    with open(path) as f:
+        data = json.load(f)
+
+    cache._entries.clear()
+    with open(path, 'w') as f:
+        json.dump({**data, 'key': list(key('b'))}, f)
+    assert cache.get(key('a')) is None and not path.exists()
+
+    cache.put(key('a'), {'id': 'a'}, now + 60)
+    cache._entries.clear()
+    monkeypatch.setattr(response_cache.time, 'time', lambda: now + 60)
+    assert cache.get(key('a')) is None and not path.exists()
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from pytubefix import Stream, streams
+from pytubefix.monostate import Monostate
+
+import standin
+
+
+def _stream(url, size, monostate=None):
+    return Stream({
+        'url': url,
+        'itag': 137,
+        'mimeType': 'video/mp4; codecs="avc1.640028"',
+        'bitrate': 1,
+        'contentLength': str(size),
+        'is_otf': False,
+    }, monostate or Monostate(on_progress=None, on_complete=None, title='test'))
+
+
+def test_range_journal_coalesces_adjacent_ranges(tmp_path, monkeypatch):
+    monkeypatch.setattr(streams, '_journal_interval', 0)
+    journal = streams._RangeJournal(str(tmp_path / 'a.part.json'), itag=137, filesize=100)
+    fd = os.open(str(tmp_path / 'a.part'), os.O_WRONLY | os.O_CREAT)
+    try:
+        for start, stop in [(20, 29), (0, 9), (50, 59), (10, 19)]:
+            journal.add(start, stop, fd)
+    finally:
+        os.close(fd)
+    assert journal.ranges == [(0, 29), (50, 59)]
+    with open(journal.path) as f:
+        assert json.load(f)['ranges'] == [[0, 29], [50, 59]]
+
+
+def test_range_journal_syncs_part_file_before_saving(tmp_path, monkeypatch):
+    events = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, 'fsync', lambda fd: (events.append(('fsync', fd)), real_fsync(fd)))
+    real_save = streams._RangeJournal._save
+    monkeypatch.setattr(streams._RangeJournal, '_save', lambda self: (events.append(('save',)), real_save(self)))
+    monkeypatch.setattr(streams, '_journal_interval', 3600)
+
+    journal = streams._RangeJournal(str(tmp_path / 'a.part.json'), itag=137, filesize=100)
+    journal._saved_at = streams.time.monotonic()
+    fd = os.open(str(tmp_path / 'a.part'), os.O_WRONLY | os.O_CREAT)
+    try:
+        for start in range(0, 100, 10):
+            journal.add(start, start + 9, fd)
+        # Throttled: nothing was written yet
+        assert events == []
+        journal.flush(fd)
+        journal.flush(fd)
+    finally:
+        os.close(fd)
+    # One save, preceded by a sync of the part file
+    assert events[0] == ('fsync', fd)
+    assert [e for e in events if e[0] == 'save'] == [('save',)]
+    assert events.index(('save',)) > 0
+    assert journal.ranges == [(0, 99)]
+
+
+def test_interrupted_download_resumes_from_journal(tmp_path):
+    blob = standin.make_blob(1_000_000)
+    with standin.serve(standin.range_handler(blob)) as server:
+        url = f'{server.base_url}/videoplayback?expire=9999999999&itag=137'
+        seen = []
+        monostate = Monostate(on_progress=lambda s, c, r: seen.append(r), on_complete=None, title='test')
+        result = _stream(url, len(blob), monostate).download(
+            output_path=str(tmp_path), filename='out.mp4', max_connections=1, segment_size=100_000,
+            interrupt_checker=lambda: len(seen) >= 3)
+        assert result is None
+
+        with open(tmp_path / 'out.mp4.part.json') as f:
+            ranges = json.load(f)['ranges']
+        with open(tmp_path / 'out.mp4.part', 'rb') as f:
+            part = f.read()
+        assert ranges and all(part[a:b + 1] == blob[a:b + 1] for a, b in ranges)
+        done = sum(b - a + 1 for a, b in ranges)
+
+        server.stats.clear()
+        path = _stream(url, len(blob)).download(output_path=str(tmp_path), filename='out.mp4',
+                                               max_connections=2, segment_size=100_000)
+        assert server.stats['range'] == (len(blob) - done) // 100_000
+
+    with open(path, 'rb') as f:
+        assert hashlib.sha1(f.read()).digest() == hashlib.sha1(blob).digest()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['out.mp4']
+
+
+_URL = 'https://rr1---sn.googlevideo.com/videoplayback?expire=1792334777&itag='
+
+# A video only, a progressive, an audio and a multi-track audio format
+FORMATS = [
+    {'itag': 137, 'url': _URL + '137', 'mimeType': 'video/mp4; codecs="avc1.640028"', 'bitrate': 4500000,
+     'width': 1920, 'height': 1080, 'contentLength': '123456789', 'fps': 30, 'is_otf': False},
+    {'itag': 18, 'url': _URL + '18', 'mimeType': 'video/mp4; codecs="avc1.42001E, mp4a.40.2"', 'bitrate': 500000,
+     'width': 640, 'height': 360, 'contentLength': '1000', 'fps': 30, 'is_otf': False},
+    {'itag': 140, 'url': _URL + '140', 'mimeType': 'audio/mp4; codecs="mp4a.40.2"', 'bitrate': 130000,
+     'contentLength': '3400000', 'is_otf': False},
+    {'itag': 251, 'url': _URL + '251', 'mimeType': 'audio/webm; codecs="opus"', 'bitrate': 150000,
+     'contentLength': '3500000', 'is_otf': False,
+     'audioTrack': {'displayName': 'English (United States) original', 'id': 'en-US.4', 'audioIsDefault': True}},
+]
+
+# The public fields of those streams, as they were before Stream used
+# __slots__, except fps: audio streams used to have none at all.
+FIELDS = [
+    {'itag': 137,
+     'mime_type': 'video/mp4',
+     'codecs': ['avc1.640028'],
+     'type': 'video',
+     'subtype': 'mp4',
+     'video_codec': 'avc1.640028',
+     'audio_codec': None,
+     'is_otf': False,
+     'bitrate': 4500000,
+     'fps': 30,
+     'is_dash': True,
+     'abr': None,
+     'resolution': '1080p',
+     'is_3d': False,
+     'is_hdr': False,
+     'is_live': False,
+     'includes_multiple_audio_tracks': False,
+     'is_default_audio_track': False,
+     'audio_track_name_regionalized': None,
+     'audio_track_name': None,
+     'audio_track_language_id_regionalized': None,
+     'audio_track_language_id': None,
+     'is_adaptive': True,
+     'is_progressive': False,
+     'includes_audio_track': False,
+     'includes_video_track': True,
+     'width': 1920,
+     'height': 1080,
+     'filesize': 123456789,
+     'filesize_kb': 120563.271,
+     'filesize_mb': 117.738,
+     'filesize_gb': 0.115,
+     'default_filename': 'A/B: test?.mp4',
+     'repr': '<Stream: itag="137" mime_type="video/mp4" res="1080p" fps="30fps" vcodec="avc1.640028" '
+             'progressive="False" type="video">'},
+    {'itag': 18,
+     'mime_type': 'video/mp4',
+     'codecs': ['avc1.42001E', 'mp4a.40.2'],
+     'type': 'video',
+     'subtype': 'mp4',
+     'video_codec': 'avc1.42001E',
+     'audio_codec': 'mp4a.40.2',
+     'is_otf': False,
+     'bitrate': 500000,
+     'fps': 30,
+     'is_dash': False,
+     'abr': '96kbps',
+     'resolution': '360p',
+     'is_3d': False,
+     'is_hdr': False,
+     'is_live': False,
+     'includes_multiple_audio_tracks': False,
+     'is_default_audio_track': False,
+     'audio_track_name_regionalized': None,
+     'audio_track_name': None,
+     'audio_track_language_id_regionalized': None,
+     'audio_track_language_id': None,
+     'is_adaptive': False,
+     'is_progressive': True,
+     'includes_audio_track': True,
+     'includes_video_track': True,
+     'width': 640,
+     'height': 360,
+     'filesize': 1000,
+     'filesize_kb': 0.977,
+     'filesize_mb': 0.001,
+     'filesize_gb': 0.001,
+     'default_filename': 'A/B: test?.mp4',
+     'repr': '<Stream: itag="18" mime_type="video/mp4" res="360p" fps="30fps" vcodec="avc1.42001E" '
+             'acodec="mp4a.40.2" progressive="True" type="video">'},
+    {'itag': 140,
+     'mime_type': 'audio/mp4',
+     'codecs': ['mp4a.40.2'],
+     'type': 'audio',
+     'subtype': 'mp4',
+     'video_codec': None,
+     'audio_codec': 'mp4a.40.2',
+     'is_otf': False,
+     'bitrate': 130000,
+     'fps': None,
+     'is_dash': True,
+     'abr': '128kbps',
+     'resolution': None,
+     'is_3d': False,
+     'is_hdr': False,
+     'is_live': False,
+     'includes_multiple_audio_tracks': False,
+     'is_default_audio_track': True,
+     'audio_track_name_regionalized': None,
+     'audio_track_name': None,
+     'audio_track_language_id_regionalized': None,
+     'audio_track_language_id': None,
+     'is_adaptive': True,
+     'is_progressive': False,
+     'includes_audio_track': True,
+     'includes_video_track': False,
+     'width': None,
+     'height': None,
+     'filesize': 3400000,
+     'filesize_kb': 3320.313,
+     'filesize_mb': 3.243,
+     'filesize_gb': 0.004,
+     'default_filename': 'A/B: test?.m4a',
+     'repr': '<Stream: itag="140" mime_type="audio/mp4" abr="128kbps" acodec="mp4a.40.2" progressive="False" '
+             'type="audio">'},
+    {'itag': 251,
+     'mime_type': 'audio/webm',
+     'codecs': ['opus'],
+     'type': 'audio',
+     'subtype': 'webm',
+     'video_codec': None,
+     'audio_codec': 'opus',
+     'is_otf': False,
+     'bitrate': 150000,
+     'fps': None,
+     'is_dash': True,
+     'abr': '160kbps',
+     'resolution': None,
+     'is_3d': False,
+     'is_hdr': False,
+     'is_live': False,
+     'includes_multiple_audio_tracks': True,
+     'is_default_audio_track': True,
+     'audio_track_name_regionalized': 'English (United States)',
+     'audio_track_name': 'English',
+     'audio_track_language_id_regionalized': 'en-US',
+     'audio_track_language_id': 'en',
+     'is_adaptive': True,
+     'is_progressive': False,
+     'includes_audio_track': True,
+     'includes_video_track': False,
+     'width': None,
+     'height': None,
+     'filesize': 3500000,
+     'filesize_kb': 3417.969,
+     'filesize_mb': 3.338,
+     'filesize_gb': 0.004,
+     'default_filename': 'A/B: test?.m4a',
+     'repr': '<Stream: itag="251" mime_type="audio/webm" abr="160kbps" acodec="opus" progressive="False" '
+             'type="audio">'},
+]
+
+
+@pytest.mark.parametrize('fmt,fields', list(zip(FORMATS, FIELDS)), ids=[f['itag'] for f in FORMATS])
+def test_public_fields(fmt, fields):
+    stream = Stream(fmt, Monostate(on_progress=None, on_complete=None, title='A/B: test?', duration=212))
+    actual = {name: getattr(stream, name) for name in fields if name != 'repr'}
+    actual['repr'] = repr(stream)
+    assert actual == fields
+    assert stream.url == fmt['url']
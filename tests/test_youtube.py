@@ -0,0 +1,215 @@
+"""The hedged player request of YouTube with the requests replaced."""
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import pytubefix.__main__ as youtube_module
+from pytubefix import YouTube, exceptions, extract
+
+NOT_AVAILABLE = {'playabilityStatus': {'status': 'UNPLAYABLE', 'reason': 'This video is not available'}}
+LOGIN_REQUIRED = {'playabilityStatus': {'status': 'LOGIN_REQUIRED', 'reason': 'Sign in'}}
+ERROR = {'playabilityStatus': {'status': 'ERROR', 'reason': 'Oops'}}
+
+
+def playable(client):
+    return {'playabilityStatus': {'status': 'OK'}, 'streamingData': {'client': client}}
+
+
+class _InnerTube:
+    access_po_token = None
+    require_po_token = False
+
+    def __init__(self, client_name):
+        self.client_name = client_name
+
+
+def hedged(responses, hedge_delay):
+    """A YouTube whose player requests answer ``responses[client] = (delay, response)``."""
+    yt = YouTube('https://www.youtube.com/watch?v=2lAe1cqCOXo', client='ANDROID_VR', hedge_delay=hedge_delay)
+    yt.fallback_clients = ['TV', 'IOS']
+    yt._visitor_data = 'visitor'
+    yt._signature_timestamp = {'playbackContext': {}}
+    yt.requested = []
+    lock = threading.Lock()
+
+    def call_innertube(client, timeout=None):
+        with lock:
+            yt.requested.append((client, timeout))
+        delay, response = responses[client]
+        time.sleep(delay)
+        if isinstance(response, Exception):
+            raise response
+        return _InnerTube(client), response
+
+    yt._call_innertube = call_innertube
+    return yt
+
+
+def test_other_statuses_do_not_start_the_fallbacks():
+    yt = hedged({'ANDROID_VR': (0.01, LOGIN_REQUIRED)}, hedge_delay=1)
+    assert yt.vid_info is LOGIN_REQUIRED
+    assert yt.requested == [('ANDROID_VR', youtube_module._hedge_timeout)]
+
+
+def test_not_available_starts_the_fallbacks_at_once():
+    yt = hedged({
+        'ANDROID_VR': (0, NOT_AVAILABLE),
+        'TV': (0.05, playable('TV')),
+        'IOS': (0.2, NOT_AVAILABLE),
+    }, hedge_delay=5)
+    start = time.perf_counter()
+    assert yt.vid_info['streamingData'] == {'client': 'TV'}
+    assert time.perf_counter() - start < 1
+    assert yt.client == 'TV'
+    assert yt._hedged_clients == ['ANDROID_VR', 'TV', 'IOS']
+
+
+def test_slow_client_is_hedged_after_the_delay():
+    yt = hedged({
+        'ANDROID_VR': (0.5, playable('ANDROID_VR')),
+        'TV': (0.01, ERROR),
+        'IOS': (0.01, playable('IOS')),
+    }, hedge_delay=0.05)
+    assert yt.vid_info['streamingData'] == {'client': 'IOS'}
+    assert {client for client, _ in yt.requested} == {'ANDROID_VR', 'TV', 'IOS'}
+    assert all(timeout == youtube_module._hedge_timeout for _, timeout in yt.requested)
+
+
+def test_hedged_result_matches_the_sequential_fallback():
+    # The fallbacks answer first, but the client's own response wins, as it
+    # would without hedging.
+    yt = hedged({
+        'ANDROID_VR': (0.3, LOGIN_REQUIRED),
+        'TV': (0.01, ERROR),
+        'IOS': (0.01, LOGIN_REQUIRED),
+    }, hedge_delay=0.05)
+    assert yt.vid_info is LOGIN_REQUIRED
+    assert yt.client == 'ANDROID_VR'
+
+
+def test_first_response_is_kept_when_no_client_can_play():
+    yt = hedged({
+        'ANDROID_VR': (0, NOT_AVAILABLE),
+        'TV': (0, ValueError('TV')),
+        'IOS': (0, NOT_AVAILABLE),
+    }, hedge_delay=5)
+    assert yt.vid_info is NOT_AVAILABLE
+    assert yt.client == 'ANDROID_VR'
+
+
+def test_error_of_the_client_is_raised():
+    yt = hedged({'ANDROID_VR': (0, ValueError('ANDROID_VR'))}, hedge_delay=5)
+    with pytest.raises(ValueError):
+        yt.vid_info
+
+
+
+MANIFEST = {
+    'version': 1,
+    'video_id': '2lAe1cqCOXo',
+    'client': 'ANDROID_VR',
+    'po_token': None,
+    'title': 'Manifest title',
+    'author': 'Manifest author',
+    'length': 212,
+    'streams': [{
+        'itag': 18,
+        'mimeType': 'video/mp4; codecs="avc1.42001E, mp4a.40.2"',
+        'bitrate': 500000,
+        'contentLength': '1000',
+        'width': 640,
+        'height': 360,
+        'fps': 30,
+        'url': 'https://rr1---sn.googlevideo.com/videoplayback?expire=9999999999&itag=18',
+    }],
+}
+
+
+def test_manifest_reads_other_details_from_the_player(monkeypatch):
+    calls = []
+
+    def call_innertube(self, client, timeout=None):
+        calls.append(client)
+        return _InnerTube(client), {
+            'playabilityStatus': {'status': 'OK'},
+            'videoDetails': {'videoId': '2lAe1cqCOXo', 'shortDescription': 'From the player',
+                             'keywords': ['a'], 'channelId': 'UCx', 'viewCount': '42'},
+        }
+
+    monkeypatch.setattr(YouTube, '_call_innertube', call_innertube)
+    yt = YouTube.from_manifest(json.dumps(MANIFEST))
+    assert (yt.title, yt.author, yt.length) == ('Manifest title', 'Manifest author', 212)
+    assert yt.streams.get_by_itag(18).url == MANIFEST['streams'][0]['url']
+    assert calls == []
+
+    assert yt.description == 'From the player'
+    assert (yt.keywords, yt.channel_id, yt.views) == (['a'], 'UCx', 42)
+    assert calls == ['ANDROID_VR']
+    assert len(yt.streams) == 1 and yt.title == 'Manifest title'
+
+
+@pytest.mark.parametrize('change', [
+    {'streams': []},
+    {'version': 0},
+    {'streams': None},
+    {'streams': ['https://rr1---sn.googlevideo.com/videoplayback']},
+    {'streams': [{'itag': 18}]},
+    {'streams': [{'url': MANIFEST['streams'][0]['url']}]},
+    {'streams': [{**MANIFEST['streams'][0], 'itag': 'x'}]},
+])
+def test_invalid_manifest_raises(change):
+    with pytest.raises(exceptions.ManifestError):
+        YouTube.from_manifest(json.dumps({**MANIFEST, **change}))
+
+
+def seeded(name):
+    """A YouTube seeded from a fixture renderer, recording its player requests."""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'renderers.json')) as f:
+        renderer = json.load(f)[name]
+    yt = YouTube('https://www.youtube.com/watch?v=2lAe1cqCOXo', client='ANDROID_VR')
+    yt._visitor_data = 'visitor'
+    yt.requested = []
+
+    def call_innertube(client, timeout=None):
+        yt.requested.append(client)
+        return _InnerTube(client), {
+            'playabilityStatus': {'status': 'OK'},
+            'videoDetails': {'title': 'From the player', 'author': 'Player author', 'lengthSeconds': '7',
+                             'viewCount': '99', 'channelId': 'UCplayer'},
+        }
+
+    yt._call_innertube = call_innertube
+    yt._seed(extract.renderer_video_details(renderer['item']))
+    return yt, renderer['details']
+
+
+@pytest.mark.parametrize('name', ['videoRenderer', 'playlistVideoRenderer', 'gridVideoRenderer', 'compactVideoRenderer'])
+def test_seeded_details_need_no_player_request(name):
+    yt, details = seeded(name)
+    assert (yt.title, yt.author, yt.length) == (details['title'], details['author'], int(details['lengthSeconds']))
+    assert yt.thumbnail_url == details['thumbnail']['thumbnails'][-1]['url']
+    if 'viewCount' in details:
+        assert yt.views == int(details['viewCount'])
+    if 'channelId' in details:
+        assert yt.channel_id == details['channelId']
+    assert yt.requested == []
+
+
+def test_missing_seeded_detail_reads_the_player():
+    # A playlist entry has no view count nor an exact one
+    yt, _ = seeded('playlistVideoRenderer')
+    assert yt.views == 99
+    assert yt.requested == ['ANDROID_VR']
+    # The player response is used from then on
+    assert yt.length == 7 and yt.title == 'Me at the zoo'
+
+
+def test_missing_seeded_author_reads_the_player():
+    yt, _ = seeded('reelItemRenderer')
+    assert yt.title == 'A short'
+    assert yt.requested == []
+    assert yt.author == 'Player author'
+    assert yt.requested == ['ANDROID_VR']